@@ -0,0 +1,310 @@
+"""
+Load benchmark for the TTS server.
+
+Starts the Flask app in-process on the offline fake backend, drives the
+synthesis endpoints over real HTTP at several concurrency levels and text
+lengths, and writes latency percentiles, time to first byte, throughput and
+peak RSS as JSON. A second command compares two result files and exits with
+status 1 when a scenario regressed beyond the threshold.
+
+Run from the server directory:
+
+    python -m benchmarks.run_benchmark run --output baseline.json
+    python -m benchmarks.run_benchmark run --output candidate.json
+    python -m benchmarks.run_benchmark compare baseline.json candidate.json
+"""
+import argparse
+import http.client
+import json
+import math
+import os
+import platform
+import resource
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from config import config
+
+DEFAULT_ENDPOINTS = ['/synthesize', '/synthesize-json']
+DEFAULT_CONCURRENCY = [1, 8, 32, 64]
+DEFAULT_TEXT_LENGTHS = [20, 200, 1000, config.MAX_TEXT_LENGTH]
+
+SAMPLE_TEXT = (
+    "The quick brown fox jumps over the lazy dog. "
+    "Benchmarks keep the server honest about its latency. "
+    "Every request here is synthesized by the offline engine. "
+)
+
+
+def make_text(length: int) -> str:
+    """Build text of exactly length characters from whole sample sentences"""
+    repeated = SAMPLE_TEXT * (length // len(SAMPLE_TEXT) + 1)
+    text = repeated[:length]
+    # The service strips whitespace, so keep the last character significant
+    return text[:-1] + '.' if text.endswith(' ') else text
+
+
+def percentiles(samples: List[float]) -> Dict:
+    """Nearest-rank percentiles in milliseconds"""
+    if not samples:
+        return {'p50': None, 'p95': None, 'p99': None, 'mean': None, 'max': None}
+    ordered = sorted(samples)
+
+    def rank(p):
+        index = max(0, min(len(ordered) - 1, math.ceil(p / 100 * len(ordered)) - 1))
+        return round(ordered[index] * 1000, 2)
+
+    return {
+        'p50': rank(50),
+        'p95': rank(95),
+        'p99': rank(99),
+        'mean': round(sum(ordered) / len(ordered) * 1000, 2),
+        'max': round(ordered[-1] * 1000, 2)
+    }
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process, which hosts both server and clients"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    divisor = 1024 * 1024 if sys.platform == 'darwin' else 1024
+    return round(peak / divisor, 1)
+
+
+class BenchmarkServer:
+    """The TTS Flask app on a threaded WSGI server in a background thread"""
+
+    def __init__(self, backend_options: Dict, use_cache: bool):
+        self._temp_dir = tempfile.TemporaryDirectory(prefix='tts-bench-')
+
+        # Configure before the routes module builds its services
+        config.TTS_BACKEND = 'fake'
+        config.TTS_BACKEND_OPTIONS = {'fake': backend_options}
+        config.TEMP_AUDIO_DIR = self._temp_dir.name
+        config.CACHE_ENABLED = use_cache
+        config.JOBS_ENABLED = False
+
+        from werkzeug.serving import WSGIRequestHandler, make_server
+        from src.api.routes import app
+
+        class QuietHandler(WSGIRequestHandler):
+            def log_request(self, *args, **kwargs):
+                pass
+
+        self._server = make_server('127.0.0.1', 0, app, threaded=True, request_handler=QuietHandler)
+        self.port = self._server.server_port
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._thread.join()
+        self._temp_dir.cleanup()
+
+
+def timed_request(port: int, endpoint: str, body: bytes, timeout: float) -> Dict:
+    """Send one request and time the headers and the full body"""
+    connection = http.client.HTTPConnection('127.0.0.1', port, timeout=timeout)
+    started = time.perf_counter()
+    try:
+        connection.request('POST', endpoint, body=body, headers={'Content-Type': 'application/json'})
+        response = connection.getresponse()
+        first_byte = time.perf_counter() - started
+        payload = response.read()
+        return {
+            'status': response.status,
+            'latency': time.perf_counter() - started,
+            'ttfb': first_byte,
+            'bytes': len(payload)
+        }
+    except (OSError, http.client.HTTPException) as e:
+        return {'status': None, 'latency': time.perf_counter() - started, 'ttfb': None, 'bytes': 0, 'error': str(e)}
+    finally:
+        connection.close()
+
+
+def run_scenario(port: int, endpoint: str, concurrency: int, text_length: int, requests: int, timeout: float) -> Dict:
+    body = json.dumps({'text': make_text(text_length), 'use_cache': False}).encode('utf-8')
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        samples = list(executor.map(
+            lambda _: timed_request(port, endpoint, body, timeout), range(requests)
+        ))
+    elapsed = time.perf_counter() - started
+
+    status_codes: Dict[str, int] = {}
+    for sample in samples:
+        key = str(sample['status'])
+        status_codes[key] = status_codes.get(key, 0) + 1
+    ok = [sample for sample in samples if sample['status'] == 200]
+
+    return {
+        'endpoint': endpoint,
+        'concurrency': concurrency,
+        'text_length': text_length,
+        'requests': requests,
+        'errors': requests - len(ok),
+        'status_codes': status_codes,
+        'latency_ms': percentiles([sample['latency'] for sample in ok]),
+        'ttfb_ms': percentiles([sample['ttfb'] for sample in ok]),
+        'rps': round(len(ok) / elapsed, 2) if elapsed else None,
+        'mean_response_bytes': round(sum(sample['bytes'] for sample in ok) / len(ok)) if ok else 0,
+        'peak_rss_mb': peak_rss_mb()
+    }
+
+
+def run(args) -> Dict:
+    backend_options = {
+        'latency': args.latency,
+        'jitter': args.jitter,
+        'chunk_delay': args.chunk_delay,
+        'failure_rate': args.failure_rate,
+        'seed': args.seed
+    }
+    results = []
+    with BenchmarkServer(backend_options, use_cache=args.cache) as server:
+        # Warm up imports, the event loop and connection handling
+        timed_request(server.port, args.endpoints[0], json.dumps({'text': 'warm up'}).encode('utf-8'), args.timeout)
+
+        for endpoint in args.endpoints:
+            for text_length in args.text_lengths:
+                for concurrency in args.concurrency:
+                    requests = max(args.requests, concurrency)
+                    result = run_scenario(server.port, endpoint, concurrency, text_length, requests, args.timeout)
+                    results.append(result)
+                    print(
+                        f"{endpoint:<18} c={concurrency:<4} len={text_length:<5} "
+                        f"p50={result['latency_ms']['p50']}ms p95={result['latency_ms']['p95']}ms "
+                        f"p99={result['latency_ms']['p99']}ms rps={result['rps']} "
+                        f"errors={result['errors']} rss={result['peak_rss_mb']}MB",
+                        file=sys.stderr
+                    )
+
+    return {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'backend': 'fake',
+            'backend_options': backend_options,
+            'cache': args.cache,
+            'requests_per_scenario': args.requests
+        },
+        'results': results
+    }
+
+
+def _scenario_key(result: Dict) -> tuple:
+    return result['endpoint'], result['concurrency'], result['text_length']
+
+
+def _change(base: Optional[float], new: Optional[float]) -> Optional[float]:
+    if not base or new is None:
+        return None
+    return round((new - base) / base * 100, 1)
+
+
+def compare(baseline: Dict, candidate: Dict, threshold: float) -> Dict:
+    """
+    Compare two runs scenario by scenario.
+
+    A scenario regresses when its p95 or p99 latency grows, or its throughput
+    drops, by more than threshold percent, or when it has new errors.
+    """
+    base_results = {_scenario_key(result): result for result in baseline['results']}
+    rows = []
+    for result in candidate['results']:
+        base = base_results.get(_scenario_key(result))
+        if base is None:
+            continue
+
+        p95 = _change(base['latency_ms']['p95'], result['latency_ms']['p95'])
+        p99 = _change(base['latency_ms']['p99'], result['latency_ms']['p99'])
+        rps = _change(base['rps'], result['rps'])
+
+        reasons = []
+        if p95 is not None and p95 > threshold:
+            reasons.append(f"p95 +{p95}%")
+        if p99 is not None and p99 > threshold:
+            reasons.append(f"p99 +{p99}%")
+        if rps is not None and -rps > threshold:
+            reasons.append(f"rps {rps}%")
+        if result['errors'] > base['errors']:
+            reasons.append(f"errors {base['errors']} -> {result['errors']}")
+
+        rows.append({
+            'endpoint': result['endpoint'],
+            'concurrency': result['concurrency'],
+            'text_length': result['text_length'],
+            'p95_change_pct': p95,
+            'p99_change_pct': p99,
+            'rps_change_pct': rps,
+            'regressed': bool(reasons),
+            'reasons': reasons
+        })
+
+    return {
+        'threshold_pct': threshold,
+        'regressions': sum(row['regressed'] for row in rows),
+        'scenarios': rows
+    }
+
+
+def _int_list(value: str) -> List[int]:
+    return [int(item) for item in value.split(',') if item]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='TTS server load benchmark')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = commands.add_parser('run', help='Run the benchmark and write JSON results')
+    run_parser.add_argument('--output', help='Result file; defaults to stdout')
+    run_parser.add_argument('--endpoints', type=lambda v: v.split(','), default=DEFAULT_ENDPOINTS)
+    run_parser.add_argument('--concurrency', type=_int_list, default=DEFAULT_CONCURRENCY)
+    run_parser.add_argument('--text-lengths', type=_int_list, default=DEFAULT_TEXT_LENGTHS)
+    run_parser.add_argument('--requests', type=int, default=100, help='Requests per scenario')
+    run_parser.add_argument('--timeout', type=float, default=60.0, help='Per-request timeout in seconds')
+    run_parser.add_argument('--cache', action='store_true', help='Keep the audio cache enabled')
+    run_parser.add_argument('--latency', type=float, default=0.3, help='Fake backend connection latency')
+    run_parser.add_argument('--jitter', type=float, default=0.1)
+    run_parser.add_argument('--chunk-delay', type=float, default=0.02)
+    run_parser.add_argument('--failure-rate', type=float, default=0.0)
+    run_parser.add_argument('--seed', type=int, default=0)
+
+    compare_parser = commands.add_parser('compare', help='Compare two result files')
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('candidate')
+    compare_parser.add_argument('--threshold', type=float, default=10.0, help='Allowed change in percent')
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'run':
+        report = json.dumps(run(args), indent=2)
+        if args.output:
+            with open(args.output, 'w') as f:
+                f.write(report + '\n')
+        else:
+            print(report)
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.candidate) as f:
+        candidate = json.load(f)
+    result = compare(baseline, candidate, args.threshold)
+    print(json.dumps(result, indent=2))
+    return 1 if result['regressions'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
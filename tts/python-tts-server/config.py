@@ -1,19 +1,100 @@
 # Configuration settings for the TTS server
+import os
 
 class Config:
     DEBUG = True  # Set to False in production
     SERVER_PORT = 5000  # Port for the server to run on
     SERVER_HOST = '0.0.0.0'
+    LOG_LEVEL = 'INFO'  # Log records are written to stdout by a background thread
+    
+    # Synthesis backend: 'edge' for the live service, 'fake' for the offline engine
+    TTS_BACKEND = os.environ.get('TTS_BACKEND', 'edge')
+    TTS_BACKEND_OPTIONS = {
+        # Latencies in seconds; failure_rate is the fraction of requests that fail
+        'fake': {'latency': 0.3, 'jitter': 0.1, 'chunk_delay': 0.02, 'failure_rate': 0.0, 'seed': 0}
+    }
     
     # Edge TTS settings
     DEFAULT_VOICE = 'en-US-AriaNeural'
     DEFAULT_RATE = '+0%'
     DEFAULT_PITCH = '+0Hz'
     
+    # Concurrency settings
+    SYNTHESIS_TIMEOUT = 120  # Seconds a request thread waits on the shared event loop
+    
+    # Backend resilience - timeouts, retries, hedged requests and a circuit breaker around the backend
+    BACKEND_RESILIENCE = True
+    BACKEND_CONNECT_TIMEOUT = 10  # Seconds to the backend's first message
+    BACKEND_FIRST_AUDIO_TIMEOUT = 15  # Seconds to the first audio chunk
+    BACKEND_RECEIVE_TIMEOUT = 30  # Longest gap between chunks once audio flows
+    BACKEND_RETRIES = 2  # Extra attempts for a stream that failed before any audio
+    BACKEND_RETRY_BACKOFF = 0.2  # Seconds; doubled per attempt and randomized (full jitter)
+    BACKEND_HEDGE = True  # Send a second request when the first is slower than usual
+    BACKEND_HEDGE_MIN_DELAY = 0.25  # Seconds; lower bound on the hedge delay
+    BACKEND_HEDGE_QUANTILE = 0.95  # Hedge after this quantile of recent time to first audio
+    CIRCUIT_FAILURE_RATE = 0.5  # Failed fraction of recent attempts that opens the circuit
+    CIRCUIT_MIN_REQUESTS = 20  # Attempts in the window before the circuit may open
+    CIRCUIT_WINDOW = 30  # Seconds of attempts considered
+    CIRCUIT_OPEN_SECONDS = 15  # Seconds requests fail fast before a probe is let through
+    
+    # Admission control - requests over the limits queue, then get 429 with Retry-After
+    MAX_CONCURRENT_SYNTHESES = 64
+    MAX_CONCURRENT_PER_VOICE = 16
+    MAX_QUEUE_SIZE = 256
+    MAX_QUEUE_WAIT = 10  # Seconds a request may wait for a synthesis slot
+    
     # File settings
     TEMP_AUDIO_DIR = 'temp_audio'
     MAX_TEXT_LENGTH = 5000  # Limit text length for safety
     
+    # Output formats the backend does not produce itself are converted with ffmpeg
+    FFMPEG_PATH = 'ffmpeg'
+    MAX_CONCURRENT_TRANSCODES = 8  # ffmpeg processes running at once
+    TRANSCODE_TIMEOUT = 60  # Seconds without progress before a conversion is abandoned
+    
+    # Long text is split at sentence boundaries and the chunks synthesized in parallel
+    CHUNK_MAX_CHARS = 800
+    CHUNK_CONCURRENCY = 4  # Chunks of a single request synthesized at once
+    
+    # Multi-sentence text of requests sending "incremental": true is cached per sentence,
+    # so an edited script only re-synthesizes changed sentences
+    INCREMENTAL_SYNTHESIS = False
+    
+    # Program rendering (/synthesize/program) settings
+    PROGRAM_MAX_SEGMENTS = 100
+    PROGRAM_CONCURRENCY = 8  # Segments of a single program synthesized at once
+    PROGRAM_MAX_DURATION = 60 * 60  # Seconds; bounds the inserted silence
+    
+    # WebSocket streaming (/synthesize/ws) settings
+    WEBSOCKET_SENTENCE_CONCURRENCY = 4  # Sentences of one session synthesized at once
+    WEBSOCKET_POLL_INTERVAL = 0.02  # Seconds between checks for finished sentences while waiting for text
+    
+    # Batch synthesis settings
+    BATCH_MAX_ITEMS = 100
+    BATCH_CONCURRENCY = 8  # Items of a single batch synthesized at once
+    
+    # Asynchronous job settings
+    JOBS_ENABLED = True
+    JOBS_DB_PATH = 'jobs/jobs.db'
+    JOBS_AUDIO_DIR = 'jobs/audio'
+    JOB_WORKERS = 4
+    JOB_RETENTION_SECONDS = 24 * 60 * 60  # How long finished jobs and their audio are kept
+    JOB_STALE_SECONDS = 10 * 60  # A job running longer than this is assumed abandoned and queued again
+    
+    # Synthesis cache settings (stored under TEMP_AUDIO_DIR)
+    CACHE_ENABLED = True
+    CACHE_MEMORY_MAX_BYTES = 64 * 1024 * 1024
+    CACHE_MEMORY_MAX_ENTRY_BYTES = 512 * 1024  # Only small clips are kept in memory
+    CACHE_DISK_MAX_BYTES = 1024 * 1024 * 1024
+    
+    # Audio served from /audio/<id> (stored under TEMP_AUDIO_DIR)
+    AUDIO_STORE_MAX_BYTES = 2 * 1024 * 1024 * 1024
+    AUDIO_MAX_AGE = 365 * 24 * 60 * 60  # Clips never change, so clients may cache them for a year
+    
+    # Voice catalog - loaded from the backend in the background and cached under TEMP_AUDIO_DIR
+    VOICE_CATALOG_TTL = 24 * 60 * 60  # Seconds before the voice list is fetched again
+    VOICE_CATALOG_RETRY = 5 * 60  # Seconds before retrying a failed fetch
+    
     # Supported voice styles for different emotions
     VOICE_STYLES = {
         'neutral': '',
@@ -42,6 +123,25 @@ class Config:
         'vi-VN-HoaiMyNeural'
     ]
     
+    # Speaking styles each voice documents in the Azure voice gallery, limited to the
+    # styles in VOICE_STYLES. Used for /voices when the backend's voice list carries
+    # no StyleList; voices without documented styles are left out.
+    VOICE_STYLE_SUPPORT = {
+        'en-US-AriaNeural': [
+            'angry', 'cheerful', 'excited', 'friendly', 'hopeful', 'sad',
+            'shouting', 'terrified', 'unfriendly', 'whispering'
+        ],
+        'en-US-JennyNeural': [
+            'angry', 'cheerful', 'excited', 'friendly', 'hopeful', 'sad',
+            'shouting', 'terrified', 'unfriendly', 'whispering'
+        ],
+        'en-US-GuyNeural': [
+            'angry', 'cheerful', 'excited', 'friendly', 'hopeful', 'sad',
+            'shouting', 'terrified', 'unfriendly', 'whispering'
+        ],
+        'en-GB-SoniaNeural': ['cheerful', 'sad']
+    }
+    
     # Vietnamese specific voices
     VIETNAMESE_VOICES = {
         'male': 'vi-VN-NamMinhNeural',
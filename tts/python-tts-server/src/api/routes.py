@@ -1,10 +1,71 @@
-from flask import Flask, request, jsonify, Response
+from flask import Flask, request, jsonify, Response, send_file, stream_with_context
+from flask_sock import Sock
 import asyncio
+import base64
+import concurrent.futures
+import json
+import os
+import time
+from collections import deque
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+from simple_websocket import ConnectionClosed
+from config import config
 from src.services.tts_service import TTSService
-from src.models.tts_models import TTSRequest
+from src.models.tts_models import TTSRequest, BatchItemResult, JobRequest, ProgramRequest
+from src.services.admission import AdmissionRejected
+from src.services.resilient_backend import CircuitOpenError
+from src.services.transcoder import content_type_for_extension, get_output_format
+from src.services.job_queue import JobQueue
+from src.utils.async_runner import AsyncRunner
+from src.utils.metrics import HTTP_IN_FLIGHT, HTTP_REQUESTS, observe_stage
+from src.utils.text_splitter import SentenceAccumulator
+from src.utils.zip_stream import ZipStream
 
 app = Flask(__name__)
+sock = Sock(app)
 tts_service = TTSService()
+async_runner = AsyncRunner()
+
+# Keep the voice list current without refreshing it on the request path
+async_runner.run(tts_service.voice_catalog.start())
+
+def _is_reloader_parent():
+    """In debug mode app.run re-executes this script in a child process that serves requests"""
+    return __name__ == '__main__' and config.DEBUG and os.environ.get('WERKZEUG_RUN_MAIN') != 'true'
+
+job_queue = None
+if config.JOBS_ENABLED and not _is_reloader_parent():
+    job_queue = JobQueue(
+        tts_service,
+        db_path=config.JOBS_DB_PATH,
+        audio_dir=config.JOBS_AUDIO_DIR,
+        workers=config.JOB_WORKERS,
+        retention_seconds=config.JOB_RETENTION_SECONDS,
+        stale_seconds=config.JOB_STALE_SECONDS
+    )
+    async_runner.run(job_queue.start())
+
+@app.before_request
+def start_request_metrics():
+    HTTP_IN_FLIGHT.inc()
+
+@app.after_request
+def record_request_metrics(response):
+    """Count the request and time how long the response body takes to write"""
+    HTTP_REQUESTS.labels(
+        endpoint=request.url_rule.rule if request.url_rule else 'unmatched',
+        method=request.method,
+        status=response.status_code
+    ).inc()
+
+    handled_at = time.perf_counter()
+
+    def finish():
+        observe_stage('response_write', time.perf_counter() - handled_at)
+        HTTP_IN_FLIGHT.dec()
+
+    response.call_on_close(finish)
+    return response
 
 @app.route('/synthesize', methods=['POST'])
 def synthesize():
@@ -21,26 +82,23 @@ def synthesize():
         except Exception as e:
             return jsonify({'error': f'Invalid request data: {str(e)}'}), 400
         
-        # Call service method
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        
-        try:
-            result = loop.run_until_complete(tts_service.synthesize_speech(tts_request))
-        finally:
-            loop.close()
+        # Call service method on the shared event loop
+        result = async_runner.run(
+            tts_service.synthesize_speech(tts_request),
+            timeout=config.SYNTHESIS_TIMEOUT
+        )
         
         # Handle service response
         if not result['success']:
-            return jsonify({'error': result['error']}), result['status_code']
+            return _error_response(result)
         
         # Return audio with metadata in headers
+        output_format = get_output_format(tts_request.output_format, tts_request.quality)
         response = Response(
             result['audio_data'],
-            mimetype='audio/mpeg',
+            mimetype=output_format.content_type,
             headers={
-                'Content-Disposition': 'attachment; filename=tts.mp3',
-                'Content-Type': 'audio/mpeg',
+                'Content-Disposition': f'attachment; filename=tts.{output_format.extension}',
                 'X-Duration-Seconds': str(result['response'].duration_seconds),
                 'X-Language': result['response'].language,
                 'X-Gender': result['response'].gender,
@@ -48,9 +106,14 @@ def synthesize():
                 'X-Voice-Name': result['response'].voice_name
             }
         )
+        if result['response'].sentences_reused is not None:
+            response.headers['X-Sentences-Reused'] = str(result['response'].sentences_reused)
+            response.headers['X-Sentences-Synthesized'] = str(result['response'].sentences_synthesized)
         
         return response
         
+    except concurrent.futures.TimeoutError:
+        return _timeout_response()
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -67,24 +130,440 @@ def synthesize_json():
         except Exception as e:
             return jsonify({'error': f'Invalid request data: {str(e)}'}), 400
         
-        # Call service method
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
+        # Call service method on the shared event loop, keeping the audio for audio_url
+        result = async_runner.run(
+            tts_service.synthesize_speech(tts_request, persist=True),
+            timeout=config.SYNTHESIS_TIMEOUT
+        )
+        
+        # Handle service response
+        if not result['success']:
+            return _error_response(result)
+        
+        return jsonify(result['response'].dict()), result['status_code']
+        
+    except concurrent.futures.TimeoutError:
+        return _timeout_response()
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/synthesize/stream', methods=['POST'])
+def synthesize_stream():
+    """
+    TTS synthesis endpoint - streams audio chunks as they are generated.
+
+    Returns chunked audio/mpeg by default. Clients that send
+    'Accept: text/event-stream' get server-sent events instead: one 'audio'
+    event per chunk (base64) and a final 'metadata' event with the duration.
+    """
+    try:
+        data = request.get_json()
+        if not data:
+            return jsonify({'error': 'JSON data required'}), 400
         
         try:
-            result = loop.run_until_complete(tts_service.synthesize_speech(tts_request))
-        finally:
-            loop.close()
+            tts_request = TTSRequest(**data)
+        except Exception as e:
+            return jsonify({'error': f'Invalid request data: {str(e)}'}), 400
         
-        # Handle service response
+        result = tts_service.prepare_stream(tts_request)
         if not result['success']:
-            return jsonify({'error': result['error']}), result['status_code']
+            return _error_response(result)
+        
+        events = async_runner.iterate(result['stream'], timeout=config.SYNTHESIS_TIMEOUT)
+        
+        # Wait for the first chunk so admission and connection errors still get a proper status
+        try:
+            first_event = next(events)
+        except AdmissionRejected as e:
+            return _error_response({'error': str(e), 'status_code': 429, 'retry_after': e.retry_after})
+        except CircuitOpenError as e:
+            return _error_response({'error': str(e), 'status_code': 503, 'retry_after': e.retry_after})
+        events = _prepend(first_event, events)
+        headers = {
+            'X-Language': tts_request.language,
+            'X-Gender': tts_request.gender,
+            'X-Emotion': tts_request.emotion,
+            'X-Voice-Name': result['voice_name'],
+            'X-Accel-Buffering': 'no',
+            'Cache-Control': 'no-cache'
+        }
+        
+        if 'text/event-stream' in request.headers.get('Accept', ''):
+            return Response(
+                stream_with_context(_stream_events(events)),
+                mimetype='text/event-stream',
+                headers=headers
+            )
+        
+        output_format = result['output_format']
+        headers['Content-Disposition'] = f'attachment; filename=tts.{output_format.extension}'
+        return Response(
+            stream_with_context(_stream_audio(events)),
+            mimetype=output_format.content_type,
+            headers=headers
+        )
+        
+    except concurrent.futures.TimeoutError:
+        return _timeout_response()
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+def _timeout_response():
+    """Build the 504 response for a synthesis that outlived SYNTHESIS_TIMEOUT"""
+    return jsonify({'error': f'Synthesis timed out after {config.SYNTHESIS_TIMEOUT}s'}), 504
+
+def _error_response(result):
+    """Build the JSON error response for a failed service result"""
+    response = jsonify({'error': result['error']})
+    response.status_code = result['status_code']
+    if 'retry_after' in result:
+        response.headers['Retry-After'] = str(result['retry_after'])
+    return response
+
+def _prepend(first, rest):
+    yield first
+    yield from rest
+
+def _stream_audio(events):
+    """Yield raw audio bytes; an error aborts the chunked response mid-stream"""
+    for event in events:
+        if event['type'] == 'audio':
+            yield event['data']
+
+def _stream_events(events):
+    """Yield server-sent events for audio chunks, final metadata and errors"""
+    try:
+        for event in events:
+            if event['type'] == 'audio':
+                payload = base64.b64encode(event['data']).decode('ascii')
+            else:
+                payload = json.dumps(event['response'].dict())
+            yield f"event: {event['type']}\ndata: {payload}\n\n"
+    except Exception as e:
+        yield f"event: error\ndata: {json.dumps({'error': str(e)})}\n\n"
+
+@app.route('/synthesize/program', methods=['POST'])
+def synthesize_program():
+    """Render ordered segments into one clip and return its URL with a timing map"""
+    try:
+        data = request.get_json()
+        if not data:
+            return jsonify({'error': 'JSON data required'}), 400
+        
+        try:
+            program_request = ProgramRequest(**data)
+        except Exception as e:
+            return jsonify({'error': f'Invalid request data: {str(e)}'}), 400
+        
+        result = async_runner.run(
+            tts_service.synthesize_program(program_request),
+            timeout=config.SYNTHESIS_TIMEOUT
+        )
+        
+        if not result['success']:
+            return _error_response(result)
         
         return jsonify(result['response'].dict()), result['status_code']
         
+    except concurrent.futures.TimeoutError:
+        return _timeout_response()
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@sock.route('/synthesize/ws')
+def synthesize_websocket(ws):
+    """
+    Incremental text-in / audio-out synthesis over a WebSocket.
+
+    The client sends JSON messages: an optional {"type": "start"} with
+    language, gender, emotion, output_format and quality, then
+    {"type": "text", "text": ...} fragments as they are produced, and finally
+    {"type": "end"}. Every sentence starts synthesizing as soon as it is
+    complete. In sentence order, the server sends a {"type": "sentence"}
+    message followed by the sentence's audio, a complete file in the output
+    format, as a binary message, and closes with {"type": "done"}.
+    """
+    accumulator = SentenceAccumulator(config.CHUNK_MAX_CHARS)
+    semaphore = asyncio.Semaphore(config.WEBSOCKET_SENTENCE_CONCURRENCY)
+    settings = {}
+    pending = deque()
+    totals = {'sentences': 0, 'duration_seconds': 0.0}
+
+    async def synthesize_sentence(tts_request):
+        async with semaphore:
+            return await tts_service.synthesize_speech(tts_request)
+
+    def start(sentences):
+        for sentence in sentences:
+            index = totals['sentences']
+            totals['sentences'] += 1
+            future = async_runner.submit(synthesize_sentence(TTSRequest(text=sentence, **settings)))
+            pending.append((index, sentence, future))
+
+    def send_ready(wait):
+        """Send finished sentences in order, stopping at the first unfinished one unless waiting"""
+        while pending and (wait or pending[0][2].done()):
+            index, sentence, future = pending.popleft()
+            try:
+                result = future.result(config.SYNTHESIS_TIMEOUT)
+            except concurrent.futures.TimeoutError:
+                # Give up on this sentence only; the session carries on with the next one
+                future.cancel()
+                result = {
+                    'success': False,
+                    'error': f'Synthesis timed out after {config.SYNTHESIS_TIMEOUT}s',
+                    'status_code': 504
+                }
+            if not result['success']:
+                ws.send(json.dumps({
+                    'type': 'error',
+                    'index': index,
+                    'text': sentence,
+                    'error': result['error'],
+                    'status_code': result['status_code']
+                }))
+                continue
+            totals['duration_seconds'] += result['response'].duration_seconds
+            ws.send(json.dumps({
+                'type': 'sentence',
+                'index': index,
+                'text': sentence,
+                'duration_seconds': result['response'].duration_seconds,
+                'voice_name': result['response'].voice_name
+            }))
+            ws.send(result['audio_data'])
+
+    try:
+        while True:
+            message = ws.receive(timeout=config.WEBSOCKET_POLL_INTERVAL)
+            if message is not None:
+                try:
+                    data = json.loads(message)
+                    kind = data.get('type')
+                except (TypeError, ValueError, AttributeError):
+                    ws.send(json.dumps({'type': 'error', 'error': 'Messages must be JSON objects'}))
+                    continue
+
+                if kind == 'start' and not totals['sentences'] and not pending:
+                    keys = ('language', 'gender', 'emotion', 'use_cache', 'output_format', 'quality')
+                    fields = {key: data[key] for key in keys if key in data}
+                    try:
+                        settings_request = TTSRequest(text='', **fields)
+                    except Exception as e:
+                        ws.send(json.dumps({'type': 'error', 'error': f'Invalid request data: {str(e)}'}))
+                        continue
+                    error = tts_service._validate_output(settings_request.output_format, settings_request.quality)
+                    if error:
+                        ws.send(json.dumps({'type': 'error', 'error': error['error'], 'status_code': error['status_code']}))
+                        continue
+                    settings = fields
+                elif kind == 'text':
+                    start(accumulator.feed(str(data.get('text', ''))))
+                elif kind == 'end':
+                    start(accumulator.flush())
+                    send_ready(wait=True)
+                    ws.send(json.dumps({
+                        'type': 'done',
+                        'sentences': totals['sentences'],
+                        'duration_seconds': round(totals['duration_seconds'], 3)
+                    }))
+                    break
+                else:
+                    ws.send(json.dumps({'type': 'error', 'error': f'Unexpected message type: {kind}'}))
+
+            send_ready(wait=False)
+    except ConnectionClosed:
+        pass
+    finally:
+        # The client went away; stop syntheses nobody will receive
+        for _, _, future in pending:
+            future.cancel()
+
+@app.route('/synthesize/batch', methods=['POST'])
+def synthesize_batch():
+    """
+    Batch TTS synthesis endpoint - returns a ZIP archive.
+
+    Request body: {"items": [TTSRequest, ...]}. The archive holds one clip per
+    successful item ('<index>.mp3', or the extension of the item's
+    output_format) and a final 'manifest.json' with the
+    per-item TTSResponse or error, so one bad item does not fail the batch.
+    """
+    try:
+        data = request.get_json()
+        if not data or not isinstance(data.get('items'), list) or not data['items']:
+            return jsonify({'error': 'JSON data with a non-empty items list required'}), 400
+        
+        if len(data['items']) > config.BATCH_MAX_ITEMS:
+            return jsonify({'error': f'Batch exceeds maximum of {config.BATCH_MAX_ITEMS} items'}), 400
+        
+        # Validate each item on its own so invalid items are reported, not fatal
+        tts_requests = []
+        invalid_items = []
+        for index, item in enumerate(data['items']):
+            try:
+                tts_requests.append((index, TTSRequest(**item)))
+            except Exception as e:
+                invalid_items.append(BatchItemResult(
+                    index=index,
+                    status_code=400,
+                    error=f'Invalid request data: {str(e)}'
+                ))
+        
+        results = async_runner.iterate(
+            tts_service.synthesize_batch([tts_request for _, tts_request in tts_requests]),
+            timeout=config.SYNTHESIS_TIMEOUT
+        )
+        indexes = [index for index, _ in tts_requests]
+        
+        return Response(
+            stream_with_context(_stream_batch_zip(results, indexes, invalid_items)),
+            mimetype='application/zip',
+            headers={'Content-Disposition': 'attachment; filename=tts_batch.zip'}
+        )
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+def _stream_batch_zip(results, indexes, manifest):
+    """Yield the archive entry by entry as batch items complete"""
+    archive = ZipStream()
+    width = len(str(len(indexes) + len(manifest)))
+    pending = set(range(len(indexes)))
+    
+    try:
+        for position, result in results:
+            pending.discard(position)
+            index = indexes[position]
+            if result['success']:
+                response = result['response']
+                extension = get_output_format(response.output_format, response.quality).extension
+                filename = f"{index:0{width}d}.{extension}"
+                yield archive.add(filename, result['audio_data'])
+                manifest.append(BatchItemResult(
+                    index=index,
+                    status_code=result['status_code'],
+                    filename=filename,
+                    response=response
+                ))
+            else:
+                manifest.append(BatchItemResult(
+                    index=index,
+                    status_code=result['status_code'],
+                    error=result['error']
+                ))
+    except concurrent.futures.TimeoutError:
+        # Still finish the archive; items that did not complete in time are reported in the manifest
+        results.close()
+        for position in pending:
+            manifest.append(BatchItemResult(
+                index=indexes[position],
+                status_code=504,
+                error=f'Synthesis timed out after {config.SYNTHESIS_TIMEOUT}s'
+            ))
+    
+    manifest.sort(key=lambda item: item.index)
+    yield archive.add('manifest.json', json.dumps({'items': [item.dict() for item in manifest]}, indent=2))
+    yield archive.close()
+
+@app.route('/audio/<audio_id>', methods=['GET'])
+def get_audio(audio_id):
+    """
+    Serve stored audio by its content id.
+
+    Supports byte ranges for seeking and If-None-Match against the strong
+    ETag. The file is handed to the server's file wrapper, so servers that
+    support it send it with zero-copy sendfile.
+    """
+    path = tts_service.audio_store.path(audio_id)
+    if not path:
+        return jsonify({'error': f'Audio {audio_id} not found'}), 404
+    
+    try:
+        response = send_file(
+            path,
+            mimetype=content_type_for_extension(os.path.splitext(path)[1][1:]),
+            download_name=os.path.basename(path),
+            conditional=True,
+            etag=audio_id,
+            max_age=config.AUDIO_MAX_AGE
+        )
+    except FileNotFoundError:
+        # Evicted between the lookup and the open
+        return jsonify({'error': f'Audio {audio_id} not found'}), 404
+    
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    return response
+
+@app.route('/jobs', methods=['POST'])
+def create_job():
+    """Queue an asynchronous synthesis job - returns the job status"""
+    if not job_queue:
+        return jsonify({'error': 'Jobs are disabled'}), 404
+    
+    try:
+        data = request.get_json()
+        if not data:
+            return jsonify({'error': 'JSON data required'}), 400
+        
+        try:
+            job_request = JobRequest(**data)
+        except Exception as e:
+            return jsonify({'error': f'Invalid request data: {str(e)}'}), 400
+        
+        error = (
+            tts_service._validate_text(job_request.text)
+            or tts_service._validate_output(job_request.output_format, job_request.quality)
+        )
+        if error:
+            return _error_response(error)
+        
+        try:
+            job = async_runner.run(job_queue.submit(job_request))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        response = jsonify(job.dict())
+        response.status_code = 202
+        response.headers['Location'] = f"/jobs/{job.job_id}"
+        return response
+        
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """Get the status of an asynchronous synthesis job"""
+    if not job_queue:
+        return jsonify({'error': 'Jobs are disabled'}), 404
+    
+    job = async_runner.run(job_queue.get(job_id))
+    if not job:
+        return jsonify({'error': f'Job {job_id} not found'}), 404
+    return jsonify(job.dict())
+
+@app.route('/jobs/<job_id>/audio', methods=['GET'])
+def get_job_audio(job_id):
+    """Download the audio of a completed synthesis job"""
+    if not job_queue:
+        return jsonify({'error': 'Jobs are disabled'}), 404
+    
+    job = async_runner.run(job_queue.get(job_id))
+    if not job:
+        return jsonify({'error': f'Job {job_id} not found'}), 404
+    if job.status != JobQueue.COMPLETED:
+        return jsonify({'error': f'Job {job_id} is {job.status}'}), 409
+    
+    output_format = get_output_format(job.response.output_format, job.response.quality)
+    return send_file(
+        job_queue.audio_path(job_id, output_format.extension),
+        mimetype=output_format.content_type,
+        as_attachment=True,
+        download_name=f'{job_id}.{output_format.extension}'
+    )
+
 @app.route('/languages', methods=['GET'])
 def get_supported_languages():
     """Get supported languages"""
@@ -103,6 +582,23 @@ def get_supported_emotions():
     result = tts_service.get_supported_emotions()
     return jsonify(result)
 
+@app.route('/stats', methods=['GET'])
+def get_stats():
+    """Get synthesis cache, request coalescing, backend, voice catalog and job statistics"""
+    return jsonify({
+        'cache': tts_service.get_cache_stats(),
+        'backend': tts_service.get_backend_stats(),
+        'transcoder': tts_service.get_transcoder_stats(),
+        'single_flight': tts_service.get_single_flight_stats(),
+        'voice_catalog': tts_service.get_voice_catalog_stats(),
+        'jobs': job_queue.stats() if job_queue else {}
+    })
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Prometheus metrics in the text exposition format"""
+    return Response(generate_latest(), content_type=CONTENT_TYPE_LATEST)
+
 @app.route('/health', methods=['GET'])
 def health():
     """Health check endpoint"""
@@ -110,4 +606,4 @@ def health():
     return jsonify(result.dict())
 
 if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=5000, debug=True)
\ No newline at end of file
+    app.run(host=config.SERVER_HOST, port=config.SERVER_PORT, debug=config.DEBUG, threaded=True)
\ No newline at end of file
@@ -7,22 +7,108 @@ class TTSRequest(BaseModel):
     gender: str = 'female'
     emotion: str = 'neutral'
     output_filename: Optional[str] = None
+    use_cache: bool = True  # Set to False to bypass the synthesis cache
+    incremental: bool = False  # Opt in to reuse cached sentences of multi-sentence text
+    captions: bool = False  # Return per-word timings and SRT/VTT captions
+    output_format: str = 'mp3'  # 'mp3', 'opus', 'wav' or 'pcm'
+    quality: str = 'standard'  # 'low', 'standard' or 'high'
+
+class WordTiming(BaseModel):
+    word: str
+    start: float  # Seconds from the start of the audio
+    end: float
 
 class TTSResponse(BaseModel):
-    audio_url: str
+    audio_url: Optional[str] = None  # Not set for streamed responses
     duration_seconds: float
     language: str
     gender: str
     emotion: str
     voice_name: str
+    output_format: str = 'mp3'
+    quality: str = 'standard'
+    sentences_reused: Optional[int] = None  # Sentences served from the cache
+    sentences_synthesized: Optional[int] = None  # Sentences that had to be synthesized
+    words: Optional[List[WordTiming]] = None  # Set when captions were requested
+    srt: Optional[str] = None
+    vtt: Optional[str] = None
+
+class JobRequest(TTSRequest):
+    priority: str = 'normal'  # 'interactive', 'normal' or 'bulk'
+
+class JobStatus(BaseModel):
+    job_id: str
+    status: str  # 'queued', 'running', 'completed' or 'failed'
+    priority: str
+    created_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    error: Optional[str] = None
+    response: Optional[TTSResponse] = None
+
+class BatchItemResult(BaseModel):
+    index: int
+    status_code: int
+    filename: Optional[str] = None  # Name of the audio entry in the archive
+    response: Optional[TTSResponse] = None
+    error: Optional[str] = None
+
+class ProgramSegment(BaseModel):
+    content: str
+    segment_type: Optional[str] = None  # e.g. 'intro', 'main', 'outro'; echoed in the timing map
+    emotion: Optional[str] = None  # Defaults to the program's emotion
+    pause_before: float = 0.0  # Seconds of silence before the segment
+    pause_after: float = 0.0  # Seconds of silence after the segment
+    min_start: Optional[float] = None  # Earliest start offset in seconds; silence is added to reach it
+    min_end: Optional[float] = None  # Earliest end offset in seconds; silence is added to reach it
+
+class ProgramRequest(BaseModel):
+    segments: List[ProgramSegment]
+    language: str = 'en-US'
+    gender: str = 'female'
+    emotion: str = 'neutral'
+    gap_seconds: float = 0.0  # Silence between consecutive segments
+    use_cache: bool = True
+    captions: bool = False  # Return per-word timings and SRT/VTT captions for the whole program
+    output_format: str = 'mp3'  # 'mp3', 'opus', 'wav' or 'pcm'
+    quality: str = 'standard'  # 'low', 'standard' or 'high'
+
+class SegmentTiming(BaseModel):
+    index: int
+    segment_type: Optional[str] = None
+    emotion: str
+    start_seconds: float
+    end_seconds: float
+    duration_seconds: float
+
+class ProgramResponse(BaseModel):
+    audio_url: Optional[str] = None
+    duration_seconds: float
+    language: str
+    gender: str
+    voice_name: str
+    output_format: str = 'mp3'
+    quality: str = 'standard'
+    segments: List[SegmentTiming]
+    words: Optional[List[WordTiming]] = None
+    srt: Optional[str] = None
+    vtt: Optional[str] = None
 
 class SupportedLanguages(BaseModel):
     languages: List[str]
 
 class SupportedVoices(BaseModel):
-    voices: dict  # Will contain the voice mapping structure
+    voices: dict  # Default voice per locale and gender
+    styles: dict = {}  # Voices supporting each speaking style
 
 class HealthResponse(BaseModel):
     status: str
     available_languages: List[str]
-    available_emotions: List[str]
\ No newline at end of file
+    available_emotions: List[str]
+    in_flight: int = 0
+    queue_depth: int = 0
+    queue_wait_ms_avg: float = 0.0
+    queue_wait_ms_max: float = 0.0
+    admitted: int = 0
+    rejected: int = 0
+    backend_circuit: Optional[str] = None
\ No newline at end of file
@@ -0,0 +1,152 @@
+import asyncio
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Deque, Dict
+
+
+class AdmissionRejected(Exception):
+    """Raised when a synthesis cannot be admitted within the configured limits"""
+
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class _Waiter:
+    def __init__(self, voice_name: str, future: asyncio.Future):
+        self.voice_name = voice_name
+        self.future = future
+        self.enqueued_at = time.monotonic()
+
+
+class AdmissionController:
+    """
+    Limits how many syntheses run at once, globally and per voice.
+
+    Requests over the limit wait in a bounded FIFO queue for at most
+    max_queue_wait seconds. A full queue or an expired wait raises
+    AdmissionRejected with a Retry-After estimate, so callers fail fast
+    instead of piling up sockets and memory. Must be used from a single
+    event loop.
+    """
+
+    # Weight of the newest sample in the moving averages
+    SMOOTHING = 0.2
+
+    def __init__(
+        self,
+        max_concurrent: int,
+        max_per_voice: int,
+        max_queue: int,
+        max_queue_wait: float
+    ):
+        self.max_concurrent = max_concurrent
+        self.max_per_voice = max_per_voice
+        self.max_queue = max_queue
+        self.max_queue_wait = max_queue_wait
+
+        self._in_flight = 0
+        self._per_voice: Dict[str, int] = {}
+        self._queue: Deque[_Waiter] = deque()
+
+        self.admitted = 0
+        self.rejected = 0
+        self._queue_wait_avg = 0.0
+        self._queue_wait_max = 0.0
+        self._service_time_avg = 1.0
+
+    @asynccontextmanager
+    async def slot(self, voice_name: str):
+        """Hold a synthesis slot for voice_name for the duration of the block"""
+        await self._acquire(voice_name)
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self._release(voice_name, time.monotonic() - started)
+
+    def stats(self) -> Dict:
+        return {
+            'in_flight': self._in_flight,
+            'queue_depth': len(self._queue),
+            'queue_wait_ms_avg': round(self._queue_wait_avg * 1000, 1),
+            'queue_wait_ms_max': round(self._queue_wait_max * 1000, 1),
+            'admitted': self.admitted,
+            'rejected': self.rejected
+        }
+
+    async def _acquire(self, voice_name: str):
+        if self._has_capacity(voice_name):
+            self._take(voice_name)
+            self._record_wait(0.0)
+            return
+
+        if len(self._queue) >= self.max_queue:
+            self.rejected += 1
+            raise AdmissionRejected('Server is at capacity, please retry later', self._retry_after())
+
+        waiter = _Waiter(voice_name, asyncio.get_running_loop().create_future())
+        self._queue.append(waiter)
+        try:
+            await asyncio.wait_for(waiter.future, self.max_queue_wait)
+        except asyncio.TimeoutError:
+            self._discard(waiter)
+            self.rejected += 1
+            raise AdmissionRejected('Timed out waiting for a synthesis slot', self._retry_after())
+        except asyncio.CancelledError:
+            self._discard(waiter)
+            if waiter.future.done() and not waiter.future.cancelled():
+                # The slot was granted just before the caller went away
+                self._release(voice_name, None)
+            raise
+
+        self._record_wait(time.monotonic() - waiter.enqueued_at)
+
+    def _release(self, voice_name: str, service_time):
+        self._in_flight -= 1
+        self._per_voice[voice_name] -= 1
+        if not self._per_voice[voice_name]:
+            del self._per_voice[voice_name]
+        if service_time is not None:
+            self._service_time_avg += self.SMOOTHING * (service_time - self._service_time_avg)
+        self._wake_waiters()
+
+    def _wake_waiters(self):
+        """Grant free slots to queued waiters in FIFO order, skipping voices at their limit"""
+        for waiter in list(self._queue):
+            if self._in_flight >= self.max_concurrent:
+                break
+            if waiter.future.done():
+                self._discard(waiter)
+            elif self._per_voice.get(waiter.voice_name, 0) < self.max_per_voice:
+                self._discard(waiter)
+                self._take(waiter.voice_name)
+                waiter.future.set_result(None)
+
+    def _has_capacity(self, voice_name: str) -> bool:
+        return (
+            self._in_flight < self.max_concurrent
+            and self._per_voice.get(voice_name, 0) < self.max_per_voice
+        )
+
+    def _take(self, voice_name: str):
+        self._in_flight += 1
+        self._per_voice[voice_name] = self._per_voice.get(voice_name, 0) + 1
+        self.admitted += 1
+
+    def _discard(self, waiter: _Waiter):
+        try:
+            self._queue.remove(waiter)
+        except ValueError:
+            pass
+
+    def _record_wait(self, wait: float):
+        self._queue_wait_avg += self.SMOOTHING * (wait - self._queue_wait_avg)
+        self._queue_wait_max = max(self._queue_wait_max, wait)
+
+    def _retry_after(self) -> int:
+        """Estimate seconds until the current backlog drains"""
+        backlog = len(self._queue) + self._in_flight
+        return max(1, math.ceil(self._service_time_avg * backlog / max(self.max_concurrent, 1)))
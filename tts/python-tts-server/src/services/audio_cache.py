@@ -0,0 +1,204 @@
+import hashlib
+import json
+import os
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class AudioCache:
+    """
+    Content-addressed cache for synthesized audio.
+
+    Entries are keyed by a hash of everything that affects the audio output.
+    Small clips live in a bounded in-memory LRU; every clip is also written to
+    a size-capped directory on disk, evicted least recently used first.
+    Each entry stores its metadata (duration, voice) next to the audio so a hit
+    needs no further processing. The lock only guards the in-memory indexes;
+    files are read and written outside it, so a slow disk never holds up
+    memory hits from other threads.
+    """
+
+    AUDIO_SUFFIX = '.mp3'
+    META_SUFFIX = '.json'
+
+    def __init__(
+        self,
+        cache_dir: str,
+        memory_max_bytes: int = 64 * 1024 * 1024,
+        memory_max_entry_bytes: int = 512 * 1024,
+        disk_max_bytes: int = 1024 * 1024 * 1024
+    ):
+        self.cache_dir = cache_dir
+        self.memory_max_bytes = memory_max_bytes
+        self.memory_max_entry_bytes = memory_max_entry_bytes
+        self.disk_max_bytes = disk_max_bytes
+
+        self._lock = threading.Lock()
+        self._memory: 'OrderedDict[str, Tuple[bytes, Dict]]' = OrderedDict()
+        self._memory_bytes = 0
+        self._disk: 'OrderedDict[str, int]' = OrderedDict()
+        self._disk_bytes = 0
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.memory_evictions = 0
+        self.disk_evictions = 0
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._load_disk_index()
+
+    @staticmethod
+    def make_key(text: str, voice_name: str, rate: str, pitch: str, output_format: str = 'mp3') -> str:
+        """Build the cache key for a synthesis request"""
+        normalized_text = unicodedata.normalize('NFC', ' '.join(text.split()))
+        payload = json.dumps(
+            [normalized_text, voice_name, rate, pitch, output_format],
+            ensure_ascii=False
+        )
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[Tuple[bytes, Dict]]:
+        """Return (audio_data, metadata) for key, or None on a miss"""
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return entry
+
+            if key not in self._disk:
+                self.misses += 1
+                return None
+
+        try:
+            with open(self._path(key, self.AUDIO_SUFFIX), 'rb') as f:
+                audio_data = f.read()
+            with open(self._path(key, self.META_SUFFIX), 'r', encoding='utf-8') as f:
+                metadata = json.load(f)
+        except (OSError, ValueError):
+            with self._lock:
+                self._forget_disk_entry(key)
+                self.misses += 1
+            self._remove_files(key)
+            return None
+
+        with self._lock:
+            if key in self._disk:
+                self._disk.move_to_end(key)
+            self.disk_hits += 1
+            self._put_memory(key, audio_data, metadata)
+        self._touch(key)
+        return audio_data, metadata
+
+    def put(self, key: str, audio_data: bytes, metadata: Dict):
+        """Store audio and its metadata in both tiers"""
+        with self._lock:
+            self._put_memory(key, audio_data, metadata)
+        self._put_disk(key, audio_data, metadata)
+
+    def stats(self) -> Dict:
+        """Get hit/miss/eviction counters and current tier sizes"""
+        with self._lock:
+            return {
+                'memory_hits': self.memory_hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'memory_evictions': self.memory_evictions,
+                'disk_evictions': self.disk_evictions,
+                'memory_entries': len(self._memory),
+                'memory_bytes': self._memory_bytes,
+                'disk_entries': len(self._disk),
+                'disk_bytes': self._disk_bytes
+            }
+
+    def _put_memory(self, key: str, audio_data: bytes, metadata: Dict):
+        if len(audio_data) > self.memory_max_entry_bytes:
+            return
+        if key in self._memory:
+            self._memory_bytes -= len(self._memory.pop(key)[0])
+        self._memory[key] = (audio_data, metadata)
+        self._memory_bytes += len(audio_data)
+
+        while self._memory_bytes > self.memory_max_bytes and self._memory:
+            _, (evicted_data, _) = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted_data)
+            self.memory_evictions += 1
+
+    def _put_disk(self, key: str, audio_data: bytes, metadata: Dict):
+        if len(audio_data) > self.disk_max_bytes:
+            return
+        try:
+            os.makedirs(os.path.dirname(self._path(key, '')), exist_ok=True)
+            self._write_atomic(self._path(key, self.META_SUFFIX), json.dumps(metadata).encode('utf-8'))
+            self._write_atomic(self._path(key, self.AUDIO_SUFFIX), audio_data)
+        except OSError as e:
+            logger.error("Error writing cache entry %s: %s", key, e)
+            return
+
+        evicted = []
+        with self._lock:
+            if key in self._disk:
+                self._disk_bytes -= self._disk.pop(key)
+            self._disk[key] = len(audio_data)
+            self._disk_bytes += len(audio_data)
+
+            while self._disk_bytes > self.disk_max_bytes and self._disk:
+                evicted_key = next(iter(self._disk))
+                self._forget_disk_entry(evicted_key)
+                self.disk_evictions += 1
+                evicted.append(evicted_key)
+
+        for evicted_key in evicted:
+            self._remove_files(evicted_key)
+
+    def _forget_disk_entry(self, key: str):
+        """Drop key from the disk index; the caller holds the lock and removes the files afterwards"""
+        self._disk_bytes -= self._disk.pop(key, 0)
+
+    def _remove_files(self, key: str):
+        for suffix in (self.AUDIO_SUFFIX, self.META_SUFFIX):
+            try:
+                os.remove(self._path(key, suffix))
+            except OSError:
+                pass
+
+    def _load_disk_index(self):
+        """Rebuild the LRU order of the disk tier from file modification times"""
+        entries = []
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if not name.endswith(self.AUDIO_SUFFIX):
+                    continue
+                key = name[:-len(self.AUDIO_SUFFIX)]
+                path = os.path.join(root, name)
+                if not os.path.exists(self._path(key, self.META_SUFFIX)):
+                    continue
+                stat = os.stat(path)
+                entries.append((stat.st_mtime, key, stat.st_size))
+
+        for _, key, size in sorted(entries):
+            self._disk[key] = size
+            self._disk_bytes += size
+
+    def _path(self, key: str, suffix: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], key + suffix)
+
+    def _touch(self, key: str):
+        try:
+            os.utime(self._path(key, self.AUDIO_SUFFIX))
+        except OSError:
+            pass
+
+    @staticmethod
+    def _write_atomic(path: str, data: bytes):
+        # Per-thread temporary name, since writers of the same key no longer exclude each other
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
@@ -0,0 +1,112 @@
+import hashlib
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+
+class AudioStore:
+    """
+    Content-addressed store for audio handed out by URL.
+
+    Each clip is saved once under the SHA-256 of its bytes, which doubles as
+    its public id and strong ETag. The store is capped in size and evicts the
+    least recently stored or served clips first. Files keep the extension of
+    their audio format so they can be served with the right content type.
+    Files are written and removed outside the index lock.
+    """
+
+    ID_PATTERN = re.compile(r'^[0-9a-f]{64}$')
+    EXTENSION_PATTERN = re.compile(r'^[a-z0-9]{1,8}$')
+
+    def __init__(self, store_dir: str, max_bytes: int):
+        self.store_dir = os.path.abspath(store_dir)
+        self.max_bytes = max_bytes
+
+        self._lock = threading.Lock()
+        self._index: 'OrderedDict[str, Tuple[int, str]]' = OrderedDict()
+        self._total_bytes = 0
+
+        os.makedirs(self.store_dir, exist_ok=True)
+        self._load_index()
+
+    def put(self, audio_data: bytes, extension: str = 'mp3') -> str:
+        """Store audio and return its id; storing the same bytes again is a no-op"""
+        audio_id = hashlib.sha256(audio_data).hexdigest()
+
+        with self._lock:
+            stored_extension = self._stored_extension(audio_id)
+        if stored_extension:
+            self._touch(self._path(audio_id, stored_extension))
+            return audio_id
+
+        path = self._path(audio_id, extension)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(audio_data)
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            if self._stored_extension(audio_id):
+                # Another thread stored the same bytes meanwhile
+                return audio_id
+            self._index[audio_id] = (len(audio_data), extension)
+            self._total_bytes += len(audio_data)
+            evicted = self._evict(keep=audio_id)
+
+        for evicted_id, evicted_extension in evicted:
+            try:
+                os.remove(self._path(evicted_id, evicted_extension))
+            except OSError:
+                pass
+        return audio_id
+
+    def path(self, audio_id: str) -> Optional[str]:
+        """Return the file path for an id, or None if it is unknown or evicted"""
+        if not self.ID_PATTERN.match(audio_id):
+            return None
+        with self._lock:
+            extension = self._stored_extension(audio_id)
+        return self._path(audio_id, extension) if extension else None
+
+    def _stored_extension(self, audio_id: str) -> Optional[str]:
+        """Mark a stored clip as recently used and return its extension; the caller holds the lock"""
+        if audio_id not in self._index:
+            return None
+        self._index.move_to_end(audio_id)
+        return self._index[audio_id][1]
+
+    def _evict(self, keep: str) -> List[Tuple[str, str]]:
+        """Drop the least recently used clips from the index and return (id, extension) of their files"""
+        evicted = []
+        while self._total_bytes > self.max_bytes and len(self._index) > 1:
+            audio_id = next(iter(self._index))
+            if audio_id == keep:
+                self._index.move_to_end(audio_id)
+                continue
+            size, extension = self._index.pop(audio_id)
+            self._total_bytes -= size
+            evicted.append((audio_id, extension))
+        return evicted
+
+    def _load_index(self):
+        entries = []
+        for name in os.listdir(self.store_dir):
+            audio_id, _, extension = name.partition('.')
+            if self.ID_PATTERN.match(audio_id) and self.EXTENSION_PATTERN.match(extension):
+                stat = os.stat(os.path.join(self.store_dir, name))
+                entries.append((stat.st_mtime, audio_id, stat.st_size, extension))
+        for _, audio_id, size, extension in sorted(entries):
+            self._index[audio_id] = (size, extension)
+            self._total_bytes += size
+
+    def _path(self, audio_id: str, extension: str) -> str:
+        return os.path.join(self.store_dir, f"{audio_id}.{extension}")
+
+    @staticmethod
+    def _touch(path: str):
+        try:
+            os.utime(path)
+        except OSError:
+            pass
@@ -0,0 +1,285 @@
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Dict, List, Optional
+from src.models.tts_models import JobRequest, JobStatus, TTSRequest, TTSResponse
+from src.services.transcoder import get_output_format
+
+
+class JobQueue:
+    """
+    Asynchronous synthesis jobs backed by a local SQLite database.
+
+    Jobs are persisted before they are queued, so queued and interrupted jobs
+    are picked up again after a restart. A pool of workers on the shared event
+    loop processes them in priority order, lower values first, and finished
+    audio is kept on disk until the retention period expires.
+
+    Workers claim a job with a conditional update, so several processes can
+    share one database without running a job twice. A job left running for
+    longer than stale_seconds is assumed abandoned by a process that died and
+    is queued again.
+    """
+
+    PRIORITIES = {'interactive': 0, 'normal': 1, 'bulk': 2}
+
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    COMPLETED = 'completed'
+    FAILED = 'failed'
+
+    def __init__(
+        self,
+        tts_service,
+        db_path: str,
+        audio_dir: str,
+        workers: int,
+        retention_seconds: int,
+        stale_seconds: float = 10 * 60
+    ):
+        self.tts_service = tts_service
+        self.db_path = db_path
+        self.audio_dir = os.path.abspath(audio_dir)
+        self.workers = workers
+        self.retention_seconds = retention_seconds
+        self.stale_seconds = stale_seconds
+
+        self._db_lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._running = set()  # Jobs claimed by this process
+
+    async def start(self):
+        """Open the database, re-queue unfinished jobs and start the workers"""
+        if self._tasks:
+            return
+
+        os.makedirs(self.audio_dir, exist_ok=True)
+        if os.path.dirname(self.db_path):
+            os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        self._db = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        await asyncio.to_thread(self._create_schema)
+
+        self._queue = asyncio.PriorityQueue()
+        await asyncio.to_thread(self._requeue_stale, time.time() - self.stale_seconds, set())
+        for row in await asyncio.to_thread(self._load_queued):
+            self._queue.put_nowait((row['priority'], row['created_at'], row['id']))
+
+        self._tasks = [asyncio.ensure_future(self._worker()) for _ in range(self.workers)]
+        self._tasks.append(asyncio.ensure_future(self._maintain()))
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self._db:
+            self._db.close()
+            self._db = None
+
+    async def submit(self, request: JobRequest) -> JobStatus:
+        """Persist a new job and queue it for processing"""
+        if request.priority not in self.PRIORITIES:
+            raise ValueError(f"Invalid priority. Choose from: {', '.join(self.PRIORITIES)}")
+
+        job_id = uuid.uuid4().hex
+        priority = self.PRIORITIES[request.priority]
+        created_at = time.time()
+        tts_request = TTSRequest(**request.dict(exclude={'priority'}))
+
+        await asyncio.to_thread(
+            self._execute,
+            'INSERT INTO jobs (id, status, priority, request, created_at) VALUES (?, ?, ?, ?, ?)',
+            (job_id, self.QUEUED, priority, tts_request.json(), created_at)
+        )
+        self._queue.put_nowait((priority, created_at, job_id))
+        return await self.get(job_id)
+
+    async def get(self, job_id: str) -> Optional[JobStatus]:
+        row = await asyncio.to_thread(self._fetch_job, job_id)
+        return self._to_status(row) if row else None
+
+    def audio_path(self, job_id: str, extension: str = 'mp3') -> str:
+        """Return where a job's audio is kept; the extension follows the job's output format"""
+        return os.path.join(self.audio_dir, f"{job_id}.{extension}")
+
+    def stats(self) -> Dict:
+        with self._db_lock:
+            rows = self._db.execute('SELECT status, COUNT(*) AS count FROM jobs GROUP BY status').fetchall()
+        return {row['status']: row['count'] for row in rows}
+
+    async def _worker(self):
+        while True:
+            _, _, job_id = await self._queue.get()
+            try:
+                await self._process(job_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                await asyncio.to_thread(self._finish, job_id, self.FAILED, None, str(e))
+            finally:
+                self._queue.task_done()
+
+    async def _process(self, job_id: str):
+        claimed = await asyncio.to_thread(
+            self._execute,
+            'UPDATE jobs SET status = ?, started_at = ? WHERE id = ? AND status = ?',
+            (self.RUNNING, time.time(), job_id, self.QUEUED)
+        )
+        if not claimed:
+            # Finished, deleted or already taken by another worker
+            return
+
+        self._running.add(job_id)
+        try:
+            await self._run(job_id)
+        finally:
+            self._running.discard(job_id)
+
+    async def _run(self, job_id: str):
+        row = await asyncio.to_thread(self._fetch_job, job_id)
+        tts_request = TTSRequest(**json.loads(row['request']))
+        # Jobs run on the server, so a caller-supplied output path is not honoured
+        tts_request.output_filename = None
+        result = await self.tts_service.synthesize_speech(tts_request)
+
+        if result['status_code'] == 429:
+            # The server is saturated by interactive traffic; try again later
+            await asyncio.to_thread(
+                self._execute,
+                'UPDATE jobs SET status = ? WHERE id = ? AND status = ?',
+                (self.QUEUED, job_id, self.RUNNING)
+            )
+            asyncio.get_running_loop().call_later(
+                result['retry_after'],
+                self._queue.put_nowait,
+                (row['priority'], row['created_at'], job_id)
+            )
+            return
+
+        if not result['success']:
+            await asyncio.to_thread(self._finish, job_id, self.FAILED, None, result['error'])
+            return
+
+        extension = get_output_format(tts_request.output_format, tts_request.quality).extension
+        await asyncio.to_thread(self._write_audio, self.audio_path(job_id, extension), result['audio_data'])
+        response = result['response'].copy(update={'audio_url': f"/jobs/{job_id}/audio"})
+        await asyncio.to_thread(self._finish, job_id, self.COMPLETED, response.json(), None)
+
+    async def _maintain(self):
+        """Re-queue abandoned jobs, and delete finished jobs and their audio once the retention period has passed"""
+        interval = max(1, min(self.retention_seconds, self.stale_seconds, 3600))
+        while True:
+            stale = await asyncio.to_thread(
+                self._requeue_stale, time.time() - self.stale_seconds, set(self._running)
+            )
+            for row in stale:
+                self._queue.put_nowait((row['priority'], row['created_at'], row['id']))
+
+            expired = await asyncio.to_thread(self._delete_expired, time.time() - self.retention_seconds)
+            for path in expired:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            await asyncio.sleep(interval)
+
+    def _to_status(self, row: sqlite3.Row) -> JobStatus:
+        priority_names = {value: name for name, value in self.PRIORITIES.items()}
+        return JobStatus(
+            job_id=row['id'],
+            status=row['status'],
+            priority=priority_names.get(row['priority'], 'normal'),
+            created_at=row['created_at'],
+            started_at=row['started_at'],
+            finished_at=row['finished_at'],
+            error=row['error'],
+            response=TTSResponse(**json.loads(row['response'])) if row['response'] else None
+        )
+
+    def _create_schema(self):
+        self._execute('''
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                status TEXT NOT NULL,
+                priority INTEGER NOT NULL,
+                request TEXT NOT NULL,
+                response TEXT,
+                error TEXT,
+                created_at REAL NOT NULL,
+                started_at REAL,
+                finished_at REAL
+            )
+        ''')
+        self._execute('CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, finished_at)')
+
+    def _load_queued(self) -> List[sqlite3.Row]:
+        with self._db_lock:
+            return self._db.execute(
+                'SELECT id, priority, created_at FROM jobs WHERE status = ?', (self.QUEUED,)
+            ).fetchall()
+
+    def _requeue_stale(self, cutoff: float, exclude: set) -> List[sqlite3.Row]:
+        """Queue jobs that started running before cutoff again, except those in exclude"""
+        with self._db_lock, self._db:
+            rows = self._db.execute(
+                'SELECT id, priority, created_at FROM jobs WHERE status = ? AND started_at < ?',
+                (self.RUNNING, cutoff)
+            ).fetchall()
+            requeued = []
+            for row in rows:
+                if row['id'] in exclude:
+                    continue
+                cursor = self._db.execute(
+                    'UPDATE jobs SET status = ? WHERE id = ? AND status = ? AND started_at < ?',
+                    (self.QUEUED, row['id'], self.RUNNING, cutoff)
+                )
+                if cursor.rowcount:
+                    requeued.append(row)
+        return requeued
+
+    def _fetch_job(self, job_id: str) -> Optional[sqlite3.Row]:
+        with self._db_lock:
+            return self._db.execute('SELECT * FROM jobs WHERE id = ?', (job_id,)).fetchone()
+
+    def _finish(self, job_id: str, status: str, response: Optional[str], error: Optional[str]):
+        self._execute(
+            'UPDATE jobs SET status = ?, response = ?, error = ?, finished_at = ? WHERE id = ?',
+            (status, response, error, time.time(), job_id)
+        )
+
+    def _delete_expired(self, cutoff: float) -> List[str]:
+        """Delete finished jobs older than cutoff and return the audio paths they may have left"""
+        with self._db_lock, self._db:
+            rows = self._db.execute(
+                'SELECT id, request FROM jobs WHERE status IN (?, ?) AND finished_at < ?',
+                (self.COMPLETED, self.FAILED, cutoff)
+            ).fetchall()
+            self._db.executemany('DELETE FROM jobs WHERE id = ?', [(row['id'],) for row in rows])
+        paths = []
+        for row in rows:
+            request = json.loads(row['request'])
+            try:
+                extension = get_output_format(request.get('output_format', 'mp3'), request.get('quality', 'standard')).extension
+            except ValueError:
+                extension = 'mp3'
+            paths.append(self.audio_path(row['id'], extension))
+        return paths
+
+    @staticmethod
+    def _write_audio(path: str, audio_data: bytes):
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(audio_data)
+        os.replace(tmp_path, path)
+
+    def _execute(self, sql: str, params: tuple = ()) -> int:
+        """Run one statement in its own transaction and return the number of rows it changed"""
+        with self._db_lock, self._db:
+            return self._db.execute(sql, params).rowcount
@@ -0,0 +1,333 @@
+import asyncio
+import math
+import random
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+from src.services.tts_backends import TTSBackend, TTSBackendError
+from src.utils.logger import get_logger
+from src.utils.metrics import BACKEND_HEDGES, BACKEND_RETRIES, CIRCUIT_OPEN
+
+logger = get_logger(__name__)
+
+
+class CircuitOpenError(TTSBackendError):
+    """Raised without contacting the backend while its error rate is too high"""
+
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """
+    Stops calls to a failing backend until it has had time to recover.
+
+    Outcomes from the last window_seconds are kept. Once at least
+    min_requests were seen and the failure rate reaches failure_rate, the
+    circuit opens and calls fail fast for open_seconds. It then lets one
+    probe through: success closes the circuit, failure opens it again. Must be
+    used from a single event loop.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_rate: float, min_requests: int, window_seconds: float, open_seconds: float):
+        self.failure_rate = failure_rate
+        self.min_requests = min_requests
+        self.window_seconds = window_seconds
+        self.open_seconds = open_seconds
+
+        self.state = self.CLOSED
+        self.opened = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._outcomes: Deque[Tuple[float, bool]] = deque()
+        self._failures = 0
+
+    def allow(self) -> bool:
+        """Return whether a call may go to the backend now"""
+        if self.state == self.CLOSED:
+            return True
+        if self.state == self.OPEN and time.monotonic() - self._opened_at >= self.open_seconds:
+            self.state = self.HALF_OPEN
+            self._probing = False
+        if self.state == self.HALF_OPEN and not self._probing:
+            self._probing = True
+            return True
+        return False
+
+    def record(self, success: bool):
+        now = time.monotonic()
+        if self.state == self.HALF_OPEN:
+            if success:
+                self._close()
+            else:
+                self._open(now)
+            return
+
+        self._outcomes.append((now, success))
+        if not success:
+            self._failures += 1
+        self._trim(now)
+
+        if (
+            self.state == self.CLOSED
+            and len(self._outcomes) >= self.min_requests
+            and self._failures / len(self._outcomes) >= self.failure_rate
+        ):
+            self._open(now)
+
+    def release(self):
+        """Give back a half-open probe whose outcome is unknown, e.g. after a cancellation"""
+        if self.state == self.HALF_OPEN:
+            self._probing = False
+
+    def retry_after(self) -> int:
+        remaining = self.open_seconds - (time.monotonic() - self._opened_at)
+        return max(1, math.ceil(remaining))
+
+    def stats(self) -> Dict:
+        self._trim(time.monotonic())
+        return {
+            'state': self.state,
+            'opened': self.opened,
+            'window_requests': len(self._outcomes),
+            'window_failures': self._failures
+        }
+
+    def _open(self, now: float):
+        if self.state != self.OPEN:
+            logger.warning("Backend circuit opened after %d failures in %d calls", self._failures, len(self._outcomes))
+        self.state = self.OPEN
+        self.opened += 1
+        self._opened_at = now
+        self._probing = False
+        CIRCUIT_OPEN.set(1)
+
+    def _close(self):
+        logger.info("Backend circuit closed")
+        self.state = self.CLOSED
+        self._probing = False
+        self._outcomes.clear()
+        self._failures = 0
+        CIRCUIT_OPEN.set(0)
+
+    def _trim(self, now: float):
+        while self._outcomes and now - self._outcomes[0][0] > self.window_seconds:
+            _, success = self._outcomes.popleft()
+            if not success:
+                self._failures -= 1
+
+
+class ResilientBackend(TTSBackend):
+    """
+    Wraps a backend with timeouts, retries, hedging and a circuit breaker.
+
+    Each attempt must produce its first message within connect_timeout and
+    its first audio chunk within first_audio_timeout. While no audio has been
+    passed on, a failed attempt is retried up to `retries` times with
+    exponential backoff and full jitter. With hedging on, a second identical
+    request is started if the first has not produced audio after the recent
+    p95 time to first audio; whichever produces audio first is used and the
+    other is cancelled. Once audio flows, gaps longer than receive_timeout
+    fail the stream, since a partly consumed stream cannot be replayed.
+    """
+
+    # Time-to-first-audio samples kept for the hedge delay
+    LATENCY_SAMPLES = 200
+    # Samples needed before the observed quantile is trusted over the minimum delay
+    MIN_LATENCY_SAMPLES = 20
+
+    def __init__(
+        self,
+        backend: TTSBackend,
+        connect_timeout: float,
+        first_audio_timeout: float,
+        receive_timeout: float,
+        retries: int,
+        retry_backoff: float,
+        hedge: bool,
+        hedge_min_delay: float,
+        hedge_quantile: float,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        seed: Optional[int] = None
+    ):
+        self.backend = backend
+        self.name = backend.name
+        self.native_format = backend.native_format
+        self.connect_timeout = connect_timeout
+        self.first_audio_timeout = first_audio_timeout
+        self.receive_timeout = receive_timeout
+        self.retries = retries
+        self.retry_backoff = retry_backoff
+        self.hedge = hedge
+        self.hedge_min_delay = hedge_min_delay
+        self.hedge_quantile = hedge_quantile
+        self.circuit_breaker = circuit_breaker
+
+        self._random = random.Random(seed)
+        self._latencies: Deque[float] = deque(maxlen=self.LATENCY_SAMPLES)
+        self.retried = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+
+    async def stream(self, text, voice, rate='+0%', pitch='+0Hz', boundary='SentenceBoundary'):
+        args = (text, voice, rate, pitch, boundary)
+        events, iterator = await self._connect_with_retries(args)
+
+        try:
+            for event in events:
+                yield event
+            while True:
+                try:
+                    event = await asyncio.wait_for(iterator.__anext__(), self.receive_timeout)
+                except StopAsyncIteration:
+                    break
+                except asyncio.TimeoutError:
+                    raise TTSBackendError(f'No audio received from the backend for {self.receive_timeout}s')
+                yield event
+        except (GeneratorExit, asyncio.CancelledError):
+            # The consumer stopped reading; the backend had delivered audio, so it counts as healthy
+            self._record(True)
+            raise
+        except Exception:
+            self._record(False)
+            raise
+        else:
+            self._record(True)
+        finally:
+            await self._close(iterator)
+
+    async def list_voices(self) -> List[Dict]:
+        try:
+            return await asyncio.wait_for(self.backend.list_voices(), self.connect_timeout + self.receive_timeout)
+        except asyncio.TimeoutError:
+            raise TTSBackendError('Timed out listing voices')
+
+    def hedge_delay(self) -> float:
+        """Seconds to wait for the first audio chunk before sending a hedged request"""
+        if len(self._latencies) < self.MIN_LATENCY_SAMPLES:
+            return max(self.hedge_min_delay, self.first_audio_timeout / 2)
+        ordered = sorted(self._latencies)
+        index = min(len(ordered) - 1, math.ceil(self.hedge_quantile * len(ordered)) - 1)
+        return max(self.hedge_min_delay, ordered[index])
+
+    def stats(self) -> Dict:
+        return {
+            'retries': self.retried,
+            'hedged': self.hedged,
+            'hedge_wins': self.hedge_wins,
+            'hedge_delay_ms': round(self.hedge_delay() * 1000, 1) if self.hedge else None,
+            'circuit': self.circuit_breaker.stats() if self.circuit_breaker else None
+        }
+
+    async def _connect_with_retries(self, args: tuple):
+        attempt = 0
+        while True:
+            if self.circuit_breaker and not self.circuit_breaker.allow():
+                raise CircuitOpenError(
+                    'Speech backend is failing, please retry later', self.circuit_breaker.retry_after()
+                )
+            try:
+                return await self._connect(args)
+            except asyncio.CancelledError:
+                if self.circuit_breaker:
+                    self.circuit_breaker.release()
+                raise
+            except Exception as e:
+                self._record(False)
+                if attempt >= self.retries:
+                    raise e if isinstance(e, TTSBackendError) else TTSBackendError(str(e) or type(e).__name__)
+                logger.info("Backend attempt %d failed, retrying: %s", attempt + 1, e)
+
+            # Full jitter spreads retries from many requests that failed together
+            await asyncio.sleep(self._random.uniform(0, self.retry_backoff * 2 ** attempt))
+            attempt += 1
+            self.retried += 1
+            BACKEND_RETRIES.inc()
+
+    async def _connect(self, args: tuple):
+        """Open the stream up to its first audio chunk, hedging with a second request when slow"""
+        primary = asyncio.ensure_future(self._open(args))
+        attempts = [primary]
+        hedge_delay = self.hedge_delay() if self.hedge else None
+        hedged = False
+        error = None
+
+        try:
+            while attempts:
+                hedge_pending = hedge_delay is not None and len(attempts) == 1 and attempts[0] is primary
+                done, _ = await asyncio.wait(
+                    attempts,
+                    timeout=hedge_delay if hedge_pending else None,
+                    return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    hedge_delay = None
+                    attempts.append(asyncio.ensure_future(self._open(args)))
+                    self.hedged += 1
+                    hedged = True
+                    continue
+
+                for task in done:
+                    attempts.remove(task)
+                    if task.exception() is None:
+                        if hedged:
+                            winner = 'primary' if task is primary else 'hedge'
+                            self.hedge_wins += winner == 'hedge'
+                            BACKEND_HEDGES.labels(winner=winner).inc()
+                        return task.result()
+                    error = task.exception()
+                    # The hedge is pointless once the primary has already failed
+                    hedge_delay = None
+            raise error
+        finally:
+            for task in attempts:
+                task.cancel()
+            for task in attempts:
+                try:
+                    _, iterator = await task
+                except BaseException:
+                    continue
+                await self._close(iterator)
+
+    async def _open(self, args: tuple):
+        """Start one backend stream and read it up to and including the first audio chunk"""
+        started = time.monotonic()
+        iterator = self.backend.stream(*args).__aiter__()
+        events = []
+        try:
+            timeout = self.connect_timeout
+            while not events or events[-1]['type'] != 'audio':
+                remaining = self.first_audio_timeout - (time.monotonic() - started)
+                try:
+                    events.append(await asyncio.wait_for(iterator.__anext__(), min(timeout, remaining)))
+                except asyncio.TimeoutError:
+                    stage = 'connect to' if not events else 'first audio from'
+                    raise TTSBackendError(f'Timed out waiting to {stage} the backend')
+                except StopAsyncIteration:
+                    raise TTSBackendError('Backend stream ended without audio')
+                timeout = remaining
+        except BaseException:
+            await self._close(iterator)
+            raise
+
+        self._latencies.append(time.monotonic() - started)
+        return events, iterator
+
+    def _record(self, success: bool):
+        if self.circuit_breaker:
+            self.circuit_breaker.record(success)
+
+    @staticmethod
+    async def _close(iterator):
+        aclose = getattr(iterator, 'aclose', None)
+        if aclose is None:
+            return
+        try:
+            await aclose()
+        except Exception:
+            pass
@@ -0,0 +1,193 @@
+import asyncio
+import shutil
+import struct
+from typing import AsyncIterator, Dict, NamedTuple, Tuple
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+QUALITIES = ('low', 'standard', 'high')
+
+
+class OutputFormat(NamedTuple):
+    name: str
+    quality: str
+    content_type: str
+    extension: str
+    ffmpeg_args: Tuple[str, ...]
+
+    @property
+    def key(self) -> str:
+        """Identifier used in cache keys"""
+        return self.name if self.quality == 'standard' else f"{self.name}-{self.quality}"
+
+
+def _mp3(quality: str, bitrate: str) -> OutputFormat:
+    return OutputFormat('mp3', quality, 'audio/mpeg', 'mp3', ('-f', 'mp3', '-c:a', 'libmp3lame', '-b:a', bitrate))
+
+
+def _opus(quality: str, bitrate: str) -> OutputFormat:
+    # The voip application mode favours speech intelligibility at low bitrates
+    return OutputFormat(
+        'opus', quality, 'audio/ogg; codecs=opus', 'ogg',
+        ('-f', 'ogg', '-c:a', 'libopus', '-application', 'voip', '-b:a', bitrate)
+    )
+
+
+def _wav(quality: str, sample_rate: int) -> OutputFormat:
+    return OutputFormat('wav', quality, 'audio/wav', 'wav', ('-f', 'wav', '-c:a', 'pcm_s16le', '-ar', str(sample_rate)))
+
+
+def _pcm(quality: str, sample_rate: int) -> OutputFormat:
+    return OutputFormat(
+        'pcm', quality, f'audio/L16; rate={sample_rate}; channels=1', 'pcm',
+        ('-f', 's16be', '-c:a', 'pcm_s16be', '-ar', str(sample_rate))
+    )
+
+
+# Quality tiers per format. The backend speaks 24 kHz, 48 kbit/s mono MP3, so
+# 'high' only helps consumers that expect a higher rate, such as video at 48 kHz.
+OUTPUT_FORMATS: Dict[str, Dict[str, OutputFormat]] = {
+    'mp3': {'low': _mp3('low', '32k'), 'standard': _mp3('standard', '48k'), 'high': _mp3('high', '64k')},
+    'opus': {'low': _opus('low', '16k'), 'standard': _opus('standard', '24k'), 'high': _opus('high', '32k')},
+    'wav': {'low': _wav('low', 16000), 'standard': _wav('standard', 24000), 'high': _wav('high', 48000)},
+    'pcm': {'low': _pcm('low', 16000), 'standard': _pcm('standard', 24000), 'high': _pcm('high', 48000)},
+}
+
+_EXTENSIONS = {fmt.extension: fmt for tiers in OUTPUT_FORMATS.values() for fmt in tiers.values()}
+
+
+def get_output_format(name: str, quality: str = 'standard') -> OutputFormat:
+    """Look up an output format, raising ValueError for unknown names or tiers"""
+    if name not in OUTPUT_FORMATS:
+        raise ValueError(f"Unsupported output format '{name}'. Choose from: {', '.join(OUTPUT_FORMATS)}")
+    if quality not in QUALITIES:
+        raise ValueError(f"Unsupported quality '{quality}'. Choose from: {', '.join(QUALITIES)}")
+    return OUTPUT_FORMATS[name][quality]
+
+
+def content_type_for_extension(extension: str) -> str:
+    fmt = _EXTENSIONS.get(extension)
+    return fmt.content_type if fmt else 'application/octet-stream'
+
+
+class TranscodeError(Exception):
+    """Raised when ffmpeg is missing or fails"""
+
+
+class Transcoder:
+    """
+    Converts backend MP3 into other output formats with ffmpeg.
+
+    Audio is piped through ffmpeg's stdin and stdout, so nothing touches the
+    filesystem. At most max_concurrent ffmpeg processes run at once; further
+    requests wait for a free slot, which keeps a burst of transcodes from
+    starving synthesis of CPU.
+    """
+
+    def __init__(self, ffmpeg_path: str, max_concurrent: int, timeout: float):
+        self.ffmpeg_path = shutil.which(ffmpeg_path)
+        self.timeout = timeout
+        self._slots = asyncio.Semaphore(max_concurrent)
+        self.transcodes = 0
+        self.failures = 0
+
+    @property
+    def available(self) -> bool:
+        return self.ffmpeg_path is not None
+
+    async def transcode(self, audio_data: bytes, fmt: OutputFormat) -> bytes:
+        """Convert a complete MP3 clip"""
+        async with self._slots:
+            process = await self._spawn(fmt)
+            try:
+                output, stderr = await asyncio.wait_for(process.communicate(audio_data), self.timeout)
+            except BaseException:
+                self._kill(process)
+                self.failures += 1
+                raise
+            if process.returncode != 0:
+                self.failures += 1
+                raise TranscodeError(f"ffmpeg failed: {stderr.decode(errors='replace').strip()[-500:]}")
+
+        self.transcodes += 1
+        if fmt.name == 'wav':
+            output = fix_wav_sizes(output)
+        return output
+
+    async def stream(self, chunks: AsyncIterator[bytes], fmt: OutputFormat) -> AsyncIterator[bytes]:
+        """Convert an MP3 stream, yielding output as ffmpeg produces it"""
+        async with self._slots:
+            process = await self._spawn(fmt)
+
+            async def feed():
+                try:
+                    async for chunk in chunks:
+                        process.stdin.write(chunk)
+                        await process.stdin.drain()
+                finally:
+                    process.stdin.close()
+
+            feeder = asyncio.ensure_future(feed())
+            try:
+                while True:
+                    data = await asyncio.wait_for(process.stdout.read(64 * 1024), self.timeout)
+                    if not data:
+                        break
+                    yield data
+                # Surface errors from the source stream, such as a failed backend
+                await feeder
+                await asyncio.wait_for(process.wait(), self.timeout)
+                if process.returncode != 0:
+                    stderr = await process.stderr.read()
+                    raise TranscodeError(f"ffmpeg failed: {stderr.decode(errors='replace').strip()[-500:]}")
+            except BaseException:
+                feeder.cancel()
+                self._kill(process)
+                self.failures += 1
+                raise
+        self.transcodes += 1
+
+    def stats(self) -> Dict:
+        return {'available': self.available, 'transcodes': self.transcodes, 'failures': self.failures}
+
+    async def _spawn(self, fmt: OutputFormat):
+        if not self.available:
+            raise TranscodeError('ffmpeg is not installed')
+        return await asyncio.create_subprocess_exec(
+            self.ffmpeg_path, '-hide_banner', '-loglevel', 'error', '-f', 'mp3', '-i', 'pipe:0',
+            '-map_metadata', '-1', '-fflags', '+bitexact', '-ac', '1', *fmt.ffmpeg_args, 'pipe:1',
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
+
+    @staticmethod
+    def _kill(process):
+        if process.returncode is None:
+            try:
+                process.kill()
+            except ProcessLookupError:
+                pass
+
+
+def fix_wav_sizes(data: bytes) -> bytes:
+    """
+    Fill in the RIFF and data chunk sizes of a WAV file.
+
+    ffmpeg cannot seek back on a pipe, so it leaves the sizes unset; some
+    players and editors then refuse the file or read past the end.
+    """
+    if len(data) < 12 or data[:4] != b'RIFF' or data[8:12] != b'WAVE':
+        return data
+    fixed = bytearray(data)
+    struct.pack_into('<I', fixed, 4, len(fixed) - 8)
+    offset = 12
+    while offset + 8 <= len(fixed):
+        chunk_id = bytes(fixed[offset:offset + 4])
+        if chunk_id == b'data':
+            struct.pack_into('<I', fixed, offset + 4, len(fixed) - offset - 8)
+            break
+        size = struct.unpack_from('<I', fixed, offset + 4)[0]
+        offset += 8 + size + (size & 1)
+    return bytes(fixed)
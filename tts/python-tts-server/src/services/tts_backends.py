@@ -0,0 +1,191 @@
+import asyncio
+import random
+import re
+from abc import ABC, abstractmethod
+from typing import AsyncIterator, Dict, List, Optional
+import edge_tts
+from src.utils.captions import TICKS_PER_SECOND
+from src.utils.mp3 import parse_frame_header, silent_frame
+
+
+class TTSBackendError(Exception):
+    """Raised when a backend fails to synthesize speech"""
+
+
+class TTSBackend(ABC):
+    """
+    Interface for speech synthesis engines.
+
+    stream() yields the same chunk dicts as edge_tts.Communicate.stream():
+    {'type': 'audio', 'data': bytes} for audio and
+    {'type': 'WordBoundary' | 'SentenceBoundary', 'offset', 'duration', 'text'}
+    for boundary metadata. Subclasses must implement stream() and
+    list_voices(); a backend missing either cannot be constructed.
+    """
+
+    name = 'base'
+    # (format, quality) of the audio stream() produces; other output formats are
+    # transcoded. edge-tts always requests 24 kHz, 48 kbit/s mono MP3.
+    native_format = ('mp3', 'standard')
+
+    @abstractmethod
+    def stream(
+        self,
+        text: str,
+        voice: str,
+        rate: str = '+0%',
+        pitch: str = '+0Hz',
+        boundary: str = 'SentenceBoundary'
+    ) -> AsyncIterator[Dict]:
+        """Synthesize text, yielding audio and boundary chunks as they arrive"""
+
+    async def save(self, text: str, voice: str, rate: str, pitch: str, output_filename: str):
+        """Synthesize straight into a file"""
+        with open(output_filename, 'wb') as f:
+            async for chunk in self.stream(text, voice, rate, pitch):
+                if chunk['type'] == 'audio':
+                    f.write(chunk['data'])
+
+    @abstractmethod
+    async def list_voices(self) -> List[Dict]:
+        """List voices in the edge-tts voice format (ShortName, Gender, Locale, ...)"""
+
+
+class EdgeTTSBackend(TTSBackend):
+    """Microsoft Edge online TTS service through the edge-tts package"""
+
+    name = 'edge'
+
+    async def stream(self, text, voice, rate='+0%', pitch='+0Hz', boundary='SentenceBoundary'):
+        communicate = edge_tts.Communicate(
+            text=text,
+            voice=voice,
+            rate=rate,
+            pitch=pitch,
+            boundary=boundary
+        )
+        async for chunk in communicate.stream():
+            yield chunk
+
+    async def list_voices(self) -> List[Dict]:
+        return await edge_tts.list_voices()
+
+
+class FakeTTSBackend(TTSBackend):
+    """
+    Deterministic offline engine for tests and benchmarks.
+
+    Emits valid silent MP3 frames in the edge output format (24 kHz, 48 kbit/s,
+    mono) whose duration follows the text length and rate, plus one
+    WordBoundary per word. Connection latency, jitter, per-chunk delay and a
+    failure rate are configurable; all randomness comes from a seeded RNG so
+    runs are reproducible.
+    """
+
+    name = 'fake'
+
+    VOICES = [
+        ('en-US-AriaNeural', 'Female'), ('en-US-GuyNeural', 'Male'),
+        ('vi-VN-HoaiMyNeural', 'Female'), ('vi-VN-NamMinhNeural', 'Male'),
+        ('ja-JP-NanamiNeural', 'Female'), ('ja-JP-KeitaNeural', 'Male'),
+        ('ko-KR-SunHiNeural', 'Female'), ('ko-KR-InJoonNeural', 'Male'),
+        ('zh-CN-XiaoxiaoNeural', 'Female'), ('zh-CN-YunxiNeural', 'Male'),
+        ('es-ES-ElviraNeural', 'Female'), ('es-ES-AlvaroNeural', 'Male'),
+        ('fr-FR-DeniseNeural', 'Female'), ('fr-FR-HenriNeural', 'Male'),
+        ('de-DE-KatjaNeural', 'Female'), ('de-DE-ConradNeural', 'Male'),
+    ]
+
+    def __init__(
+        self,
+        latency: float = 0.05,
+        jitter: float = 0.0,
+        chunk_delay: float = 0.0,
+        failure_rate: float = 0.0,
+        chars_per_second: float = 15.0,
+        frames_per_chunk: int = 16,
+        seed: Optional[int] = 0
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self.chunk_delay = chunk_delay
+        self.failure_rate = failure_rate
+        self.chars_per_second = chars_per_second
+        self.frames_per_chunk = frames_per_chunk
+        self._random = random.Random(seed)
+        self._frame = silent_frame()
+        header = parse_frame_header(self._frame)
+        self._frame_seconds = header.samples / header.sample_rate
+
+    async def stream(self, text, voice, rate='+0%', pitch='+0Hz', boundary='SentenceBoundary'):
+        await asyncio.sleep(max(0.0, self.latency + self._random.uniform(-self.jitter, self.jitter)))
+        if self._random.random() < self.failure_rate:
+            raise TTSBackendError('Fake backend failure')
+
+        speed = 1 + self._parse_percent(rate) / 100
+        duration = max(len(text), 1) / (self.chars_per_second * max(speed, 0.1))
+        total_frames = max(1, round(duration / self._frame_seconds))
+
+        words = list(re.finditer(r'\S+', text)) if boundary == 'WordBoundary' else []
+        ticks_per_char = duration * TICKS_PER_SECOND / max(len(text), 1)
+
+        sent = 0
+        next_word = 0
+        while sent < total_frames:
+            count = min(self.frames_per_chunk, total_frames - sent)
+            if self.chunk_delay:
+                await asyncio.sleep(self.chunk_delay)
+            yield {'type': 'audio', 'data': self._frame * count}
+            sent += count
+
+            # Report the words spoken so far, as the real service interleaves them
+            spoken_ticks = sent * self._frame_seconds * TICKS_PER_SECOND
+            while next_word < len(words) and words[next_word].start() * ticks_per_char < spoken_ticks:
+                word = words[next_word]
+                yield {
+                    'type': 'WordBoundary',
+                    'offset': word.start() * ticks_per_char,
+                    'duration': len(word.group()) * ticks_per_char,
+                    'text': word.group()
+                }
+                next_word += 1
+
+        if boundary == 'SentenceBoundary':
+            yield {
+                'type': 'SentenceBoundary',
+                'offset': 0,
+                'duration': duration * TICKS_PER_SECOND,
+                'text': text
+            }
+
+    async def list_voices(self) -> List[Dict]:
+        await asyncio.sleep(self.latency)
+        voices = []
+        for short_name, gender in self.VOICES:
+            locale = short_name.rsplit('-', 1)[0]
+            voices.append({
+                'Name': f"Microsoft Server Speech Text to Speech Voice ({locale}, {short_name.rsplit('-', 1)[1]})",
+                'ShortName': short_name,
+                'Gender': gender,
+                'Locale': locale,
+                'SuggestedCodec': 'audio-24khz-48kbitrate-mono-mp3',
+                'FriendlyName': f"Fake {short_name}",
+                'Status': 'GA',
+                'VoiceTag': {'ContentCategories': ['General'], 'VoicePersonalities': ['Friendly']}
+            })
+        return voices
+
+    @staticmethod
+    def _parse_percent(value: str) -> float:
+        match = re.match(r'^([+-]?\d+(?:\.\d+)?)%$', value or '')
+        return float(match.group(1)) if match else 0.0
+
+
+def create_backend(name: str, **options) -> TTSBackend:
+    """Create the backend selected in config"""
+    backends = {
+        EdgeTTSBackend.name: EdgeTTSBackend,
+        FakeTTSBackend.name: FakeTTSBackend,
+    }
+    if name not in backends:
+        raise ValueError(f"Unknown TTS backend '{name}'. Choose from: {', '.join(backends)}")
+    return backends[name](**options)
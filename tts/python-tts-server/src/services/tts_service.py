@@ -1,14 +1,91 @@
-import edge_tts
-import tempfile
 import os
 import asyncio
-import uuid
-from mutagen.mp3 import MP3
-from typing import Dict, List, Optional
-from src.models.tts_models import TTSRequest, TTSResponse, SupportedLanguages, SupportedVoices, HealthResponse
+import time
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+from config import config
+from src.models.tts_models import (
+    TTSRequest, TTSResponse, ProgramRequest, ProgramResponse, SegmentTiming,
+    SupportedLanguages, SupportedVoices, HealthResponse
+)
+from src.services.admission import AdmissionController, AdmissionRejected
+from src.services.audio_cache import AudioCache
+from src.services.audio_store import AudioStore
+from src.services.resilient_backend import CircuitBreaker, CircuitOpenError, ResilientBackend
+from src.services.transcoder import OutputFormat, Transcoder, get_output_format
+from src.services.tts_backends import TTSBackend, TTSBackendError, create_backend
+from src.services.voice_catalog import VoiceCatalog
+from src.utils.captions import shift_words, to_srt, to_vtt, word_from_boundary
+from src.utils.logger import get_logger
+from src.utils.metrics import (
+    ADMISSION_QUEUE_DEPTH, BACKEND_ERRORS, BACKEND_STREAMS_IN_FLIGHT, CACHE_LOOKUPS,
+    SYNTHESES_IN_FLIGHT, SYNTHESIS_REQUESTS, observe_stage, time_stage
+)
+from src.utils.single_flight import SingleFlight
+from src.utils.mp3 import AudioBuffer, Mp3DurationCounter, get_mp3_duration, iter_frames, join_mp3, silence
+from src.utils.text_splitter import chunk_text, split_segments
+
+logger = get_logger(__name__)
 
 class TTSService:
-    def __init__(self):
+    # Backend MP3 is 48 kbit/s (6 KB/s) and speech runs at roughly 15 characters/s
+    ESTIMATED_BYTES_PER_CHAR = 400
+
+    def __init__(
+        self,
+        backend: Optional[TTSBackend] = None,
+        cache: Optional[AudioCache] = None,
+        audio_store: Optional[AudioStore] = None,
+        voice_catalog: Optional[VoiceCatalog] = None,
+        transcoder: Optional[Transcoder] = None
+    ):
+        if backend is None:
+            backend = create_backend(config.TTS_BACKEND, **config.TTS_BACKEND_OPTIONS.get(config.TTS_BACKEND, {}))
+            if config.BACKEND_RESILIENCE:
+                backend = ResilientBackend(
+                    backend,
+                    connect_timeout=config.BACKEND_CONNECT_TIMEOUT,
+                    first_audio_timeout=config.BACKEND_FIRST_AUDIO_TIMEOUT,
+                    receive_timeout=config.BACKEND_RECEIVE_TIMEOUT,
+                    retries=config.BACKEND_RETRIES,
+                    retry_backoff=config.BACKEND_RETRY_BACKOFF,
+                    hedge=config.BACKEND_HEDGE,
+                    hedge_min_delay=config.BACKEND_HEDGE_MIN_DELAY,
+                    hedge_quantile=config.BACKEND_HEDGE_QUANTILE,
+                    circuit_breaker=CircuitBreaker(
+                        failure_rate=config.CIRCUIT_FAILURE_RATE,
+                        min_requests=config.CIRCUIT_MIN_REQUESTS,
+                        window_seconds=config.CIRCUIT_WINDOW,
+                        open_seconds=config.CIRCUIT_OPEN_SECONDS
+                    )
+                )
+        self.backend = backend
+        if cache is None and config.CACHE_ENABLED:
+            cache = AudioCache(
+                cache_dir=os.path.join(config.TEMP_AUDIO_DIR, 'cache'),
+                memory_max_bytes=config.CACHE_MEMORY_MAX_BYTES,
+                memory_max_entry_bytes=config.CACHE_MEMORY_MAX_ENTRY_BYTES,
+                disk_max_bytes=config.CACHE_DISK_MAX_BYTES
+            )
+        self.cache = cache
+        self.audio_store = audio_store or AudioStore(
+            store_dir=os.path.join(config.TEMP_AUDIO_DIR, 'store'),
+            max_bytes=config.AUDIO_STORE_MAX_BYTES
+        )
+        self.transcoder = transcoder or Transcoder(
+            ffmpeg_path=config.FFMPEG_PATH,
+            max_concurrent=config.MAX_CONCURRENT_TRANSCODES,
+            timeout=config.TRANSCODE_TIMEOUT
+        )
+        self.single_flight = SingleFlight()
+        self.admission = AdmissionController(
+            max_concurrent=config.MAX_CONCURRENT_SYNTHESES,
+            max_per_voice=config.MAX_CONCURRENT_PER_VOICE,
+            max_queue=config.MAX_QUEUE_SIZE,
+            max_queue_wait=config.MAX_QUEUE_WAIT
+        )
+        SYNTHESES_IN_FLIGHT.set_function(lambda: self.admission.stats()['in_flight'])
+        ADMISSION_QUEUE_DEPTH.set_function(lambda: self.admission.stats()['queue_depth'])
+
         self.default_voices = {
             'en-US': {'female': 'en-US-AriaNeural', 'male': 'en-US-GuyNeural'},
             'vi-VN': {'female': 'vi-VN-HoaiMyNeural', 'male': 'vi-VN-NamMinhNeural'},
@@ -32,50 +109,108 @@ class TTSService:
             'whisper': {'rate': '-20%', 'pitch': '-5Hz'},
         }
 
-    async def synthesize_speech(self, request: TTSRequest) -> Dict:
+        # default_voices are the preferred voices; the catalog covers every voice the backend offers
+        self.voice_catalog = voice_catalog or VoiceCatalog(
+            backend=self.backend,
+            cache_path=os.path.join(config.TEMP_AUDIO_DIR, 'voices.json'),
+            ttl_seconds=config.VOICE_CATALOG_TTL,
+            retry_seconds=config.VOICE_CATALOG_RETRY,
+            preferred=self.default_voices,
+            style_voices=config.VOICE_STYLE_SUPPORT
+        )
+
+    async def synthesize_speech(self, request: TTSRequest, persist: bool = False) -> Dict:
         """
-        Main synthesis method that returns complete response data
+        Main synthesis method that returns complete response data.
+
+        With persist=True the audio is also kept in the audio store and the
+        response's audio_url points at it.
         """
         try:
-            if not request.text.strip():
-                return {
-                    'success': False,
-                    'error': 'Text cannot be empty',
-                    'status_code': 400
-                }
-
-            # Generate audio
-            audio_file, duration, voice_name = await self._generate_audio(
-                text=request.text,
-                language=request.language,
-                gender=request.gender,
-                emotion=request.emotion,
-                output_filename=request.output_filename
+            with time_stage('validation'):
+                error = self._validate_text(request.text) or self._validate_output(request.output_format, request.quality)
+            if error:
+                return error
+            output_format = get_output_format(request.output_format, request.quality)
+
+            with time_stage('voice_resolution'):
+                voice_name = self._get_voice_name(request.language, request.gender)
+                current_rate, current_pitch = self._get_prosody(request.emotion)
+                cache_key = AudioCache.make_key(
+                    request.text, voice_name, current_rate, current_pitch, output_format.key
+                )
+            self._count_request(request, voice_name)
+
+            use_cache = bool(self.cache and request.use_cache)
+            segments = split_segments(request.text, config.CHUNK_MAX_CHARS) if use_cache else []
+            incremental = (
+                use_cache and request.incremental and config.INCREMENTAL_SYNTHESIS and len(segments) > 1
             )
 
-            if not audio_file:
-                return {
-                    'success': False,
-                    'error': 'Failed to generate audio',
-                    'status_code': 500
-                }
+            cached = None
+            if use_cache:
+                # The whole-text entry is checked first, even for incremental requests
+                with time_stage('cache_lookup'):
+                    cached = await asyncio.to_thread(self.cache.get, cache_key)
+                if cached and request.captions and 'words' not in cached[1]:
+                    # Cached without word timings; synthesize again to capture them
+                    cached = None
+                CACHE_LOOKUPS.labels(result='hit' if cached else 'miss').inc()
 
-            # Read audio data
-            with open(audio_file, 'rb') as f:
-                audio_data = f.read()
+            if cached:
+                audio_data, metadata = cached
+                metadata = {**metadata, 'sentences_reused': len(segments), 'sentences_synthesized': 0}
+            else:
+                async def produce_audio() -> tuple:
+                    if incremental:
+                        # Sentences are cached as backend MP3; only the joined clip is converted
+                        audio_data, metadata = await self._synthesize_incremental(
+                            segments, voice_name, current_rate, current_pitch, request.captions
+                        )
+                        audio_data = await self._encode(audio_data, output_format)
+                        # Also keep the joined clip so an identical resubmission is a single hit
+                        with time_stage('file_io'):
+                            await asyncio.to_thread(self.cache.put, cache_key, audio_data, {
+                                key: value for key, value in metadata.items()
+                                if key not in ('sentences_reused', 'sentences_synthesized')
+                            })
+                        return audio_data, metadata
 
-            # Create response
-            response = TTSResponse(
-                audio_url=f"/audio/{os.path.basename(audio_file)}",
-                duration_seconds=duration,
-                language=request.language,
-                gender=request.gender,
-                emotion=request.emotion,
-                voice_name=voice_name
-            )
+                    async with self.admission.slot(voice_name):
+                        with time_stage('synthesis'):
+                            audio_data, duration, words = await self._synthesize_text(
+                                text=request.text,
+                                voice_name=voice_name,
+                                rate=current_rate,
+                                pitch=current_pitch,
+                                words=request.captions
+                            )
+                    audio_data = await self._encode(audio_data, output_format)
+                    metadata = {'duration_seconds': duration, 'voice_name': voice_name}
+                    if request.captions:
+                        metadata['words'] = words
+                    if not use_cache:
+                        return audio_data, metadata
 
-            # Clean up temp file
-            self.cleanup_file(audio_file)
+                    with time_stage('file_io'):
+                        await asyncio.to_thread(self.cache.put, cache_key, audio_data, metadata)
+                    return audio_data, {**metadata, 'sentences_reused': 0, 'sentences_synthesized': len(segments)}
+
+                # Generate audio in memory, sharing one synthesis between identical concurrent requests
+                audio_data, metadata = await self.single_flight.do((cache_key, request.captions), produce_audio)
+
+            if request.output_filename:
+                with time_stage('file_io'):
+                    await asyncio.to_thread(self._write_file, request.output_filename, audio_data)
+
+            # Keep a copy that can be fetched from /audio/<id> when the caller needs a URL
+            audio_id = None
+            if persist and self.audio_store:
+                with time_stage('file_io'):
+                    audio_id = await asyncio.to_thread(self.audio_store.put, audio_data, output_format.extension)
+
+            # Create response
+            response = self._build_response(request, metadata, audio_id)
 
             return {
                 'success': True,
@@ -84,6 +219,21 @@ class TTSService:
                 'status_code': 200
             }
 
+        except AdmissionRejected as e:
+            return {
+                'success': False,
+                'error': str(e),
+                'status_code': 429,
+                'retry_after': e.retry_after
+            }
+        except CircuitOpenError as e:
+            # Cache hits never reach this point, so cached clips are still served while the circuit is open
+            return {
+                'success': False,
+                'error': str(e),
+                'status_code': 503,
+                'retry_after': e.retry_after
+            }
         except Exception as e:
             return {
                 'success': False,
@@ -91,100 +241,523 @@ class TTSService:
                 'status_code': 500
             }
 
-    async def _generate_audio(
+    async def synthesize_batch(self, requests: List[TTSRequest]) -> AsyncIterator[Tuple[int, Dict]]:
+        """
+        Synthesize many requests concurrently, up to BATCH_CONCURRENCY at a time.
+
+        Yields (index, result) pairs in completion order, where result has the
+        same shape as synthesize_speech(). A failing item only affects its own
+        result.
+        """
+        semaphore = asyncio.Semaphore(config.BATCH_CONCURRENCY)
+
+        async def synthesize_item(index: int, request: TTSRequest) -> Tuple[int, Dict]:
+            async with semaphore:
+                return index, await self.synthesize_speech(request)
+
+        tasks = [
+            asyncio.ensure_future(synthesize_item(index, request))
+            for index, request in enumerate(requests)
+        ]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def synthesize_program(self, request: ProgramRequest) -> Dict:
+        """
+        Render an ordered list of segments into one clip with a timing map.
+
+        Segments are synthesized concurrently, up to PROGRAM_CONCURRENCY at a
+        time, each with its own emotion. They are joined at the MP3 frame level
+        with silent frames inserted for gaps, pauses and minimum start/end
+        offsets, and the joined track is converted to the requested output
+        format once. The audio is kept in the audio store and the response
+        lists each segment's start and end offset in the joined track.
+        """
+        error = self._validate_program(request)
+        if error:
+            return error
+
+        semaphore = asyncio.Semaphore(config.PROGRAM_CONCURRENCY)
+        emotions = [segment.emotion or request.emotion for segment in request.segments]
+
+        async def synthesize_segment(segment, emotion: str) -> Dict:
+            async with semaphore:
+                return await self.synthesize_speech(TTSRequest(
+                    text=segment.content,
+                    language=request.language,
+                    gender=request.gender,
+                    emotion=emotion,
+                    use_cache=request.use_cache,
+                    captions=request.captions
+                ))
+
+        results = await asyncio.gather(*(
+            synthesize_segment(segment, emotion) for segment, emotion in zip(request.segments, emotions)
+        ))
+        for index, result in enumerate(results):
+            if not result['success']:
+                return {**result, 'error': f"Segment {index}: {result['error']}"}
+
+        try:
+            # Silence is encoded in the same format as the speech so frames join cleanly
+            _, header = next(iter_frames(results[0]['audio_data']))
+            parts = []
+            timings = []
+            words = []
+            offset = 0.0
+
+            def add_silence(seconds: float):
+                nonlocal offset
+                if seconds > 0:
+                    frames = silence(seconds, header.sample_rate, header.bitrate, header.channels)
+                    parts.append(frames)
+                    offset += get_mp3_duration(frames)
+
+            for index, (segment, emotion, result) in enumerate(zip(request.segments, emotions, results)):
+                before = segment.pause_before + (request.gap_seconds if index else 0.0)
+                add_silence(max(before, (segment.min_start or 0.0) - offset))
+
+                start = offset
+                parts.append(result['audio_data'])
+                if request.captions:
+                    words.extend(shift_words([w.dict() for w in result['response'].words], start))
+                offset += get_mp3_duration(result['audio_data'])
+                timings.append(SegmentTiming(
+                    index=index,
+                    segment_type=segment.segment_type,
+                    emotion=emotion,
+                    start_seconds=round(start, 3),
+                    end_seconds=round(offset, 3),
+                    duration_seconds=round(offset - start, 3)
+                ))
+
+                add_silence(max(segment.pause_after, (segment.min_end or 0.0) - offset))
+
+            output_format = get_output_format(request.output_format, request.quality)
+            audio_data = await self._encode(join_mp3(parts), output_format)
+            with time_stage('file_io'):
+                audio_id = await asyncio.to_thread(self.audio_store.put, audio_data, output_format.extension)
+
+            return {
+                'success': True,
+                'audio_data': audio_data,
+                'response': ProgramResponse(
+                    audio_url=f"/audio/{audio_id}",
+                    duration_seconds=round(offset, 3),
+                    language=request.language,
+                    gender=request.gender,
+                    voice_name=results[0]['response'].voice_name,
+                    output_format=request.output_format,
+                    quality=request.quality,
+                    segments=timings,
+                    **(self._captions(words) if request.captions else {})
+                ),
+                'status_code': 200
+            }
+
+        except Exception as e:
+            return {
+                'success': False,
+                'error': str(e),
+                'status_code': 500
+            }
+
+    def _validate_program(self, request: ProgramRequest) -> Optional[Dict]:
+        """Return an error result if the program cannot be rendered"""
+        error = None
+        if not request.segments:
+            error = 'Program must contain at least one segment'
+        elif len(request.segments) > config.PROGRAM_MAX_SEGMENTS:
+            error = f'Program exceeds maximum of {config.PROGRAM_MAX_SEGMENTS} segments'
+        else:
+            # Inserted silence can never exceed the pauses plus the latest minimum offset
+            pauses = request.gap_seconds * (len(request.segments) - 1)
+            latest = 0.0
+            for index, segment in enumerate(request.segments):
+                timings = [segment.pause_before, segment.pause_after, segment.min_start or 0.0, segment.min_end or 0.0]
+                if request.gap_seconds < 0 or any(value < 0 for value in timings):
+                    error = f'Segment {index}: pauses and offsets cannot be negative'
+                    break
+                text_error = self._validate_text(segment.content)
+                if text_error:
+                    error = f"Segment {index}: {text_error['error']}"
+                    break
+                pauses += segment.pause_before + segment.pause_after
+                latest = max(latest, segment.min_start or 0.0, segment.min_end or 0.0)
+
+            if not error and pauses + latest > config.PROGRAM_MAX_DURATION:
+                error = f'Inserted silence exceeds maximum of {config.PROGRAM_MAX_DURATION} seconds'
+
+        if not error:
+            output_error = self._validate_output(request.output_format, request.quality)
+            if output_error:
+                return output_error
+
+        if error:
+            return {
+                'success': False,
+                'error': error,
+                'status_code': 400
+            }
+        return None
+
+    def prepare_stream(self, request: TTSRequest) -> Dict:
+        """
+        Validate a request and return an async stream of synthesis events.
+
+        The stream yields {'type': 'audio', 'data': bytes} for every audio chunk
+        as it arrives from the backend, followed by a single
+        {'type': 'metadata', 'response': TTSResponse} once synthesis finishes.
+        Formats the backend does not produce are converted on the fly.
+        A synthesis slot is held while the stream is open; AdmissionRejected is
+        raised from the first iteration if none is available.
+        """
+        error = self._validate_text(request.text) or self._validate_output(request.output_format, request.quality)
+        if error:
+            return error
+
+        output_format = get_output_format(request.output_format, request.quality)
+        voice_name = self._get_voice_name(request.language, request.gender)
+        self._count_request(request, voice_name)
+        return {
+            'success': True,
+            'voice_name': voice_name,
+            'output_format': output_format,
+            'stream': self._stream_audio(request, voice_name, output_format),
+            'status_code': 200
+        }
+
+    async def _stream_audio(
         self,
-        text: str,
-        language: str = 'en-US',
-        gender: str = 'female',
-        emotion: str = 'neutral',
-        output_filename: Optional[str] = None
+        request: TTSRequest,
+        voice_name: str,
+        output_format: OutputFormat
+    ) -> AsyncIterator[Dict]:
+        """Forward audio chunks from the backend without buffering the whole file"""
+        current_rate, current_pitch = self._get_prosody(request.emotion)
+        counter = Mp3DurationCounter()
+
+        async def backend_audio() -> AsyncIterator[bytes]:
+            async with self.admission.slot(voice_name):
+                async for chunk in self._backend_stream(request.text, voice_name, current_rate, current_pitch):
+                    if chunk["type"] == "audio":
+                        counter.feed(chunk["data"])
+                        yield chunk["data"]
+
+        audio = backend_audio()
+        if not self._is_native(output_format):
+            audio = self.transcoder.stream(audio, output_format)
+        async for data in audio:
+            yield {'type': 'audio', 'data': data}
+
+        yield {
+            'type': 'metadata',
+            'response': TTSResponse(
+                duration_seconds=round(counter.duration, 3),
+                language=request.language,
+                gender=request.gender,
+                emotion=request.emotion,
+                voice_name=voice_name,
+                output_format=request.output_format,
+                quality=request.quality
+            )
+        }
+
+    def _validate_text(self, text: str) -> Optional[Dict]:
+        """Return an error result if the text cannot be synthesized"""
+        if not text.strip():
+            return {
+                'success': False,
+                'error': 'Text cannot be empty',
+                'status_code': 400
+            }
+        if len(text) > config.MAX_TEXT_LENGTH:
+            return {
+                'success': False,
+                'error': f'Text exceeds maximum length of {config.MAX_TEXT_LENGTH} characters',
+                'status_code': 400
+            }
+        return None
+
+    def _validate_output(self, output_format: str, quality: str) -> Optional[Dict]:
+        """Return an error result if audio cannot be delivered in the requested format"""
+        try:
+            fmt = get_output_format(output_format, quality)
+        except ValueError as e:
+            return {
+                'success': False,
+                'error': str(e),
+                'status_code': 400
+            }
+        if not self._is_native(fmt) and not self.transcoder.available:
+            return {
+                'success': False,
+                'error': f"Output format '{fmt.key}' needs ffmpeg, which is not installed on this server",
+                'status_code': 501
+            }
+        return None
+
+    def _is_native(self, output_format: OutputFormat) -> bool:
+        """Whether the backend produces this format itself, so no transcoding is needed"""
+        return (output_format.name, output_format.quality) == self.backend.native_format
+
+    async def _encode(self, audio_data: bytes, output_format: OutputFormat) -> bytes:
+        """Convert backend audio to the requested output format"""
+        if self._is_native(output_format):
+            return audio_data
+        with time_stage('transcode'):
+            return await self.transcoder.transcode(audio_data, output_format)
+
+    async def _synthesize_text(self, text: str, voice_name: str, rate: str, pitch: str, words: bool = False) -> tuple:
+        """
+        Synthesize text of any allowed length.
+
+        Long text is split at sentence boundaries into chunks that are
+        synthesized concurrently, up to CHUNK_CONCURRENCY at a time, and joined
+        at the MP3 frame level. The duration is the sum over the chunks, and
+        word timings of later chunks are shifted by the chunks before them.
+        """
+        chunks = chunk_text(text, config.CHUNK_MAX_CHARS)
+        if len(chunks) <= 1:
+            return await self._generate_audio(text, voice_name, rate, pitch, words)
+
+        semaphore = asyncio.Semaphore(config.CHUNK_CONCURRENCY)
+
+        async def generate_chunk(chunk: str) -> tuple:
+            async with semaphore:
+                return await self._generate_audio(chunk, voice_name, rate, pitch, words)
+
+        results = await asyncio.gather(*(generate_chunk(chunk) for chunk in chunks))
+        audio_data = join_mp3([chunk_audio for chunk_audio, _, _ in results])
+        duration_seconds = round(sum(chunk_duration for _, chunk_duration, _ in results), 3)
+
+        return audio_data, duration_seconds, self._join_words(
+            (chunk_words, chunk_duration) for _, chunk_duration, chunk_words in results
+        )
+
+    async def _synthesize_incremental(
+        self,
+        segments: List[str],
+        voice_name: str,
+        rate: str,
+        pitch: str,
+        words: bool = False
     ) -> tuple:
         """
-        Internal method to generate audio file
+        Synthesize multi-sentence text from per-sentence cache entries.
+
+        Only sentences missing from the cache go to the backend, up to
+        CHUNK_CONCURRENCY at a time, and each is cached on its own so that a
+        resubmitted script with a few edited lines reuses everything else.
+        The track is joined from cached and fresh audio at the MP3 frame level.
         """
-        # Generate unique filename if not provided
-        if not output_filename:
-            temp_dir = tempfile.gettempdir()
-            unique_id = str(uuid.uuid4())
-            output_filename = os.path.join(temp_dir, f"tts_{unique_id}.mp3")
+        keys = [AudioCache.make_key(segment, voice_name, rate, pitch) for segment in segments]
+        with time_stage('cache_lookup'):
+            entries = await asyncio.to_thread(self._get_cached_many, set(keys))
+        for entry in entries.values():
+            CACHE_LOOKUPS.labels(result='hit' if entry else 'miss').inc()
 
-        voice_name = self._get_voice_name(language, gender)
-        
-        # Get prosody settings for emotion
-        prosody_settings = self.emotion_prosody.get(emotion, self.emotion_prosody['neutral'])
-        current_rate = prosody_settings['rate']
-        current_pitch = prosody_settings['pitch']
+        missing = {
+            key: segment for key, segment in zip(keys, segments)
+            if not entries[key] or (words and 'words' not in entries[key][1])
+        }
+        if missing:
+            semaphore = asyncio.Semaphore(config.CHUNK_CONCURRENCY)
 
-        print(f"Generating audio with voice: {voice_name}, rate: {current_rate}, pitch: {current_pitch}")
-        
-        communicate = edge_tts.Communicate(
-            text=text,
-            voice=voice_name,
-            rate=current_rate,
-            pitch=current_pitch
+            async def generate_segment(segment: str) -> tuple:
+                async with semaphore:
+                    return await self._generate_audio(segment, voice_name, rate, pitch, words)
+
+            async with self.admission.slot(voice_name):
+                with time_stage('synthesis'):
+                    # Sentences shared with a concurrent request are synthesized once
+                    results = await asyncio.gather(*(
+                        self.single_flight.do(('sentence', key, words), lambda segment=segment: generate_segment(segment))
+                        for key, segment in missing.items()
+                    ))
+
+            fresh = {}
+            for key, (audio_data, duration, segment_words) in zip(missing, results):
+                metadata = {'duration_seconds': duration, 'voice_name': voice_name}
+                if words:
+                    metadata['words'] = segment_words
+                fresh[key] = (audio_data, metadata)
+            with time_stage('file_io'):
+                await asyncio.to_thread(self._put_cached_many, fresh)
+            entries.update(fresh)
+
+        synthesized = sum(1 for key in keys if key in missing)
+        metadata = {
+            'duration_seconds': round(sum(entries[key][1]['duration_seconds'] for key in keys), 3),
+            'voice_name': voice_name,
+            'sentences_reused': len(keys) - synthesized,
+            'sentences_synthesized': synthesized
+        }
+        if words:
+            metadata['words'] = self._join_words(
+                (entries[key][1]['words'], entries[key][1]['duration_seconds']) for key in keys
+            )
+        return join_mp3([entries[key][0] for key in keys]), metadata
+
+    @staticmethod
+    def _join_words(parts) -> List[Dict]:
+        """Concatenate the word timings of (words, duration) parts played back to back"""
+        words = []
+        offset = 0.0
+        for part_words, duration in parts:
+            words.extend(shift_words(part_words, offset))
+            offset += duration
+        return words
+
+    @staticmethod
+    def _captions(words: List[Dict]) -> Dict:
+        return {'words': words, 'srt': to_srt(words), 'vtt': to_vtt(words)}
+
+    def _get_cached_many(self, keys) -> Dict[str, Optional[tuple]]:
+        return {key: self.cache.get(key) for key in keys}
+
+    def _put_cached_many(self, entries: Dict[str, tuple]):
+        for key, (audio_data, metadata) in entries.items():
+            self.cache.put(key, audio_data, metadata)
+
+    def _build_response(self, request: TTSRequest, metadata: Dict, audio_id: Optional[str] = None) -> TTSResponse:
+        """Build the response model from synthesis metadata"""
+        return TTSResponse(
+            audio_url=f"/audio/{audio_id}" if audio_id else None,
+            duration_seconds=metadata['duration_seconds'],
+            language=request.language,
+            gender=request.gender,
+            emotion=request.emotion,
+            voice_name=metadata['voice_name'],
+            output_format=request.output_format,
+            quality=request.quality,
+            sentences_reused=metadata.get('sentences_reused'),
+            sentences_synthesized=metadata.get('sentences_synthesized'),
+            **(self._captions(metadata['words']) if request.captions else {})
         )
 
+    async def _generate_audio(
+        self,
+        text: str,
+        voice_name: str,
+        rate: str,
+        pitch: str,
+        words: bool = False
+    ) -> tuple:
+        """
+        Internal method to generate audio in memory.
+
+        Chunks are collected into one buffer sized up front from the text
+        length and the duration is read from the MP3 frame headers, so the
+        filesystem is never touched. With words=True the backend's
+        WordBoundary events are collected in the same pass.
+
+        Returns (audio_data, duration_seconds, word_timings).
+        """
+        logger.debug("Generating audio with voice: %s, rate: %s, pitch: %s", voice_name, rate, pitch)
+        
+        audio_buffer = AudioBuffer(len(text) * self.ESTIMATED_BYTES_PER_CHAR)
+        word_timings = []
+        boundary = 'WordBoundary' if words else 'SentenceBoundary'
         try:
-            await communicate.save(output_filename)
-            print(f"Successfully saved audio to: {output_filename}")
+            async for chunk in self._backend_stream(text, voice_name, rate, pitch, boundary):
+                if chunk["type"] == "audio":
+                    audio_buffer.write(chunk["data"])
+                elif chunk["type"] == "WordBoundary":
+                    word_timings.append(word_from_boundary(chunk))
+        except CircuitOpenError:
+            raise
+        except TTSBackendError as e:
+            raise TTSBackendError(f"Error streaming audio: {e}")
         except Exception as e:
-            print(f"Error saving audio using communicate.save(): {e}")
-            # Fallback to streaming
-            audio_buffer = bytearray()
-            try:
-                async for chunk in communicate.stream():
-                    if chunk["type"] == "audio":
-                        audio_buffer.extend(chunk["data"])
-                
-                if not audio_buffer:
-                    raise Exception("No audio data received from stream")
-                
-                with open(output_filename, "wb") as f:
-                    f.write(audio_buffer)
-                print(f"Successfully streamed and saved audio to: {output_filename}")
-            except Exception as stream_e:
-                raise Exception(f"Error streaming and saving audio: {stream_e}")
-
-        # Get duration of the saved file
-        duration_seconds = self._get_audio_duration(output_filename)
+            raise Exception(f"Error streaming audio: {e}")
+
+        if not len(audio_buffer):
+            raise Exception("No audio data received from stream")
+
+        audio_data = audio_buffer.getvalue()
+        with time_stage('duration_probe'):
+            duration_seconds = self._get_audio_duration(audio_data)
         
-        return output_filename, duration_seconds, voice_name
+        return audio_data, duration_seconds, word_timings
+
+    async def _backend_stream(
+        self,
+        text: str,
+        voice_name: str,
+        rate: str,
+        pitch: str,
+        boundary: str = 'SentenceBoundary'
+    ) -> AsyncIterator[Dict]:
+        """
+        Stream from the backend, recording the time to its first message
+        (backend_connect) and to its first audio chunk (first_audio)
+        """
+        started = time.perf_counter()
+        connected = False
+        first_audio = False
+        BACKEND_STREAMS_IN_FLIGHT.inc()
+        try:
+            async for chunk in self.backend.stream(text, voice_name, rate, pitch, boundary):
+                if not connected:
+                    connected = True
+                    observe_stage('backend_connect', time.perf_counter() - started)
+                if chunk["type"] == "audio" and not first_audio:
+                    first_audio = True
+                    observe_stage('first_audio', time.perf_counter() - started)
+                yield chunk
+        except Exception:
+            BACKEND_ERRORS.inc()
+            raise
+        finally:
+            BACKEND_STREAMS_IN_FLIGHT.dec()
+
+    def _count_request(self, request: TTSRequest, voice_name: str):
+        """Count a request by language, voice and emotion, folding unknown values into 'other'"""
+        SYNTHESIS_REQUESTS.labels(
+            language=request.language if self.voice_catalog.has_locale(request.language) else 'other',
+            voice=voice_name,
+            emotion=request.emotion if request.emotion in self.emotion_prosody else 'other'
+        ).inc()
+
+    def _get_prosody(self, emotion: str) -> tuple:
+        """Get (rate, pitch) prosody settings for an emotion"""
+        prosody_settings = self.emotion_prosody.get(emotion, self.emotion_prosody['neutral'])
+        return prosody_settings['rate'], prosody_settings['pitch']
 
     def _get_voice_name(self, language: str, gender: str) -> str:
-        """Get the voice name for given language and gender"""
-        voice_map = self.default_voices.get(language, self.default_voices['en-US'])
-        voice_name = voice_map.get(gender, voice_map.get('female') or voice_map.get('male'))
+        """Get the voice name for given language and gender, falling back to English"""
+        voice_name = self.voice_catalog.voice_for(language, gender) or self.voice_catalog.voice_for('en-US', gender)
         
         if not voice_name:
-            print(f"Could not find a voice for {language} / {gender}. Using default en-US-AriaNeural.")
+            logger.warning("Could not find a voice for %s / %s. Using default en-US-AriaNeural.", language, gender)
             voice_name = 'en-US-AriaNeural'
         
         return voice_name
 
-    def _get_audio_duration(self, file_path: str) -> float:
-        """Get duration of audio file in seconds"""
-        duration_seconds = 0.0
-        
-        if os.path.exists(file_path) and os.path.getsize(file_path) > 0:
-            try:
-                audio_info = MP3(file_path)
-                duration_seconds = audio_info.info.length
-                print(f"Duration of '{file_path}': {duration_seconds:.2f} seconds")
-            except Exception as e:
-                print(f"Error reading duration from '{file_path}': {e}")
-                # Could add pydub fallback here if needed
-        else:
-            print(f"Output file '{file_path}' does not exist or is empty")
-            
+    def _get_audio_duration(self, audio_data: bytes) -> float:
+        """Get duration of in-memory MP3 data in seconds"""
+        duration_seconds = get_mp3_duration(audio_data)
+        if not duration_seconds:
+            logger.warning("Could not find any MP3 frames in the generated audio")
         return round(duration_seconds, 3)
 
+    def _write_file(self, file_path: str, audio_data: bytes):
+        """Write audio to a caller-requested output file"""
+        with open(file_path, 'wb') as f:
+            f.write(audio_data)
+
     def get_supported_languages(self) -> SupportedLanguages:
         """Get supported languages response"""
-        return SupportedLanguages(languages=list(self.default_voices.keys()))
+        return SupportedLanguages(languages=self.voice_catalog.languages())
 
     def get_supported_voices(self) -> SupportedVoices:
         """Get supported voices response"""
-        return SupportedVoices(voices=self.default_voices)
+        return SupportedVoices(voices=self.voice_catalog.voice_map(), styles=self.voice_catalog.styles())
 
     def get_supported_emotions(self) -> Dict[str, List[str]]:
         """Get supported emotions response"""
@@ -192,17 +765,45 @@ class TTSService:
 
     def get_health_status(self) -> HealthResponse:
         """Get health status response"""
+        circuit = self.get_backend_stats().get('circuit')
+        circuit_state = circuit['state'] if circuit else None
         return HealthResponse(
-            status='ok',
-            available_languages=list(self.default_voices.keys()),
-            available_emotions=list(self.emotion_prosody.keys())
+            status='degraded' if circuit_state == 'open' else 'ok',
+            backend_circuit=circuit_state,
+            available_languages=self.voice_catalog.languages(),
+            available_emotions=list(self.emotion_prosody.keys()),
+            **self.admission.stats()
         )
 
+    def get_cache_stats(self) -> Dict:
+        """Get synthesis cache counters"""
+        if not self.cache:
+            return {'enabled': False}
+        return {'enabled': True, **self.cache.stats()}
+
+    def get_backend_stats(self) -> Dict:
+        """Get retry, hedging and circuit breaker counters for the synthesis backend"""
+        if not isinstance(self.backend, ResilientBackend):
+            return {'name': self.backend.name, 'resilience': False}
+        return {'name': self.backend.name, 'resilience': True, **self.backend.stats()}
+
+    def get_transcoder_stats(self) -> Dict:
+        """Get ffmpeg availability and transcode counters"""
+        return self.transcoder.stats()
+
+    def get_voice_catalog_stats(self) -> Dict:
+        """Get the voice catalog's source, size and refresh counters"""
+        return self.voice_catalog.stats()
+
+    def get_single_flight_stats(self) -> Dict:
+        """Get counters for coalesced identical requests"""
+        return self.single_flight.stats()
+
     def cleanup_file(self, file_path: str):
         """Clean up temporary files"""
         try:
             if file_path and os.path.exists(file_path):
                 os.remove(file_path)
-                print(f"Cleaned up file: {file_path}")
+                logger.info("Cleaned up file: %s", file_path)
         except OSError as e:
-            print(f"Error cleaning up file {file_path}: {e}")
\ No newline at end of file
+            logger.error("Error cleaning up file %s: %s", file_path, e)
\ No newline at end of file
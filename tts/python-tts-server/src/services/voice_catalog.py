@@ -0,0 +1,203 @@
+import asyncio
+import json
+import os
+import time
+from typing import Dict, Iterable, List, Optional
+from src.services.tts_backends import TTSBackend
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Voice list shipped with the server, used until the backend has been reached once
+SNAPSHOT_PATH = os.path.join(os.path.dirname(__file__), 'voices_snapshot.json')
+
+
+class VoiceIndex:
+    """
+    Immutable lookup tables built from one voice list.
+
+    Every query is a dict lookup. A refresh builds a new index and swaps it in
+    whole, so readers never see a half-built catalog and need no lock.
+    """
+
+    def __init__(
+        self,
+        voices: List[Dict],
+        preferred: Dict[str, Dict[str, str]],
+        style_voices: Dict[str, List[str]],
+        source: str,
+        loaded_at: float
+    ):
+        self.source = source
+        self.loaded_at = loaded_at
+        self.voices: Dict[str, Dict] = {}
+        by_locale: Dict[str, Dict[str, List[str]]] = {}
+        by_style: Dict[str, List[str]] = {}
+
+        for voice in voices:
+            short_name = voice.get('ShortName')
+            locale = voice.get('Locale')
+            if not short_name or not locale:
+                continue
+            self.voices[short_name] = voice
+            gender = (voice.get('Gender') or '').lower()
+            by_locale.setdefault(locale, {}).setdefault(gender, []).append(short_name)
+
+            styles = voice.get('StyleList') or style_voices.get(short_name, [])
+            for style in styles:
+                by_style.setdefault(style, []).append(short_name)
+
+        # The voice for each locale and gender: the configured preference if the
+        # backend offers it, otherwise the first voice listed
+        self.defaults: Dict[str, Dict[str, str]] = {}
+        for locale, genders in by_locale.items():
+            choice = {}
+            for gender, names in genders.items():
+                wanted = preferred.get(locale, {}).get(gender)
+                choice[gender] = wanted if wanted in self.voices else names[0]
+            self.defaults[locale] = choice
+
+        self.by_locale = by_locale
+        self.by_style = by_style
+        self.languages = sorted(self.defaults)
+
+    def voice_for(self, locale: str, gender: str) -> Optional[str]:
+        genders = self.defaults.get(locale)
+        if not genders:
+            return None
+        return genders.get(gender) or genders.get('female') or next(iter(genders.values()), None)
+
+
+class VoiceCatalog:
+    """
+    The backend's voice list, indexed by locale, gender and speaking style.
+
+    The catalog is loaded from the disk cache, or from the bundled snapshot
+    when there is none, so it is usable immediately and offline. start()
+    launches a background task that refreshes it from the backend whenever
+    it is older than ttl_seconds; a failed refresh keeps the current index
+    and is retried after retry_seconds. Lookups never wait on the backend.
+    """
+
+    def __init__(
+        self,
+        backend: TTSBackend,
+        cache_path: str,
+        ttl_seconds: float,
+        retry_seconds: float,
+        preferred: Dict[str, Dict[str, str]],
+        style_voices: Dict[str, Iterable[str]],
+        snapshot_path: str = SNAPSHOT_PATH
+    ):
+        self.backend = backend
+        self.cache_path = cache_path
+        self.ttl_seconds = ttl_seconds
+        self.retry_seconds = retry_seconds
+        self.preferred = preferred
+        self.style_voices = {name: list(styles) for name, styles in style_voices.items()}
+        self.snapshot_path = snapshot_path
+
+        self.refreshes = 0
+        self.refresh_failures = 0
+        self._task: Optional[asyncio.Task] = None
+        self._index = self._load_initial()
+
+    @property
+    def index(self) -> VoiceIndex:
+        return self._index
+
+    def voice_for(self, locale: str, gender: str) -> Optional[str]:
+        """Default voice for a locale and gender, or None if the locale is unknown"""
+        return self._index.voice_for(locale, gender)
+
+    def has_locale(self, locale: str) -> bool:
+        return locale in self._index.defaults
+
+    def languages(self) -> List[str]:
+        return self._index.languages
+
+    def voice_map(self) -> Dict[str, Dict[str, str]]:
+        """Default voice per locale and gender"""
+        return self._index.defaults
+
+    def voices_with_style(self, style: str) -> List[str]:
+        return self._index.by_style.get(style, [])
+
+    def styles(self) -> Dict[str, List[str]]:
+        return self._index.by_style
+
+    def stats(self) -> Dict:
+        index = self._index
+        return {
+            'source': index.source,
+            'voices': len(index.voices),
+            'languages': len(index.languages),
+            'age_seconds': round(time.time() - index.loaded_at, 1) if index.loaded_at else None,
+            'refreshes': self.refreshes,
+            'refresh_failures': self.refresh_failures
+        }
+
+    async def start(self):
+        """Start refreshing in the background"""
+        if not self._task:
+            self._task = asyncio.ensure_future(self._refresh_loop())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def refresh(self) -> bool:
+        """Fetch the voice list from the backend and swap in a new index"""
+        try:
+            voices = await self.backend.list_voices()
+            if not voices:
+                raise ValueError('Backend returned no voices')
+            index = self._build(voices, 'backend', time.time())
+            await asyncio.to_thread(self._write_cache, voices)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.refresh_failures += 1
+            logger.warning("Voice catalog refresh failed, keeping %s catalog: %s", self._index.source, e)
+            return False
+
+        self._index = index
+        self.refreshes += 1
+        logger.info("Voice catalog refreshed: %d voices in %d languages", len(index.voices), len(index.languages))
+        return True
+
+    async def _refresh_loop(self):
+        while True:
+            age = time.time() - self._index.loaded_at
+            if self._index.source == 'snapshot' or age >= self.ttl_seconds:
+                delay = self.ttl_seconds if await self.refresh() else self.retry_seconds
+            else:
+                delay = self.ttl_seconds - age
+            await asyncio.sleep(delay)
+
+    def _load_initial(self) -> VoiceIndex:
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                voices = json.load(f)
+            index = self._build(voices, 'disk', os.path.getmtime(self.cache_path))
+            if index.voices:
+                return index
+        except (OSError, ValueError, AttributeError):
+            pass
+
+        with open(self.snapshot_path, 'r', encoding='utf-8') as f:
+            voices = json.load(f)
+        return self._build(voices, 'snapshot', 0.0)
+
+    def _build(self, voices: List[Dict], source: str, loaded_at: float) -> VoiceIndex:
+        return VoiceIndex(voices, self.preferred, self.style_voices, source, loaded_at)
+
+    def _write_cache(self, voices: List[Dict]):
+        if os.path.dirname(self.cache_path):
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+        tmp_path = f"{self.cache_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(voices, f)
+        os.replace(tmp_path, self.cache_path)
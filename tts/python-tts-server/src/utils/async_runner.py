@@ -0,0 +1,89 @@
+import asyncio
+import concurrent.futures
+import threading
+from typing import Any, AsyncIterator, Awaitable, Iterator, Optional
+
+
+class AsyncRunner:
+    """
+    Runs coroutines on a single long-lived event loop owned by a background thread.
+
+    Flask handlers are synchronous, so each worker thread hands its coroutine to
+    the shared loop and blocks on the result. All in-flight syntheses therefore
+    share one loop instead of paying for a fresh loop per request.
+    """
+
+    def __init__(self, name: str = 'tts-event-loop'):
+        self._name = name
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        """Return the shared loop, starting it on first use"""
+        if self._loop is None:
+            with self._lock:
+                if self._loop is None:
+                    self._start()
+        return self._loop
+
+    def _start(self):
+        loop = asyncio.new_event_loop()
+        started = threading.Event()
+
+        def run_loop():
+            asyncio.set_event_loop(loop)
+            loop.call_soon(started.set)
+            loop.run_forever()
+
+        self._thread = threading.Thread(target=run_loop, name=self._name, daemon=True)
+        self._thread.start()
+        started.wait()
+        self._loop = loop
+
+    def submit(self, coro: Awaitable) -> concurrent.futures.Future:
+        """Schedule a coroutine on the shared loop without waiting; cancelling the future cancels it"""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro: Awaitable, timeout: Optional[float] = None) -> Any:
+        """Run a coroutine on the shared loop and wait for its result"""
+        future = self.submit(coro)
+        try:
+            return future.result(timeout)
+        except BaseException:
+            future.cancel()
+            raise
+
+    def iterate(self, async_iter: AsyncIterator, timeout: Optional[float] = None) -> Iterator:
+        """
+        Drive an async iterator on the shared loop from synchronous code.
+
+        Closing the returned generator early (e.g. the client disconnected)
+        closes the async iterator on the loop as well.
+        """
+        async def next_item():
+            return await async_iter.__anext__()
+
+        try:
+            while True:
+                try:
+                    item = self.run(next_item(), timeout)
+                except StopAsyncIteration:
+                    return
+                yield item
+        finally:
+            aclose = getattr(async_iter, 'aclose', None)
+            if aclose is not None:
+                self.run(aclose())
+
+    def stop(self):
+        """Stop the shared loop and wait for its thread to exit"""
+        with self._lock:
+            if self._loop is None:
+                return
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._loop.close()
+            self._loop = None
+            self._thread = None
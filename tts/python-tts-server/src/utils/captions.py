@@ -0,0 +1,89 @@
+from typing import Dict, List
+
+# Boundary offsets and durations from the backend are in 100-nanosecond ticks
+TICKS_PER_SECOND = 10_000_000
+
+
+def word_from_boundary(chunk: Dict, offset_seconds: float = 0.0) -> Dict:
+    """Convert a WordBoundary event to {'word', 'start', 'end'} in seconds"""
+    start = chunk['offset'] / TICKS_PER_SECOND + offset_seconds
+    return {
+        'word': chunk['text'],
+        'start': round(start, 3),
+        'end': round(start + chunk['duration'] / TICKS_PER_SECOND, 3)
+    }
+
+
+def shift_words(words: List[Dict], offset_seconds: float) -> List[Dict]:
+    """Move word timings later by offset_seconds, e.g. for a chunk joined after others"""
+    if not offset_seconds:
+        return list(words)
+    return [
+        {
+            'word': word['word'],
+            'start': round(word['start'] + offset_seconds, 3),
+            'end': round(word['end'] + offset_seconds, 3)
+        }
+        for word in words
+    ]
+
+
+def build_cues(
+    words: List[Dict],
+    max_chars: int = 42,
+    max_duration: float = 5.0,
+    max_gap: float = 0.8
+) -> List[Dict]:
+    """
+    Group words into caption cues of one line each.
+
+    A new cue starts when the line would exceed max_chars, the cue would last
+    longer than max_duration, or there is a pause longer than max_gap.
+    """
+    cues = []
+    current = None
+    for word in words:
+        if current is not None:
+            text = f"{current['text']} {word['word']}"
+            if (
+                len(text) > max_chars
+                or word['end'] - current['start'] > max_duration
+                or word['start'] - current['end'] > max_gap
+            ):
+                cues.append(current)
+                current = None
+            else:
+                current['text'] = text
+                current['end'] = word['end']
+                continue
+        current = {'start': word['start'], 'end': word['end'], 'text': word['word']}
+
+    if current is not None:
+        cues.append(current)
+    return cues
+
+
+def to_srt(words: List[Dict]) -> str:
+    """Render word timings as SubRip captions"""
+    blocks = [
+        f"{number}\n{_timestamp(cue['start'], ',')} --> {_timestamp(cue['end'], ',')}\n{cue['text']}\n"
+        for number, cue in enumerate(build_cues(words), start=1)
+    ]
+    return '\n'.join(blocks)
+
+
+def to_vtt(words: List[Dict]) -> str:
+    """Render word timings as WebVTT captions"""
+    blocks = [
+        f"{_timestamp(cue['start'], '.')} --> {_timestamp(cue['end'], '.')}\n{cue['text']}\n"
+        for cue in build_cues(words)
+    ]
+    return 'WEBVTT\n\n' + '\n'.join(blocks)
+
+
+def _timestamp(seconds: float, separator: str) -> str:
+    millis = max(0, round(seconds * 1000))
+    hours, millis = divmod(millis, 3_600_000)
+    minutes, millis = divmod(millis, 60_000)
+    secs, millis = divmod(millis, 1000)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d}{separator}{millis:03d}"
@@ -0,0 +1,40 @@
+import atexit
+import logging
+import logging.handlers
+import queue
+import sys
+import threading
+from config import config
+
+_lock = threading.Lock()
+_listener = None
+
+
+def get_logger(name: str) -> logging.Logger:
+    """
+    Return a logger whose records are written by a background thread.
+
+    Callers only put records on an in-memory queue, so logging on the
+    request path never blocks on stdout.
+    """
+    _start_listener()
+    return logging.getLogger(name)
+
+
+def _start_listener():
+    global _listener
+    with _lock:
+        if _listener:
+            return
+
+        records = queue.SimpleQueue()
+        handler = logging.StreamHandler(sys.stdout)
+        handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(name)s: %(message)s'))
+        _listener = logging.handlers.QueueListener(records, handler, respect_handler_level=True)
+        _listener.start()
+        atexit.register(_listener.stop)
+
+        root = logging.getLogger('src')
+        root.setLevel(config.LOG_LEVEL)
+        root.addHandler(logging.handlers.QueueHandler(records))
+        root.propagate = False
@@ -0,0 +1,86 @@
+import time
+from contextlib import contextmanager
+from prometheus_client import Counter, Gauge, Histogram
+
+# Stages of a synthesis request, timed separately so slow steps stand out:
+# validation, voice_resolution, cache_lookup, backend_connect, first_audio,
+# synthesis, duration_probe, file_io and response_write
+STAGE_SECONDS = Histogram(
+    'tts_stage_seconds',
+    'Time spent in each stage of a synthesis request',
+    ['stage'],
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+)
+
+SYNTHESIS_REQUESTS = Counter(
+    'tts_synthesis_requests_total',
+    'Synthesis requests by language, voice and emotion',
+    ['language', 'voice', 'emotion']
+)
+
+CACHE_LOOKUPS = Counter(
+    'tts_cache_lookups_total',
+    'Synthesis cache lookups by result',
+    ['result']
+)
+
+BACKEND_ERRORS = Counter(
+    'tts_backend_errors_total',
+    'Backend streams that failed'
+)
+
+HTTP_REQUESTS = Counter(
+    'tts_http_requests_total',
+    'HTTP requests by route, method and status code',
+    ['endpoint', 'method', 'status']
+)
+
+HTTP_IN_FLIGHT = Gauge(
+    'tts_http_requests_in_flight',
+    'HTTP requests currently being handled'
+)
+
+SYNTHESES_IN_FLIGHT = Gauge(
+    'tts_syntheses_in_flight',
+    'Syntheses currently holding an admission slot'
+)
+
+ADMISSION_QUEUE_DEPTH = Gauge(
+    'tts_admission_queue_depth',
+    'Syntheses waiting for an admission slot'
+)
+
+BACKEND_STREAMS_IN_FLIGHT = Gauge(
+    'tts_backend_streams_in_flight',
+    'Open streams to the synthesis backend'
+)
+
+BACKEND_RETRIES = Counter(
+    'tts_backend_retries_total',
+    'Backend requests retried after a failed attempt'
+)
+
+BACKEND_HEDGES = Counter(
+    'tts_backend_hedges_total',
+    'Hedged backend requests by which attempt produced audio first',
+    ['winner']
+)
+
+CIRCUIT_OPEN = Gauge(
+    'tts_backend_circuit_open',
+    'Whether the backend circuit breaker is open and failing requests fast'
+)
+
+
+@contextmanager
+def time_stage(stage: str):
+    """Observe the time spent in the block under the given stage"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_SECONDS.labels(stage=stage).observe(time.perf_counter() - started)
+
+
+def observe_stage(stage: str, seconds: float):
+    STAGE_SECONDS.labels(stage=stage).observe(seconds)
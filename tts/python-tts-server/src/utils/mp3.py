@@ -0,0 +1,232 @@
+import math
+from typing import Iterator, List, NamedTuple, Optional, Tuple
+
+# Bitrates in kbps indexed by [version_key][layer][bitrate_index]
+# version_key is 1 for MPEG-1 and 2 for MPEG-2/2.5
+_BITRATES = {
+    1: {
+        1: (0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448),
+        2: (0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384),
+        3: (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    },
+    2: {
+        1: (0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256),
+        2: (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+        3: (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+    },
+}
+
+# Sample rates indexed by the two version bits of the header
+_SAMPLE_RATES = {
+    0b11: (44100, 48000, 32000),  # MPEG-1
+    0b10: (22050, 24000, 16000),  # MPEG-2
+    0b00: (11025, 12000, 8000),   # MPEG-2.5
+}
+
+_LAYERS = {0b11: 1, 0b10: 2, 0b01: 3}
+
+HEADER_SIZE = 4
+ID3V2_HEADER_SIZE = 10
+
+
+class FrameHeader(NamedTuple):
+    frame_length: int
+    samples: int
+    sample_rate: int
+    bitrate: int
+    channels: int
+
+
+def parse_frame_header(data, offset: int = 0) -> Optional[FrameHeader]:
+    """Parse the MPEG audio frame header at offset, or return None if there is none"""
+    if len(data) - offset < HEADER_SIZE:
+        return None
+
+    b1, b2, b3 = data[offset + 1], data[offset + 2], data[offset + 3]
+    if data[offset] != 0xFF or (b1 & 0xE0) != 0xE0:
+        return None
+
+    version_bits = (b1 >> 3) & 0b11
+    layer = _LAYERS.get((b1 >> 1) & 0b11)
+    bitrate_index = (b2 >> 4) & 0b1111
+    sample_rate_index = (b2 >> 2) & 0b11
+    if version_bits not in _SAMPLE_RATES or layer is None:
+        return None
+    if bitrate_index in (0, 0b1111) or sample_rate_index == 0b11:
+        return None
+
+    version_key = 1 if version_bits == 0b11 else 2
+    bitrate = _BITRATES[version_key][layer][bitrate_index] * 1000
+    sample_rate = _SAMPLE_RATES[version_bits][sample_rate_index]
+    padding = (b2 >> 1) & 0b1
+    channels = 1 if (b3 >> 6) == 0b11 else 2
+
+    if layer == 1:
+        samples = 384
+        frame_length = (12 * bitrate // sample_rate + padding) * 4
+    elif layer == 2:
+        samples = 1152
+        frame_length = 144 * bitrate // sample_rate + padding
+    else:
+        samples = 1152 if version_key == 1 else 576
+        frame_length = (samples // 8) * bitrate // sample_rate + padding
+
+    return FrameHeader(frame_length, samples, sample_rate, bitrate, channels)
+
+
+def id3v2_size(data, offset: int = 0) -> int:
+    """Return the total size of an ID3v2 tag at offset, or 0 if there is none"""
+    if len(data) - offset < ID3V2_HEADER_SIZE or bytes(data[offset:offset + 3]) != b'ID3':
+        return 0
+    size_bytes = data[offset + 6:offset + 10]
+    size = 0
+    for b in size_bytes:
+        size = (size << 7) | (b & 0x7F)
+    footer = ID3V2_HEADER_SIZE if data[offset + 5] & 0x10 else 0
+    return ID3V2_HEADER_SIZE + size + footer
+
+
+def iter_frames(data) -> Iterator[Tuple[int, FrameHeader]]:
+    """Yield (offset, header) for every complete MPEG audio frame in data"""
+    offset = id3v2_size(data)
+    end = len(data)
+    while offset + HEADER_SIZE <= end:
+        header = parse_frame_header(data, offset)
+        if header is None or header.frame_length <= 0:
+            offset += 1
+            continue
+        if offset + header.frame_length > end:
+            break
+        yield offset, header
+        offset += header.frame_length
+
+
+def get_mp3_duration(data) -> float:
+    """Get the duration of in-memory MP3 data in seconds by counting frames"""
+    return sum(header.samples / header.sample_rate for _, header in iter_frames(data))
+
+
+def silent_frame(sample_rate: int = 24000, bitrate: int = 48000, channels: int = 1) -> bytes:
+    """
+    Build one MPEG Layer III frame that decodes to silence.
+
+    With all-zero side information the decoder reads no main data, so the
+    frame carries no sound. The defaults match the backend's output format.
+    """
+    for version_bits, rates in _SAMPLE_RATES.items():
+        if sample_rate in rates:
+            break
+    else:
+        raise ValueError(f"Unsupported sample rate: {sample_rate}")
+
+    version_key = 1 if version_bits == 0b11 else 2
+    bitrate_index = _BITRATES[version_key][3].index(bitrate // 1000)
+    sample_rate_index = rates.index(sample_rate)
+    channel_mode = 0b11 if channels == 1 else 0b00
+
+    header = bytes([
+        0xFF,
+        0xE0 | (version_bits << 3) | (0b01 << 1) | 0b1,  # Layer III, no CRC
+        (bitrate_index << 4) | (sample_rate_index << 2),
+        (channel_mode << 6) | 0b100                        # Original media
+    ])
+    frame_length = parse_frame_header(header).frame_length
+    return header + bytes(frame_length - HEADER_SIZE)
+
+
+def silence(duration_seconds: float, sample_rate: int = 24000, bitrate: int = 48000, channels: int = 1) -> bytes:
+    """Build silent frames lasting at least duration_seconds"""
+    frame = silent_frame(sample_rate, bitrate, channels)
+    samples = parse_frame_header(frame).samples
+    count = math.ceil(round(duration_seconds * sample_rate / samples, 6))
+    return frame * max(count, 0)
+
+
+def frame_span(data) -> Tuple[int, int]:
+    """Return (start, end) of the run of complete frames, excluding tags and partial frames"""
+    start = end = None
+    for offset, header in iter_frames(data):
+        if start is None:
+            start = offset
+        end = offset + header.frame_length
+    if start is None:
+        return 0, 0
+    return start, end
+
+
+def join_mp3(parts: List[bytes]) -> bytes:
+    """
+    Concatenate MP3 streams at frame boundaries without re-encoding.
+
+    Leading ID3 tags and trailing partial frames of each part are dropped so the
+    result is one continuous frame sequence.
+    """
+    frames = []
+    for data in parts:
+        start, end = frame_span(data)
+        frames.append(memoryview(data)[start:end])
+    return b''.join(frames)
+
+
+class Mp3DurationCounter:
+    """
+    Incrementally counts MP3 frames as chunks arrive, so the duration of a
+    stream is known at the end without keeping the whole stream in memory.
+    """
+
+    def __init__(self):
+        self._pending = bytearray()
+        self._started = False
+        self._skip = 0
+        self.frames = 0
+        self.duration = 0.0
+
+    def feed(self, chunk: bytes):
+        """Consume the next chunk of the stream"""
+        self._pending.extend(chunk)
+
+        if not self._started:
+            if len(self._pending) < ID3V2_HEADER_SIZE:
+                return
+            self._skip = id3v2_size(self._pending)
+            self._started = True
+
+        if self._skip:
+            skipped = min(self._skip, len(self._pending))
+            del self._pending[:skipped]
+            self._skip -= skipped
+
+        offset = 0
+        end = len(self._pending)
+        while offset + HEADER_SIZE <= end:
+            header = parse_frame_header(self._pending, offset)
+            if header is None or header.frame_length <= 0:
+                offset += 1
+                continue
+            if offset + header.frame_length > end:
+                break
+            self.frames += 1
+            self.duration += header.samples / header.sample_rate
+            offset += header.frame_length
+        del self._pending[:offset]
+
+
+class AudioBuffer:
+    """Byte buffer allocated once for the expected size and grown only if needed"""
+
+    def __init__(self, initial_size: int):
+        self._buffer = bytearray(max(initial_size, 1))
+        self._length = 0
+
+    def write(self, data: bytes):
+        end = self._length + len(data)
+        if end > len(self._buffer):
+            self._buffer.extend(bytes(max(end, 2 * len(self._buffer)) - len(self._buffer)))
+        self._buffer[self._length:end] = data
+        self._length = end
+
+    def getvalue(self) -> bytes:
+        return bytes(memoryview(self._buffer)[:self._length])
+
+    def __len__(self) -> int:
+        return self._length
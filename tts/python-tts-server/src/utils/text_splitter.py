@@ -0,0 +1,152 @@
+import re
+from typing import List
+
+# Sentence terminators. Latin-script languages (including Vietnamese, Spanish,
+# French, German and Korean) need whitespace after the terminator so that
+# decimals and abbreviations like "3.14" stay intact; CJK terminators end a
+# sentence on their own because those scripts do not separate words by spaces.
+_SENTENCE_END = re.compile(
+    r'[.!?…]+["\'”’»)\]]*(?=\s|$)'
+    r'|[。！？｡．]+[」』”’）)]*'
+    r'|\n+'
+)
+
+# Places to break a sentence that is too long on its own, most natural first
+_CLAUSE_END = re.compile(r'[,;:，、；：]+\s*')
+_WHITESPACE = re.compile(r'\s+')
+
+
+def split_sentences(text: str) -> List[str]:
+    """Split text into sentences, keeping the terminating punctuation"""
+    sentences = []
+    start = 0
+    for match in _SENTENCE_END.finditer(text):
+        sentence = text[start:match.end()].strip()
+        if sentence:
+            sentences.append(sentence)
+        start = match.end()
+
+    tail = text[start:].strip()
+    if tail:
+        sentences.append(tail)
+    return sentences
+
+
+def chunk_text(text: str, max_chars: int) -> List[str]:
+    """
+    Split text into chunks of at most max_chars characters.
+
+    Chunks are packed from whole sentences. A sentence longer than max_chars is
+    broken at clause punctuation, then at whitespace, and only as a last resort
+    in the middle of a word.
+    """
+    return _pack(split_segments(text, max_chars), max_chars)
+
+
+def split_segments(text: str, max_chars: int) -> List[str]:
+    """Split text into sentences, breaking any longer than max_chars like chunk_text"""
+    pieces = []
+    for sentence in split_sentences(text):
+        pieces.extend(_split_long(sentence, max_chars))
+    return pieces
+
+
+class SentenceAccumulator:
+    """
+    Collects text that arrives in fragments and releases complete sentences.
+
+    A sentence is complete once something follows its terminator, so an
+    abbreviation or a closing quote split across fragments is not cut early.
+    Text that grows past max_chars without a terminator is released in
+    pieces broken at clause punctuation or whitespace.
+    """
+
+    def __init__(self, max_chars: int):
+        self.max_chars = max_chars
+        self._buffer = ''
+
+    def feed(self, fragment: str) -> List[str]:
+        """Add a fragment and return the sentences it completed"""
+        self._buffer += fragment
+
+        end = 0
+        for match in _SENTENCE_END.finditer(self._buffer):
+            if match.end() < len(self._buffer):
+                end = match.end()
+
+        sentences = split_segments(self._buffer[:end], self.max_chars) if end else []
+        self._buffer = self._buffer[end:]
+
+        if len(self._buffer) > self.max_chars:
+            pieces = _split_long(self._buffer.strip(), self.max_chars)
+            # Keep the last piece, which may still grow, and the whitespace after it
+            sentences.extend(pieces[:-1])
+            tail = ' ' if self._buffer[-1].isspace() else ''
+            self._buffer = pieces[-1] + tail if pieces else ''
+        return sentences
+
+    def flush(self) -> List[str]:
+        """Return whatever text remains as final sentences"""
+        remaining, self._buffer = self._buffer, ''
+        return split_segments(remaining, self.max_chars)
+
+
+def _split_long(sentence: str, max_chars: int) -> List[str]:
+    if len(sentence) <= max_chars:
+        return [sentence]
+
+    for pattern in (_CLAUSE_END, _WHITESPACE):
+        pieces = _split_keeping(sentence, pattern)
+        if len(pieces) > 1:
+            result = []
+            for piece in pieces:
+                result.extend(_split_long(piece, max_chars))
+            return _pack(result, max_chars)
+
+    return [sentence[i:i + max_chars] for i in range(0, len(sentence), max_chars)]
+
+
+def _split_keeping(text: str, pattern: re.Pattern) -> List[str]:
+    """Split after every match of pattern, keeping the matched punctuation"""
+    pieces = []
+    start = 0
+    for match in pattern.finditer(text):
+        piece = text[start:match.end()].strip()
+        if piece:
+            pieces.append(piece)
+        start = match.end()
+    tail = text[start:].strip()
+    if tail:
+        pieces.append(tail)
+    return pieces
+
+
+def _pack(pieces: List[str], max_chars: int) -> List[str]:
+    packed = []
+    current = ''
+    for piece in pieces:
+        separator = _separator(current, piece)
+        if current and len(current) + len(separator) + len(piece) > max_chars:
+            packed.append(current)
+            current = piece
+        else:
+            current = f"{current}{separator}{piece}" if current else piece
+    if current:
+        packed.append(current)
+    return packed
+
+
+def _separator(left: str, right: str) -> str:
+    """Join with a space unless both sides are unspaced CJK text"""
+    if left and _is_cjk(left[-1]) and _is_cjk(right[0]):
+        return ''
+    return ' '
+
+
+def _is_cjk(char: str) -> bool:
+    code = ord(char)
+    return (
+        0x3000 <= code <= 0x30FF      # CJK punctuation, Hiragana, Katakana
+        or 0x3400 <= code <= 0x9FFF   # CJK ideographs
+        or 0xFF00 <= code <= 0xFFEF   # Fullwidth forms
+    )
@@ -0,0 +1,42 @@
+import io
+import zipfile
+
+
+class _ChunkWriter(io.RawIOBase):
+    """Unseekable sink that collects whatever zipfile writes until drained"""
+
+    def __init__(self):
+        self._chunks = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+class ZipStream:
+    """
+    Builds a ZIP archive incrementally so it can be sent as it is produced.
+
+    Each call returns the bytes to send next; the archive is complete once the
+    bytes returned by close() have been sent.
+    """
+
+    def __init__(self):
+        self._writer = _ChunkWriter()
+        self._zip = zipfile.ZipFile(self._writer, mode='w', compression=zipfile.ZIP_STORED)
+
+    def add(self, name: str, data: bytes) -> bytes:
+        self._zip.writestr(name, data)
+        return self._writer.drain()
+
+    def close(self) -> bytes:
+        self._zip.close()
+        return self._writer.drain()
@@ -0,0 +1,65 @@
+import asyncio
+import unittest
+from src.services.admission import AdmissionController, AdmissionRejected
+
+class TestAdmissionController(unittest.TestCase):
+
+    def _controller(self, **overrides):
+        settings = {'max_concurrent': 2, 'max_per_voice': 2, 'max_queue': 1, 'max_queue_wait': 1.0}
+        settings.update(overrides)
+        return AdmissionController(**settings)
+
+    async def _hold(self, controller, voice, delay):
+        async with controller.slot(voice):
+            await asyncio.sleep(delay)
+
+    def test_full_queue_is_rejected_with_retry_after(self):
+        controller = self._controller()
+
+        async def scenario():
+            holders = [asyncio.ensure_future(self._hold(controller, 'a', 0.1)) for _ in range(3)]
+            await asyncio.sleep(0.01)
+            with self.assertRaises(AdmissionRejected) as context:
+                await self._hold(controller, 'a', 0)
+            stats = controller.stats()
+            await asyncio.gather(*holders)
+            return context.exception, stats
+
+        error, stats = asyncio.run(scenario())
+        self.assertGreaterEqual(error.retry_after, 1)
+        self.assertEqual(stats['in_flight'], 2)
+        self.assertEqual(stats['queue_depth'], 1)
+        self.assertEqual(controller.stats()['in_flight'], 0)
+        self.assertEqual(controller.stats()['rejected'], 1)
+
+    def test_queue_wait_times_out(self):
+        controller = self._controller(max_concurrent=1, max_queue_wait=0.05)
+
+        async def scenario():
+            holder = asyncio.ensure_future(self._hold(controller, 'a', 0.2))
+            await asyncio.sleep(0.01)
+            with self.assertRaises(AdmissionRejected):
+                await self._hold(controller, 'a', 0)
+            await holder
+
+        asyncio.run(scenario())
+        self.assertEqual(controller.stats()['queue_depth'], 0)
+
+    def test_per_voice_limit_lets_other_voices_through(self):
+        controller = self._controller(max_concurrent=3, max_per_voice=1, max_queue=5)
+        order = []
+
+        async def run(voice, delay):
+            async with controller.slot(voice):
+                order.append(voice)
+                await asyncio.sleep(delay)
+
+        async def scenario():
+            await asyncio.gather(run('a', 0.05), run('a', 0), run('b', 0))
+
+        asyncio.run(scenario())
+        self.assertEqual(order, ['a', 'b', 'a'])
+        self.assertGreater(controller.stats()['queue_wait_ms_max'], 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,29 +1,154 @@
+import io
+import json
+import threading
 import unittest
-from fastapi.testclient import TestClient
-from src.api.routes import app
+import zipfile
+from unittest import mock
+from simple_websocket import Client, ConnectionClosed
+from werkzeug.serving import make_server
+from config import config
+from src.api import routes
+from src.services.tts_backends import FakeTTSBackend
+from src.utils.mp3 import get_mp3_duration
 
 class TestAPIRoutes(unittest.TestCase):
     def setUp(self):
-        self.client = TestClient(app)
+        self.original_backend = routes.tts_service.backend
+        routes.tts_service.backend = FakeTTSBackend(latency=0)
+        self.client = routes.app.test_client()
+
+    def tearDown(self):
+        routes.tts_service.backend = self.original_backend
 
     def test_text_to_speech(self):
-        response = self.client.post("/tts", json={"text": "Hello, world!", "language": "en-US", "emotion": "neutral"})
+        response = self.client.post("/synthesize", json={"text": "Hello, world!", "language": "en-US", "emotion": "neutral", "use_cache": False})
         self.assertEqual(response.status_code, 200)
-        self.assertIn("audio_content", response.json())
+        self.assertEqual(response.mimetype, "audio/mpeg")
+        self.assertGreater(float(response.headers["X-Duration-Seconds"]), 0)
 
     def test_invalid_language(self):
-        response = self.client.post("/tts", json={"text": "Hello, world!", "language": "invalid-lang", "emotion": "neutral"})
-        self.assertEqual(response.status_code, 400)
-        self.assertEqual(response.json()["detail"], "Invalid language specified.")
+        response = self.client.post("/synthesize", json={"text": "Hello, world!", "language": "invalid-lang", "emotion": "neutral", "use_cache": False})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers["X-Voice-Name"], "en-US-AriaNeural")
 
     def test_missing_text(self):
-        response = self.client.post("/tts", json={"language": "en-US", "emotion": "neutral"})
-        self.assertEqual(response.status_code, 422)
+        response = self.client.post("/synthesize", json={"language": "en-US", "emotion": "neutral"})
+        self.assertEqual(response.status_code, 400)
 
     def test_emotional_tone(self):
-        response = self.client.post("/tts", json={"text": "I'm so happy!", "language": "en-US", "emotion": "happy"})
+        response = self.client.post("/synthesize-json", json={"text": "I'm so happy!", "language": "en-US", "emotion": "cheerful", "use_cache": False})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()["emotion"], "cheerful")
+
+    def test_stream(self):
+        response = self.client.post("/synthesize/stream", json={"text": "Streaming hello"})
         self.assertEqual(response.status_code, 200)
-        self.assertIn("audio_content", response.json())
+        self.assertTrue(response.data.startswith(b"\xff\xf3"))
+    def test_synthesis_timeout(self):
+        routes.tts_service.backend = FakeTTSBackend(latency=1)
+        with mock.patch.object(config, 'SYNTHESIS_TIMEOUT', 0.1):
+            for path in ("/synthesize", "/synthesize-json"):
+                response = self.client.post(path, json={"text": "Too slow.", "use_cache": False})
+                self.assertEqual(response.status_code, 504)
+                self.assertEqual(response.get_json()["error"], "Synthesis timed out after 0.1s")
+
+    def test_batch_timeout_finishes_archive(self):
+        routes.tts_service.backend = FakeTTSBackend(latency=1)
+        with mock.patch.object(config, 'SYNTHESIS_TIMEOUT', 0.1):
+            response = self.client.post("/synthesize/batch", json={"items": [
+                {"text": "Too slow.", "use_cache": False},
+                {"text": "Also too slow.", "use_cache": False}
+            ]})
+            data = response.get_data()
+        manifest = json.loads(zipfile.ZipFile(io.BytesIO(data)).read("manifest.json"))
+        self.assertEqual([item["status_code"] for item in manifest["items"]], [504, 504])
+
+    def test_metrics(self):
+        # Servers close the response once it is written, which records response_write
+        self.client.post("/synthesize", json={"text": "Measure me", "language": "fr-FR", "emotion": "calm", "use_cache": False}).close()
+        response = self.client.get("/metrics")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.content_type.startswith("text/plain"))
+        body = response.get_data(as_text=True)
+        for stage in ("validation", "voice_resolution", "backend_connect", "first_audio", "synthesis", "duration_probe", "response_write"):
+            self.assertIn(f'tts_stage_seconds_count{{stage="{stage}"}}', body)
+        self.assertIn('tts_synthesis_requests_total{emotion="calm",language="fr-FR",voice="fr-FR-DeniseNeural"}', body)
+        self.assertIn("tts_syntheses_in_flight 0.0", body)
+
+class TestWebSocketStreaming(unittest.TestCase):
+    def setUp(self):
+        self.original_backend = routes.tts_service.backend
+        routes.tts_service.backend = FakeTTSBackend(latency=0.01)
+        self.server = make_server("127.0.0.1", 0, routes.app, threaded=True)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def _close(self, ws):
+        try:
+            ws.close()
+        except ConnectionClosed:
+            pass  # The server already closed the session
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.thread.join()
+        routes.tts_service.backend = self.original_backend
+
+    def test_sentences_stream_back_in_order(self):
+        ws = Client.connect(f"ws://127.0.0.1:{self.server.server_port}/synthesize/ws")
+        try:
+            ws.send(json.dumps({"type": "start", "language": "fr-FR", "emotion": "calm", "use_cache": False}))
+            for token in "Bonjour tout le monde. Comment allez- vous? Très bien".split(" "):
+                ws.send(json.dumps({"type": "text", "text": token + " "}))
+            ws.send(json.dumps({"type": "end"}))
+
+            sentences, audio = [], []
+            while True:
+                message = ws.receive(timeout=5)
+                if isinstance(message, bytes):
+                    audio.append(message)
+                    continue
+                event = json.loads(message)
+                if event["type"] == "done":
+                    break
+                self.assertEqual(event["type"], "sentence")
+                sentences.append(event)
+        finally:
+            self._close(ws)
+
+        self.assertEqual([event["index"] for event in sentences], [0, 1, 2])
+        self.assertEqual(sentences[0]["text"], "Bonjour tout le monde.")
+        self.assertEqual(sentences[2]["text"], "Très bien")
+        self.assertEqual(sentences[0]["voice_name"], "fr-FR-DeniseNeural")
+        self.assertEqual(event["sentences"], 3)
+        for sentence, clip in zip(sentences, audio):
+            self.assertAlmostEqual(sentence["duration_seconds"], get_mp3_duration(clip), places=3)
+
+    def test_slow_sentence_reports_timeout(self):
+        routes.tts_service.backend = FakeTTSBackend(latency=1)
+        ws = Client.connect(f"ws://127.0.0.1:{self.server.server_port}/synthesize/ws")
+        try:
+            with mock.patch.object(config, 'SYNTHESIS_TIMEOUT', 0.1):
+                ws.send(json.dumps({"type": "start", "use_cache": False}))
+                ws.send(json.dumps({"type": "text", "text": "This takes too long."}))
+                ws.send(json.dumps({"type": "end"}))
+                error = json.loads(ws.receive(timeout=5))
+                done = json.loads(ws.receive(timeout=5))
+        finally:
+            self._close(ws)
+
+        self.assertEqual(error["type"], "error")
+        self.assertEqual(error["index"], 0)
+        self.assertEqual(error["status_code"], 504)
+        self.assertEqual(done["type"], "done")
+
+    def test_invalid_message(self):
+        ws = Client.connect(f"ws://127.0.0.1:{self.server.server_port}/synthesize/ws")
+        try:
+            ws.send("not json")
+            self.assertEqual(json.loads(ws.receive(timeout=5))["type"], "error")
+        finally:
+            self._close(ws)
 
 if __name__ == "__main__":
-    unittest.main()
\ No newline at end of file
+    unittest.main()
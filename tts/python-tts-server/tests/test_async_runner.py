@@ -0,0 +1,53 @@
+import asyncio
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from src.utils.async_runner import AsyncRunner
+
+class TestAsyncRunner(unittest.TestCase):
+
+    def setUp(self):
+        self.runner = AsyncRunner()
+
+    def tearDown(self):
+        self.runner.stop()
+
+    def test_run_returns_result(self):
+        async def add(a, b):
+            await asyncio.sleep(0)
+            return a + b
+
+        self.assertEqual(self.runner.run(add(1, 2)), 3)
+
+    def test_requests_share_one_loop(self):
+        async def current_loop():
+            return asyncio.get_running_loop()
+
+        first = self.runner.run(current_loop())
+        second = self.runner.run(current_loop())
+        self.assertIs(first, second)
+        self.assertIsNot(threading.current_thread(), self.runner._thread)
+
+    def test_concurrent_callers_overlap(self):
+        async def slow():
+            await asyncio.sleep(0.2)
+            return True
+
+        with ThreadPoolExecutor(max_workers=20) as pool:
+            loop = self.runner.loop
+            start = loop.time()
+            results = list(pool.map(lambda _: self.runner.run(slow()), range(20)))
+            elapsed = loop.time() - start
+
+        self.assertTrue(all(results))
+        self.assertLess(elapsed, 1.0)
+
+    def test_exception_propagates(self):
+        async def fail():
+            raise ValueError('boom')
+
+        with self.assertRaises(ValueError):
+            self.runner.run(fail())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+import tempfile
+import threading
+import unittest
+from unittest import mock
+from src.services.audio_cache import AudioCache
+
+class TestAudioCache(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache = AudioCache(
+            cache_dir=self.temp_dir.name,
+            memory_max_bytes=100,
+            memory_max_entry_bytes=60,
+            disk_max_bytes=250
+        )
+        self.metadata = {'duration_seconds': 1.5, 'voice_name': 'en-US-AriaNeural'}
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_key_normalizes_whitespace(self):
+        first = AudioCache.make_key("Hello   world ", 'en-US-AriaNeural', '+0%', '+0Hz')
+        second = AudioCache.make_key(" Hello world", 'en-US-AriaNeural', '+0%', '+0Hz')
+        other_voice = AudioCache.make_key("Hello world", 'en-US-GuyNeural', '+0%', '+0Hz')
+        self.assertEqual(first, second)
+        self.assertNotEqual(first, other_voice)
+
+    def test_miss_then_memory_hit(self):
+        self.assertIsNone(self.cache.get('a' * 64))
+        self.cache.put('a' * 64, b'x' * 50, self.metadata)
+        audio_data, metadata = self.cache.get('a' * 64)
+        self.assertEqual(audio_data, b'x' * 50)
+        self.assertEqual(metadata, self.metadata)
+        stats = self.cache.stats()
+        self.assertEqual(stats['misses'], 1)
+        self.assertEqual(stats['memory_hits'], 1)
+
+    def test_large_clip_served_from_disk(self):
+        self.cache.put('b' * 64, b'y' * 80, self.metadata)
+        self.assertEqual(self.cache.stats()['memory_entries'], 0)
+        audio_data, _ = self.cache.get('b' * 64)
+        self.assertEqual(audio_data, b'y' * 80)
+        self.assertEqual(self.cache.stats()['disk_hits'], 1)
+
+    def test_lru_eviction(self):
+        for key in ('c', 'd', 'e'):
+            self.cache.put(key * 64, b'z' * 80, self.metadata)
+        self.cache.get('c' * 64)
+        self.cache.put('f' * 64, b'z' * 80, self.metadata)
+        self.assertIsNotNone(self.cache.get('c' * 64))
+        self.assertIsNone(self.cache.get('d' * 64))
+        self.assertEqual(self.cache.stats()['disk_evictions'], 1)
+
+    def test_memory_hit_does_not_wait_for_disk_writes(self):
+        self.cache.put('a' * 64, b'x' * 50, self.metadata)
+        writing = threading.Event()
+        release = threading.Event()
+        original_write = AudioCache._write_atomic
+
+        def slow_write(path, data):
+            writing.set()
+            release.wait(5)
+            original_write(path, data)
+
+        with mock.patch.object(AudioCache, '_write_atomic', staticmethod(slow_write)):
+            writer = threading.Thread(target=self.cache.put, args=('b' * 64, b'y' * 50, self.metadata))
+            writer.start()
+            try:
+                self.assertTrue(writing.wait(5))
+                # The write is stalled on disk; the memory hit must not queue behind it
+                hits = []
+                reader = threading.Thread(target=lambda: hits.append(self.cache.get('a' * 64)))
+                reader.start()
+                reader.join(1)
+                self.assertEqual(hits[0][0], b'x' * 50)
+            finally:
+                release.set()
+                writer.join()
+        self.assertEqual(self.cache.get('b' * 64)[0], b'y' * 50)
+
+    def test_disk_index_survives_restart(self):
+        self.cache.put('g' * 64, b'w' * 80, self.metadata)
+        reopened = AudioCache(cache_dir=self.temp_dir.name)
+        audio_data, metadata = reopened.get('g' * 64)
+        self.assertEqual(audio_data, b'w' * 80)
+        self.assertEqual(metadata['duration_seconds'], 1.5)
+
+if __name__ == '__main__':
+    unittest.main()
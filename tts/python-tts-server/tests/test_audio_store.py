@@ -0,0 +1,47 @@
+import hashlib
+import os
+import tempfile
+import unittest
+from src.services.audio_store import AudioStore
+
+class TestAudioStore(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.store = AudioStore(self.temp_dir.name, max_bytes=250)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_id_is_content_hash(self):
+        audio_id = self.store.put(b'a' * 100)
+        self.assertEqual(audio_id, hashlib.sha256(b'a' * 100).hexdigest())
+        self.assertEqual(self.store.put(b'a' * 100), audio_id)
+        with open(self.store.path(audio_id), 'rb') as f:
+            self.assertEqual(f.read(), b'a' * 100)
+
+    def test_least_recently_used_is_evicted(self):
+        first = self.store.put(b'a' * 100)
+        second = self.store.put(b'b' * 100)
+        self.store.path(first)
+        self.store.put(b'c' * 100)
+        self.assertIsNotNone(self.store.path(first))
+        self.assertIsNone(self.store.path(second))
+
+    def test_rejects_ids_that_are_not_hashes(self):
+        self.assertIsNone(self.store.path('../config'))
+        self.assertIsNone(self.store.path('0' * 64))
+
+    def test_index_survives_restart(self):
+        audio_id = self.store.put(b'd' * 100)
+        reopened = AudioStore(self.temp_dir.name, max_bytes=250)
+        self.assertTrue(os.path.exists(reopened.path(audio_id)))
+
+    def test_keeps_format_extension(self):
+        audio_id = self.store.put(b'e' * 100, 'ogg')
+        self.assertTrue(self.store.path(audio_id).endswith('.ogg'))
+        reopened = AudioStore(self.temp_dir.name, max_bytes=250)
+        self.assertTrue(reopened.path(audio_id).endswith('.ogg'))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,37 @@
+import unittest
+from benchmarks.run_benchmark import compare, make_text, percentiles
+
+
+def _result(p95, p99, rps, errors=0):
+    return {
+        'endpoint': '/synthesize', 'concurrency': 8, 'text_length': 200, 'errors': errors,
+        'latency_ms': {'p95': p95, 'p99': p99}, 'rps': rps
+    }
+
+
+class TestBenchmark(unittest.TestCase):
+
+    def test_make_text_length(self):
+        self.assertEqual(len(make_text(200)), 200)
+        self.assertEqual(len(make_text(5000)), 5000)
+
+    def test_percentiles(self):
+        samples = [i / 1000 for i in range(1, 101)]
+        result = percentiles(samples)
+        self.assertEqual(result['p50'], 50.0)
+        self.assertEqual(result['p95'], 95.0)
+        self.assertEqual(result['p99'], 99.0)
+        self.assertEqual(result['max'], 100.0)
+        self.assertIsNone(percentiles([])['p50'])
+
+    def test_compare_flags_regressions(self):
+        baseline = {'results': [_result(100, 120, 50)]}
+        self.assertEqual(compare(baseline, {'results': [_result(105, 125, 48)]}, 10)['regressions'], 0)
+
+        report = compare(baseline, {'results': [_result(150, 125, 30, errors=2)]}, 10)
+        self.assertEqual(report['regressions'], 1)
+        self.assertEqual(len(report['scenarios'][0]['reasons']), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
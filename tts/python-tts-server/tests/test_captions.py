@@ -0,0 +1,37 @@
+import unittest
+from src.utils.captions import TICKS_PER_SECOND, build_cues, shift_words, to_srt, to_vtt, word_from_boundary
+
+
+def _words(*timings):
+    return [{'word': word, 'start': start, 'end': end} for word, start, end in timings]
+
+
+class TestCaptions(unittest.TestCase):
+
+    def test_word_from_boundary(self):
+        chunk = {'type': 'WordBoundary', 'offset': 1.5 * TICKS_PER_SECOND, 'duration': 0.25 * TICKS_PER_SECOND, 'text': 'Hi'}
+        self.assertEqual(word_from_boundary(chunk), {'word': 'Hi', 'start': 1.5, 'end': 1.75})
+        self.assertEqual(word_from_boundary(chunk, 2.0)['start'], 3.5)
+
+    def test_shift_words(self):
+        words = _words(('a', 0.0, 0.5))
+        self.assertEqual(shift_words(words, 1.0), _words(('a', 1.0, 1.5)))
+        self.assertEqual(words, _words(('a', 0.0, 0.5)))
+
+    def test_cues_break_on_length_and_pause(self):
+        words = _words(('Hello', 0.0, 0.4), ('world', 0.5, 0.9), ('again', 2.0, 2.4))
+        cues = build_cues(words)
+        self.assertEqual([cue['text'] for cue in cues], ['Hello world', 'again'])
+        self.assertEqual(len(build_cues(words, max_chars=8)), 3)
+
+    def test_srt_and_vtt(self):
+        words = _words(('Hello', 0.0, 0.4), ('world', 0.5, 3661.25))
+        self.assertEqual(
+            to_srt(words),
+            "1\n00:00:00,000 --> 00:00:00,400\nHello\n\n2\n00:00:00,500 --> 01:01:01,250\nworld\n"
+        )
+        self.assertTrue(to_vtt(words).startswith("WEBVTT\n\n00:00:00.000 --> 00:00:00.400\nHello\n"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,147 @@
+import asyncio
+import os
+import sqlite3
+import tempfile
+import time
+import unittest
+from src.models.tts_models import JobRequest, TTSResponse
+from src.services.job_queue import JobQueue
+
+class RecordingService:
+    """Stands in for TTSService and records the order requests are served in"""
+
+    def __init__(self):
+        self.texts = []
+
+    async def synthesize_speech(self, request):
+        self.texts.append(request.text)
+        await asyncio.sleep(0)
+        return {
+            'success': True,
+            'audio_data': b'audio:' + request.text.encode(),
+            'response': TTSResponse(
+                duration_seconds=1.0,
+                language=request.language,
+                gender=request.gender,
+                emotion=request.emotion,
+                voice_name='en-US-AriaNeural'
+            ),
+            'status_code': 200
+        }
+
+class TestJobQueue(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.service = RecordingService()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def _queue(self, workers=1, stale_seconds=600):
+        return JobQueue(
+            self.service,
+            db_path=os.path.join(self.temp_dir.name, 'jobs.db'),
+            audio_dir=os.path.join(self.temp_dir.name, 'audio'),
+            workers=workers,
+            retention_seconds=3600,
+            stale_seconds=stale_seconds
+        )
+
+    def test_jobs_complete_in_priority_order(self):
+        async def scenario():
+            queue = self._queue(workers=0)
+            await queue.start()
+            bulk = await queue.submit(JobRequest(text='bulk', priority='bulk'))
+            preview = await queue.submit(JobRequest(text='preview', priority='interactive'))
+            await queue.stop()
+
+            # Restarting picks up the persisted jobs and runs the preview first
+            queue = self._queue(workers=1)
+            await queue.start()
+            await queue._queue.join()
+            statuses = [await queue.get(job.job_id) for job in (bulk, preview)]
+            await queue.stop()
+            return statuses
+
+        bulk, preview = asyncio.run(scenario())
+        self.assertEqual(self.service.texts, ['preview', 'bulk'])
+        self.assertEqual(bulk.status, JobQueue.COMPLETED)
+        self.assertEqual(preview.response.audio_url, f"/jobs/{preview.job_id}/audio")
+        with open(os.path.join(self.temp_dir.name, 'audio', f"{preview.job_id}.mp3"), 'rb') as f:
+            self.assertEqual(f.read(), b'audio:preview')
+
+    def test_queues_sharing_a_database_run_each_job_once(self):
+        async def scenario():
+            queue = self._queue(workers=0)
+            await queue.start()
+            for text in ('one', 'two', 'three'):
+                await queue.submit(JobRequest(text=text))
+            await queue.stop()
+
+            # Both processes load the same queued jobs; only one may claim each
+            queues = [self._queue(workers=2), self._queue(workers=2)]
+            for queue in queues:
+                await queue.start()
+            for queue in queues:
+                await queue._queue.join()
+            for queue in queues:
+                await queue.stop()
+
+        asyncio.run(scenario())
+        self.assertEqual(sorted(self.service.texts), ['one', 'three', 'two'])
+
+    def test_restart_only_requeues_stale_running_jobs(self):
+        async def scenario():
+            queue = self._queue(workers=0)
+            await queue.start()
+            active = await queue.submit(JobRequest(text='active'))
+            abandoned = await queue.submit(JobRequest(text='abandoned'))
+            await queue.stop()
+
+            db = sqlite3.connect(os.path.join(self.temp_dir.name, 'jobs.db'))
+            with db:
+                db.execute("UPDATE jobs SET status = 'running', started_at = ? WHERE id = ?", (time.time(), active.job_id))
+                db.execute("UPDATE jobs SET status = 'running', started_at = ? WHERE id = ?", (time.time() - 3600, abandoned.job_id))
+            db.close()
+
+            queue = self._queue(workers=1)
+            await queue.start()
+            await queue._queue.join()
+            statuses = [await queue.get(job.job_id) for job in (active, abandoned)]
+            await queue.stop()
+            return statuses
+
+        active, abandoned = asyncio.run(scenario())
+        self.assertEqual(self.service.texts, ['abandoned'])
+        self.assertEqual(active.status, JobQueue.RUNNING)
+        self.assertEqual(abandoned.status, JobQueue.COMPLETED)
+
+    def test_audio_file_follows_output_format(self):
+        async def scenario():
+            queue = self._queue()
+            await queue.start()
+            job = await queue.submit(JobRequest(text='hello', output_format='wav'))
+            await queue._queue.join()
+            await queue.stop()
+            return queue, job
+
+        queue, job = asyncio.run(scenario())
+        self.assertEqual(queue.audio_path(job.job_id, 'wav'), os.path.join(self.temp_dir.name, 'audio', f"{job.job_id}.wav"))
+        with open(queue.audio_path(job.job_id, 'wav'), 'rb') as f:
+            self.assertEqual(f.read(), b'audio:hello')
+
+    def test_invalid_priority_is_rejected(self):
+        async def scenario():
+            queue = self._queue()
+            await queue.start()
+            try:
+                await queue.submit(JobRequest(text='hello', priority='urgent'))
+            finally:
+                await queue.stop()
+
+        with self.assertRaises(ValueError):
+            asyncio.run(scenario())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,51 @@
+import os
+import unittest
+from mutagen.mp3 import MP3
+from src.utils.mp3 import AudioBuffer, Mp3DurationCounter, get_mp3_duration, iter_frames, join_mp3
+
+SAMPLE_FILE = os.path.join(
+    os.path.dirname(__file__), '..', 'src', 'services', 'english_full_duration.mp3'
+)
+
+class TestMp3Utils(unittest.TestCase):
+
+    def setUp(self):
+        with open(SAMPLE_FILE, 'rb') as f:
+            self.data = f.read()
+        self.expected = MP3(SAMPLE_FILE).info.length
+
+    def test_duration_matches_mutagen(self):
+        self.assertAlmostEqual(get_mp3_duration(self.data), self.expected, places=3)
+
+    def test_frames_cover_whole_file(self):
+        frames = list(iter_frames(self.data))
+        last_offset, last_header = frames[-1]
+        self.assertEqual(last_offset + last_header.frame_length, len(self.data))
+
+    def test_incremental_counter_matches_whole_file(self):
+        counter = Mp3DurationCounter()
+        for i in range(0, len(self.data), 777):
+            counter.feed(self.data[i:i + 777])
+        self.assertAlmostEqual(counter.duration, self.expected, places=3)
+        self.assertEqual(counter.frames, len(list(iter_frames(self.data))))
+
+    def test_join_sums_durations(self):
+        tagged = b'ID3\x04\x00\x00\x00\x00\x00\x05hello' + self.data + b'\xff\xf3'
+        joined = join_mp3([self.data, tagged])
+        self.assertEqual(len(joined), 2 * len(self.data))
+        self.assertAlmostEqual(get_mp3_duration(joined), 2 * self.expected, places=3)
+
+    def test_garbage_has_no_duration(self):
+        self.assertEqual(get_mp3_duration(b'not an mp3 file at all'), 0.0)
+
+class TestAudioBuffer(unittest.TestCase):
+
+    def test_collects_chunks_beyond_initial_size(self):
+        buffer = AudioBuffer(4)
+        for chunk in (b'abc', b'defgh', b'ij'):
+            buffer.write(chunk)
+        self.assertEqual(len(buffer), 10)
+        self.assertEqual(buffer.getvalue(), b'abcdefghij')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,181 @@
+import asyncio
+import tempfile
+import time
+import unittest
+from src.models.tts_models import TTSRequest
+from src.services.audio_cache import AudioCache
+from src.services.resilient_backend import CircuitBreaker, CircuitOpenError, ResilientBackend
+from src.services.tts_backends import FakeTTSBackend, TTSBackendError
+from src.services.tts_service import TTSService
+
+
+class ScriptedBackend(FakeTTSBackend):
+    """Fake backend whose successive calls follow a script of 'ok', 'fail', 'stall' or 'slow'"""
+
+    def __init__(self, script, **kwargs):
+        super().__init__(latency=0, **kwargs)
+        self.script = list(script)
+        self.calls = 0
+        self.closed = 0
+
+    async def stream(self, text, voice, rate='+0%', pitch='+0Hz', boundary='SentenceBoundary'):
+        action = self.script[min(self.calls, len(self.script) - 1)]
+        self.calls += 1
+        try:
+            if action == 'fail':
+                raise TTSBackendError('backend down')
+            if action == 'stall':
+                await asyncio.sleep(60)
+            if action == 'slow':
+                await asyncio.sleep(0.3)
+            async for chunk in super().stream(text, voice, rate, pitch, boundary):
+                yield chunk
+        finally:
+            self.closed += 1
+
+
+def resilient(backend, **kwargs):
+    options = {
+        'connect_timeout': 1,
+        'first_audio_timeout': 1,
+        'receive_timeout': 1,
+        'retries': 2,
+        'retry_backoff': 0.001,
+        'hedge': False,
+        'hedge_min_delay': 0.05,
+        'hedge_quantile': 0.95,
+        'seed': 0
+    }
+    options.update(kwargs)
+    return ResilientBackend(backend, **options)
+
+
+async def collect(backend, text='Hello world.'):
+    return [chunk async for chunk in backend.stream(text, 'en-US-AriaNeural')]
+
+
+class TestCircuitBreaker(unittest.TestCase):
+
+    def test_opens_on_failure_rate_and_recovers_after_probe(self):
+        breaker = CircuitBreaker(failure_rate=0.5, min_requests=4, window_seconds=60, open_seconds=0.05)
+        for success in (True, False, True):
+            breaker.record(success)
+        self.assertTrue(breaker.allow())
+        breaker.record(False)
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+        self.assertFalse(breaker.allow())
+
+        time.sleep(0.06)
+        self.assertTrue(breaker.allow())
+        # Only one probe is let through while half open
+        self.assertFalse(breaker.allow())
+        breaker.record(True)
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+        self.assertEqual(breaker.stats()['window_requests'], 0)
+
+    def test_failed_probe_reopens(self):
+        breaker = CircuitBreaker(failure_rate=0.5, min_requests=1, window_seconds=60, open_seconds=0.05)
+        breaker.record(False)
+        time.sleep(0.06)
+        self.assertTrue(breaker.allow())
+        breaker.record(False)
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+        self.assertEqual(breaker.opened, 2)
+
+
+class TestResilientBackend(unittest.TestCase):
+
+    def test_retries_failures_before_audio(self):
+        inner = ScriptedBackend(['fail', 'fail', 'ok'])
+        backend = resilient(inner)
+        chunks = asyncio.run(collect(backend))
+        self.assertTrue(any(chunk['type'] == 'audio' for chunk in chunks))
+        self.assertEqual(inner.calls, 3)
+        self.assertEqual(backend.stats()['retries'], 2)
+
+    def test_gives_up_after_retries(self):
+        backend = resilient(ScriptedBackend(['fail']), retries=1)
+        with self.assertRaises(TTSBackendError):
+            asyncio.run(collect(backend))
+        self.assertEqual(backend.backend.calls, 2)
+
+    def test_stalled_connection_times_out_and_is_closed(self):
+        inner = ScriptedBackend(['stall', 'ok'])
+        backend = resilient(inner, connect_timeout=0.05, first_audio_timeout=0.05)
+        started = time.monotonic()
+        asyncio.run(collect(backend))
+        self.assertLess(time.monotonic() - started, 1)
+        self.assertEqual(inner.calls, 2)
+        self.assertEqual(inner.closed, 2)
+
+    def test_hedge_wins_over_slow_primary(self):
+        inner = ScriptedBackend(['slow', 'ok'])
+        backend = resilient(inner, hedge=True, first_audio_timeout=2)
+        backend.hedge_delay = lambda: 0.05
+        started = time.monotonic()
+        asyncio.run(collect(backend))
+        self.assertLess(time.monotonic() - started, 0.25)
+        self.assertEqual(backend.stats()['hedged'], 1)
+        self.assertEqual(backend.stats()['hedge_wins'], 1)
+        # The losing primary is cancelled rather than left running
+        self.assertEqual(inner.closed, 2)
+
+    def test_no_hedge_when_primary_is_fast(self):
+        backend = resilient(ScriptedBackend(['ok']), hedge=True)
+        asyncio.run(collect(backend))
+        self.assertEqual(backend.stats()['hedged'], 0)
+
+    def test_hedge_delay_follows_observed_latency(self):
+        backend = resilient(ScriptedBackend(['ok']), hedge=True, first_audio_timeout=1, hedge_min_delay=0.01)
+        self.assertEqual(backend.hedge_delay(), 0.5)
+        backend._latencies.extend([0.1] * 95 + [0.4] * 5)
+        self.assertAlmostEqual(backend.hedge_delay(), 0.1)
+
+    def test_open_circuit_fails_fast(self):
+        breaker = CircuitBreaker(failure_rate=0.5, min_requests=2, window_seconds=60, open_seconds=30)
+        inner = ScriptedBackend(['fail'])
+        backend = resilient(inner, retries=1, circuit_breaker=breaker)
+        with self.assertRaises(TTSBackendError):
+            asyncio.run(collect(backend))
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+
+        calls = inner.calls
+        with self.assertRaises(CircuitOpenError) as context:
+            asyncio.run(collect(backend))
+        self.assertEqual(inner.calls, calls)
+        self.assertGreater(context.exception.retry_after, 0)
+
+
+class TestServiceWithOpenCircuit(unittest.TestCase):
+
+    def setUp(self):
+        self.breaker = CircuitBreaker(failure_rate=0.5, min_requests=1, window_seconds=60, open_seconds=30)
+        self.inner = ScriptedBackend(['ok', 'fail'])
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.service = TTSService(
+            backend=resilient(self.inner, retries=0, circuit_breaker=self.breaker),
+            cache=AudioCache(cache_dir=self.temp_dir.name)
+        )
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_cached_clips_are_served_and_misses_get_503(self):
+        cached = TTSRequest(text='Cached sentence.', language='en-US')
+        self.assertTrue(asyncio.run(self.service.synthesize_speech(cached))['success'])
+
+        failed = asyncio.run(self.service.synthesize_speech(TTSRequest(text='Fails.', language='en-US')))
+        self.assertEqual(failed['status_code'], 500)
+        self.assertEqual(self.breaker.state, CircuitBreaker.OPEN)
+
+        result = asyncio.run(self.service.synthesize_speech(TTSRequest(text='New text.', language='en-US')))
+        self.assertEqual(result['status_code'], 503)
+        self.assertIn('retry_after', result)
+
+        self.assertTrue(asyncio.run(self.service.synthesize_speech(cached))['success'])
+        self.assertEqual(self.service.get_health_status().status, 'degraded')
+        self.assertEqual(self.service.get_backend_stats()['circuit']['state'], 'open')
+
+
+if __name__ == '__main__':
+    unittest.main()
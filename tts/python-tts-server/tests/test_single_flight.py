@@ -0,0 +1,80 @@
+import asyncio
+import unittest
+from src.utils.single_flight import SingleFlight
+
+class TestSingleFlight(unittest.TestCase):
+
+    def setUp(self):
+        self.flight = SingleFlight()
+        self.calls = 0
+
+    async def _work(self, result='audio', delay=0.05, error=None):
+        self.calls += 1
+        await asyncio.sleep(delay)
+        if error:
+            raise error
+        return result
+
+    def test_concurrent_calls_are_coalesced(self):
+        async def scenario():
+            return await asyncio.gather(*(
+                self.flight.do('key', lambda: self._work()) for _ in range(5)
+            ))
+
+        results = asyncio.run(scenario())
+        self.assertEqual(results, ['audio'] * 5)
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(self.flight.stats(), {'executed': 1, 'coalesced': 4, 'in_flight': 0})
+
+    def test_errors_reach_every_waiter(self):
+        async def scenario():
+            return await asyncio.gather(
+                *(self.flight.do('key', lambda: self._work(error=RuntimeError('backend down'))) for _ in range(3)),
+                return_exceptions=True
+            )
+
+        results = asyncio.run(scenario())
+        self.assertTrue(all(isinstance(result, RuntimeError) for result in results))
+        self.assertEqual(self.calls, 1)
+
+    def test_cancelled_waiter_does_not_cancel_others(self):
+        async def scenario():
+            first = asyncio.ensure_future(self.flight.do('key', lambda: self._work()))
+            second = asyncio.ensure_future(self.flight.do('key', lambda: self._work()))
+            await asyncio.sleep(0.01)
+            first.cancel()
+            return await second, first.cancelled()
+
+        result, first_cancelled = asyncio.run(scenario())
+        self.assertEqual(result, 'audio')
+        self.assertTrue(first_cancelled)
+
+    def test_work_cancelled_when_last_waiter_leaves(self):
+        async def scenario():
+            waiter = asyncio.ensure_future(self.flight.do('key', lambda: self._work(delay=1)))
+            await asyncio.sleep(0.01)
+            task = self.flight._calls['key'].task
+            waiter.cancel()
+            await asyncio.sleep(0.01)
+            return task.cancelled()
+
+        self.assertTrue(asyncio.run(scenario()))
+        self.assertEqual(self.flight.stats()['in_flight'], 0)
+
+    def test_caller_after_last_waiter_left_starts_fresh_work(self):
+        async def scenario():
+            waiter = asyncio.ensure_future(self.flight.do('key', lambda: self._work(delay=1)))
+            await asyncio.sleep(0.01)
+            waiter.cancel()
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                pass
+            # The abandoned work may not have finished cancelling yet
+            return await self.flight.do('key', lambda: self._work(result='fresh'))
+
+        self.assertEqual(asyncio.run(scenario()), 'fresh')
+        self.assertEqual(self.calls, 2)
+
+if __name__ == '__main__':
+    unittest.main()
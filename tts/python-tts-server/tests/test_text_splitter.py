@@ -0,0 +1,47 @@
+import unittest
+from src.utils.text_splitter import chunk_text, split_segments, split_sentences
+
+class TestTextSplitter(unittest.TestCase):
+
+    def test_latin_sentences_keep_decimals(self):
+        sentences = split_sentences("Pi is 3.14. Is that right? Yes!")
+        self.assertEqual(sentences, ["Pi is 3.14.", "Is that right?", "Yes!"])
+
+    def test_vietnamese_sentences(self):
+        sentences = split_sentences("Xin chào thế giới. Bạn khỏe không?")
+        self.assertEqual(sentences, ["Xin chào thế giới.", "Bạn khỏe không?"])
+
+    def test_cjk_sentences_without_spaces(self):
+        self.assertEqual(
+            split_sentences("今日は晴れです。明日は雨でしょう！"),
+            ["今日は晴れです。", "明日は雨でしょう！"]
+        )
+        self.assertEqual(
+            split_sentences("今天天气很好。我们去公园吧？"),
+            ["今天天气很好。", "我们去公园吧？"]
+        )
+
+    def test_segments_are_unpacked_sentences(self):
+        text = "Short one. " + "word " * 30 + "end."
+        segments = split_segments(text, 50)
+        self.assertEqual(segments[0], "Short one.")
+        self.assertTrue(all(len(segment) <= 50 for segment in segments))
+        self.assertEqual(' '.join(segments), ' '.join(text.split()))
+
+    def test_chunks_respect_limit_and_sentences(self):
+        text = "One two three. " * 20
+        chunks = chunk_text(text, 50)
+        self.assertTrue(all(len(chunk) <= 50 for chunk in chunks))
+        self.assertTrue(all(chunk.endswith('.') for chunk in chunks))
+        self.assertEqual(' '.join(chunks), text.strip())
+
+    def test_cjk_chunks_are_joined_without_spaces(self):
+        chunks = chunk_text("今日は晴れです。" * 4, 16)
+        self.assertEqual(chunks, ["今日は晴れです。今日は晴れです。"] * 2)
+
+    def test_long_sentence_split_at_clauses(self):
+        chunks = chunk_text("alpha beta, gamma delta, epsilon zeta", 15)
+        self.assertEqual(chunks, ["alpha beta,", "gamma delta,", "epsilon zeta"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+import asyncio
+import shutil
+import struct
+import unittest
+from src.services.transcoder import Transcoder, fix_wav_sizes, get_output_format
+from src.utils.mp3 import silence
+
+HAS_FFMPEG = shutil.which('ffmpeg') is not None
+
+
+class TestOutputFormats(unittest.TestCase):
+
+    def test_lookup(self):
+        fmt = get_output_format('opus', 'low')
+        self.assertEqual(fmt.extension, 'ogg')
+        self.assertEqual(fmt.key, 'opus-low')
+        self.assertEqual(get_output_format('mp3').key, 'mp3')
+
+    def test_unknown_format_or_quality(self):
+        with self.assertRaises(ValueError):
+            get_output_format('flac')
+        with self.assertRaises(ValueError):
+            get_output_format('mp3', 'lossless')
+
+    def test_fix_wav_sizes(self):
+        header = b'RIFF' + struct.pack('<I', 0xFFFFFFFF) + b'WAVE'
+        fmt_chunk = b'fmt ' + struct.pack('<I', 16) + bytes(16)
+        data = header + fmt_chunk + b'data' + struct.pack('<I', 0xFFFFFFFF) + bytes(100)
+        fixed = fix_wav_sizes(data)
+        self.assertEqual(struct.unpack_from('<I', fixed, 4)[0], len(data) - 8)
+        self.assertEqual(struct.unpack_from('<I', fixed, 40)[0], 100)
+
+    def test_missing_ffmpeg(self):
+        transcoder = Transcoder('no-such-ffmpeg', max_concurrent=1, timeout=5)
+        self.assertFalse(transcoder.available)
+
+
+@unittest.skipUnless(HAS_FFMPEG, 'ffmpeg is not installed')
+class TestTranscoder(unittest.TestCase):
+
+    def setUp(self):
+        self.transcoder = Transcoder('ffmpeg', max_concurrent=2, timeout=30)
+        self.mp3 = silence(1.0)
+
+    def test_wav(self):
+        wav = asyncio.run(self.transcoder.transcode(self.mp3, get_output_format('wav', 'high')))
+        self.assertEqual(wav[:4], b'RIFF')
+        self.assertEqual(struct.unpack_from('<I', wav, 4)[0], len(wav) - 8)
+
+    def test_stream_opus(self):
+        async def chunks():
+            for offset in range(0, len(self.mp3), 1024):
+                yield self.mp3[offset:offset + 1024]
+
+        async def collect():
+            return b''.join([data async for data in self.transcoder.stream(chunks(), get_output_format('opus'))])
+
+        self.assertEqual(asyncio.run(collect())[:4], b'OggS')
+
+
+if __name__ == '__main__':
+    unittest.main()
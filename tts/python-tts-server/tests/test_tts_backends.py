@@ -0,0 +1,67 @@
+import asyncio
+import unittest
+from src.services.tts_backends import FakeTTSBackend, TTSBackend, TTSBackendError, create_backend
+from src.utils.mp3 import get_mp3_duration, silence
+
+
+async def _collect(backend, text, **kwargs):
+    audio = b''
+    boundaries = []
+    async for chunk in backend.stream(text, 'en-US-AriaNeural', **kwargs):
+        if chunk['type'] == 'audio':
+            audio += chunk['data']
+        else:
+            boundaries.append(chunk)
+    return audio, boundaries
+
+
+class TestFakeTTSBackend(unittest.TestCase):
+
+    def test_duration_follows_text_length_and_rate(self):
+        backend = FakeTTSBackend(latency=0, chars_per_second=15)
+        audio, _ = asyncio.run(_collect(backend, 'x' * 30))
+        self.assertAlmostEqual(get_mp3_duration(audio), 2.0, delta=0.05)
+
+        fast, _ = asyncio.run(_collect(backend, 'x' * 30, rate='+100%'))
+        self.assertAlmostEqual(get_mp3_duration(fast), 1.0, delta=0.05)
+
+    def test_word_boundaries(self):
+        backend = FakeTTSBackend(latency=0)
+        _, boundaries = asyncio.run(_collect(backend, 'one two three', boundary='WordBoundary'))
+        self.assertEqual([b['text'] for b in boundaries], ['one', 'two', 'three'])
+        self.assertEqual([b['type'] for b in boundaries], ['WordBoundary'] * 3)
+        offsets = [b['offset'] for b in boundaries]
+        self.assertEqual(offsets, sorted(offsets))
+
+    def test_failure_rate(self):
+        backend = FakeTTSBackend(latency=0, failure_rate=1.0)
+        with self.assertRaises(TTSBackendError):
+            asyncio.run(_collect(backend, 'fails'))
+
+    def test_list_voices(self):
+        voices = asyncio.run(FakeTTSBackend(latency=0).list_voices())
+        self.assertIn('en-US-AriaNeural', [voice['ShortName'] for voice in voices])
+
+    def test_create_backend(self):
+        self.assertIsInstance(create_backend('fake', latency=0), FakeTTSBackend)
+        with self.assertRaises(ValueError):
+            create_backend('unknown')
+
+    def test_incomplete_backend_cannot_be_constructed(self):
+        class StreamOnlyBackend(TTSBackend):
+            async def stream(self, text, voice, rate='+0%', pitch='+0Hz', boundary='SentenceBoundary'):
+                yield {'type': 'audio', 'data': b''}
+
+        with self.assertRaises(TypeError):
+            StreamOnlyBackend()
+
+
+class TestSilence(unittest.TestCase):
+
+    def test_silence_duration(self):
+        self.assertAlmostEqual(get_mp3_duration(silence(1.0)), 1.0, delta=0.025)
+        self.assertEqual(silence(0), b'')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,46 +1,243 @@
+import asyncio
+import tempfile
 import unittest
+from unittest import mock
+from config import config
+from src.models.tts_models import ProgramRequest, TTSRequest
+from src.services.audio_cache import AudioCache
+from src.services.audio_store import AudioStore
+from src.services.transcoder import Transcoder
+from src.services.tts_backends import FakeTTSBackend
 from src.services.tts_service import TTSService
+from src.utils.mp3 import get_mp3_duration
+
+class TaggingTranscoder(Transcoder):
+    """Stands in for ffmpeg by prefixing the audio with the target format"""
+
+    def __init__(self):
+        super().__init__('ffmpeg', max_concurrent=1, timeout=5)
+        self.ffmpeg_path = 'ffmpeg'
+        self.calls = 0
+
+    async def transcode(self, audio_data, fmt):
+        self.calls += 1
+        return fmt.key.encode() + audio_data
 
 class TestTTSService(unittest.TestCase):
 
     def setUp(self):
-        self.tts_service = TTSService()
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.tts_service = self._service(FakeTTSBackend(latency=0))
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def _service(self, backend, transcoder=None):
+        return TTSService(
+            backend=backend,
+            cache=AudioCache(f"{self.temp_dir.name}/cache"),
+            audio_store=AudioStore(f"{self.temp_dir.name}/store", max_bytes=10 * 1024 * 1024),
+            transcoder=transcoder
+        )
+
+    def _synthesize(self, **fields):
+        fields.setdefault('use_cache', False)
+        return asyncio.run(self.tts_service.synthesize_speech(TTSRequest(**fields)))
 
     def test_text_to_speech(self):
-        text = "Hello, world!"
-        language = "en-US"
-        tone = "neutral"
-        result = self.tts_service.convert_text_to_speech(text, language, tone)
-        self.assertIsNotNone(result)
+        result = self._synthesize(text="Hello, world!", language="en-US", emotion="neutral")
         self.assertTrue(result['success'])
-        self.assertIn('audio_content', result)
+        self.assertTrue(result['audio_data'])
+        self.assertEqual(result['response'].voice_name, 'en-US-AriaNeural')
+        self.assertAlmostEqual(
+            result['response'].duration_seconds, get_mp3_duration(result['audio_data']), places=3
+        )
 
     def test_multi_language_support(self):
-        text = "Bonjour le monde!"
-        language = "fr-FR"
-        tone = "neutral"
-        result = self.tts_service.convert_text_to_speech(text, language, tone)
-        self.assertIsNotNone(result)
+        result = self._synthesize(text="Bonjour le monde!", language="fr-FR", gender="male")
         self.assertTrue(result['success'])
-        self.assertIn('audio_content', result)
+        self.assertEqual(result['response'].voice_name, 'fr-FR-HenriNeural')
 
     def test_emotional_tones(self):
-        text = "I'm so happy to see you!"
-        language = "en-US"
-        tone = "happy"
-        result = self.tts_service.convert_text_to_speech(text, language, tone)
-        self.assertIsNotNone(result)
-        self.assertTrue(result['success'])
-        self.assertIn('audio_content', result)
+        neutral = self._synthesize(text="I'm so happy to see you!", emotion="neutral")
+        excited = self._synthesize(text="I'm so happy to see you!", emotion="excited")
+        self.assertTrue(excited['success'])
+        self.assertEqual(excited['response'].emotion, 'excited')
+        self.assertLess(excited['response'].duration_seconds, neutral['response'].duration_seconds)
 
     def test_invalid_language(self):
-        text = "This should fail."
-        language = "invalid-lang"
-        tone = "neutral"
-        result = self.tts_service.convert_text_to_speech(text, language, tone)
-        self.assertIsNotNone(result)
+        result = self._synthesize(text="This falls back.", language="invalid-lang")
+        self.assertTrue(result['success'])
+        self.assertEqual(result['response'].voice_name, 'en-US-AriaNeural')
+
+    def test_empty_text(self):
+        result = self._synthesize(text="   ")
         self.assertFalse(result['success'])
+        self.assertEqual(result['status_code'], 400)
+
+    def test_backend_failure(self):
+        self.tts_service = self._service(FakeTTSBackend(latency=0, failure_rate=1.0))
+        result = self._synthesize(text="This should fail.")
+        self.assertFalse(result['success'])
+        self.assertEqual(result['status_code'], 500)
         self.assertIn('error', result)
 
+    def test_long_text_duration_is_sum_of_chunks(self):
+        text = "This sentence is repeated to build a long script. " * 60
+        result = self._synthesize(text=text)
+        self.assertTrue(result['success'])
+        self.assertAlmostEqual(
+            result['response'].duration_seconds, get_mp3_duration(result['audio_data']), places=3
+        )
+
+    def test_cache_hit_returns_same_audio(self):
+        first = self._synthesize(text="Cached intro", use_cache=True)
+        second = self._synthesize(text="Cached intro", use_cache=True)
+        self.assertEqual(first['audio_data'], second['audio_data'])
+        self.assertEqual(self.tts_service.get_cache_stats()['memory_hits'], 1)
+
+    def test_edited_script_only_synthesizes_changed_sentences(self):
+        calls = []
+        backend = FakeTTSBackend(latency=0)
+        original_stream = backend.stream
+
+        def counting_stream(text, *args, **kwargs):
+            calls.append(text)
+            return original_stream(text, *args, **kwargs)
+
+        backend.stream = counting_stream
+        self.tts_service = self._service(backend)
+
+        script = ["First line.", "Second line.", "Third line.", "Fourth line."]
+        with mock.patch.object(config, 'INCREMENTAL_SYNTHESIS', True):
+            first = self._synthesize(text=' '.join(script), use_cache=True, incremental=True)
+            self.assertEqual(first['response'].sentences_synthesized, 4)
+            self.assertEqual(first['response'].sentences_reused, 0)
+
+            calls.clear()
+            script[2] = "An edited third line."
+            second = self._synthesize(text=' '.join(script), use_cache=True, incremental=True)
+            self.assertEqual(calls, ["An edited third line."])
+            self.assertEqual(second['response'].sentences_reused, 3)
+            self.assertEqual(second['response'].sentences_synthesized, 1)
+            self.assertAlmostEqual(
+                second['response'].duration_seconds, get_mp3_duration(second['audio_data']), places=3
+            )
+
+            # An identical resubmission is one whole-text hit, not a join of cached sentences
+            hits = self.tts_service.get_cache_stats()['memory_hits']
+            again = self._synthesize(text=' '.join(script), use_cache=True, incremental=True)
+            self.assertEqual(again['audio_data'], second['audio_data'])
+            self.assertEqual(self.tts_service.get_cache_stats()['memory_hits'], hits + 1)
+
+        calls.clear()
+        script[0] = "An edited first line."
+        whole = self._synthesize(text=' '.join(script), use_cache=True)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(whole['response'].sentences_synthesized, 4)
+
+    def test_captions_follow_the_audio(self):
+        for incremental in (True, False):
+            # Distinct text per pass, so the second pass does not hit the first one's whole-text entry
+            text = f"Captions come from the same pass {incremental}. " * 40
+            with mock.patch.object(config, 'INCREMENTAL_SYNTHESIS', incremental):
+                result = self._synthesize(text=text, use_cache=True, incremental=incremental, captions=True)
+            response = result['response']
+            self.assertEqual(len(response.words), len(text.split()))
+            self.assertEqual([word.word for word in response.words[:2]], ['Captions', 'come'])
+            starts = [word.start for word in response.words]
+            self.assertEqual(starts, sorted(starts))
+            self.assertLessEqual(response.words[-1].end, response.duration_seconds + 0.05)
+            self.assertGreater(response.words[-1].end, response.duration_seconds - 0.5)
+            self.assertTrue(response.srt.startswith('1\n00:00:00,000 --> '))
+            self.assertTrue(response.vtt.startswith('WEBVTT'))
+
+        plain = self._synthesize(text="No captions here.")
+        self.assertIsNone(plain['response'].words)
+
+    def test_cached_audio_without_words_is_resynthesized_for_captions(self):
+        self._synthesize(text="Cache me first.", use_cache=True)
+        result = self._synthesize(text="Cache me first.", use_cache=True, captions=True)
+        self.assertEqual([word.word for word in result['response'].words], ['Cache', 'me', 'first.'])
+        again = self._synthesize(text="Cache me first.", use_cache=True, captions=True)
+        self.assertEqual(again['response'].words, result['response'].words)
+
+    def test_voice_styles_come_from_documented_support(self):
+        styles = self.tts_service.get_supported_voices().styles
+        self.assertIn('en-GB-SoniaNeural', styles['cheerful'])
+        self.assertNotIn('en-GB-SoniaNeural', styles['shouting'])
+        self.assertFalse(any('vi-VN-HoaiMyNeural' in voices for voices in styles.values()))
+
+    def test_program_timing_map(self):
+        program = ProgramRequest(
+            segments=[
+                {'content': 'Welcome to the show.', 'segment_type': 'intro', 'emotion': 'excited'},
+                {'content': 'Here is the main story.', 'segment_type': 'main', 'pause_before': 0.5},
+                {'content': 'Thanks for watching.', 'segment_type': 'outro', 'min_start': 10, 'min_end': 14}
+            ],
+            emotion='calm',
+            gap_seconds=0.25
+        )
+        result = asyncio.run(self.tts_service.synthesize_program(program))
+        self.assertTrue(result['success'])
+        response = result['response']
+        intro, main, outro = response.segments
+
+        self.assertEqual((intro.segment_type, intro.emotion, intro.start_seconds), ('intro', 'excited', 0.0))
+        self.assertEqual(main.emotion, 'calm')
+        # The silence is whole frames, so it may run up to one frame (24 ms) longer
+        self.assertAlmostEqual(main.start_seconds - intro.end_seconds, 0.75, delta=0.025)
+        self.assertAlmostEqual(outro.start_seconds, 10.0, delta=0.025)
+        self.assertAlmostEqual(response.duration_seconds, 14.0, delta=0.025)
+        self.assertAlmostEqual(response.duration_seconds, get_mp3_duration(result['audio_data']), places=3)
+
+        audio_id = response.audio_url.rsplit('/', 1)[1]
+        self.assertIsNotNone(self.tts_service.audio_store.path(audio_id))
+
+        captioned = asyncio.run(self.tts_service.synthesize_program(program.copy(update={'captions': True})))
+        words = captioned['response'].words
+        self.assertEqual(words[0].word, 'Welcome')
+        self.assertEqual(words[-1].word, 'watching.')
+        self.assertGreaterEqual(words[-1].start, outro.start_seconds)
+
+    def test_program_validation(self):
+        empty = asyncio.run(self.tts_service.synthesize_program(ProgramRequest(segments=[])))
+        self.assertEqual(empty['status_code'], 400)
+
+        blank = ProgramRequest(segments=[{'content': 'Fine.'}, {'content': ' '}])
+        result = asyncio.run(self.tts_service.synthesize_program(blank))
+        self.assertEqual(result['status_code'], 400)
+        self.assertIn('Segment 1', result['error'])
+
+        too_long = ProgramRequest(segments=[{'content': 'Late.', 'min_start': 10 ** 6}])
+        self.assertEqual(asyncio.run(self.tts_service.synthesize_program(too_long))['status_code'], 400)
+
+    def test_persisted_audio_is_served_by_url(self):
+        result = asyncio.run(self.tts_service.synthesize_speech(TTSRequest(text="Keep me"), persist=True))
+        audio_id = result['response'].audio_url.rsplit('/', 1)[1]
+        with open(self.tts_service.audio_store.path(audio_id), 'rb') as f:
+            self.assertEqual(f.read(), result['audio_data'])
+
+    def test_output_format_is_transcoded_and_cached_separately(self):
+        transcoder = TaggingTranscoder()
+        self.tts_service = self._service(FakeTTSBackend(latency=0), transcoder)
+        mp3 = self._synthesize(text="Format me.", use_cache=True)
+        opus = self._synthesize(text="Format me.", use_cache=True, output_format='opus', quality='low')
+        self.assertEqual(opus['audio_data'], b'opus-low' + mp3['audio_data'])
+        self.assertEqual(opus['response'].output_format, 'opus')
+        self.assertEqual(opus['response'].duration_seconds, mp3['response'].duration_seconds)
+
+        # The backend's own format needs no conversion, and the converted clip is cached
+        self.assertEqual(transcoder.calls, 1)
+        again = self._synthesize(text="Format me.", use_cache=True, output_format='opus', quality='low')
+        self.assertEqual(again['audio_data'], opus['audio_data'])
+        self.assertEqual(transcoder.calls, 1)
+
+    def test_output_format_validation(self):
+        self.tts_service.transcoder.ffmpeg_path = None
+        self.assertEqual(self._synthesize(text="Hi", output_format='flac')['status_code'], 400)
+        self.assertEqual(self._synthesize(text="Hi", output_format='wav')['status_code'], 501)
+        self.assertTrue(self._synthesize(text="Hi", output_format='mp3')['success'])
+
 if __name__ == '__main__':
-    unittest.main()
\ No newline at end of file
+    unittest.main()
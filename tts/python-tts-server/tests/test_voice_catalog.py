@@ -0,0 +1,91 @@
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+from src.services.tts_backends import FakeTTSBackend
+from src.services.voice_catalog import VoiceCatalog
+
+
+class FailingBackend(FakeTTSBackend):
+    async def list_voices(self):
+        raise ConnectionError('offline')
+
+
+class TestVoiceCatalog(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache_path = os.path.join(self.temp_dir.name, 'voices.json')
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def _catalog(self, backend=None, **kwargs):
+        options = {
+            'backend': backend or FakeTTSBackend(latency=0),
+            'cache_path': self.cache_path,
+            'ttl_seconds': 3600,
+            'retry_seconds': 60,
+            'preferred': {'en-US': {'female': 'en-US-JennyNeural'}},
+            'style_voices': {'en-US-JennyNeural': ['cheerful', 'sad']}
+        }
+        options.update(kwargs)
+        return VoiceCatalog(**options)
+
+    def test_starts_from_snapshot(self):
+        catalog = self._catalog()
+        self.assertEqual(catalog.stats()['source'], 'snapshot')
+        self.assertEqual(catalog.voice_for('en-US', 'female'), 'en-US-JennyNeural')
+        self.assertEqual(catalog.voice_for('en-GB', 'male'), 'en-GB-RyanNeural')
+        self.assertIn('it-IT', catalog.languages())
+        self.assertEqual(catalog.voices_with_style('cheerful'), ['en-US-JennyNeural'])
+
+    def test_unknown_locale_and_missing_gender(self):
+        catalog = self._catalog()
+        self.assertIsNone(catalog.voice_for('xx-XX', 'female'))
+        self.assertEqual(catalog.voice_for('vi-VN', 'other'), 'vi-VN-HoaiMyNeural')
+
+    def test_refresh_replaces_index_and_writes_cache(self):
+        catalog = self._catalog()
+        self.assertTrue(asyncio.run(catalog.refresh()))
+        self.assertEqual(catalog.stats()['source'], 'backend')
+        # Jenny is not offered by the fake backend, so the first listed voice is used
+        self.assertEqual(catalog.voice_for('en-US', 'female'), 'en-US-AriaNeural')
+        self.assertNotIn('it-IT', catalog.languages())
+
+        reloaded = self._catalog(backend=FailingBackend(latency=0))
+        self.assertEqual(reloaded.stats()['source'], 'disk')
+        self.assertEqual(reloaded.stats()['voices'], len(FakeTTSBackend.VOICES))
+
+    def test_failed_refresh_keeps_current_index(self):
+        catalog = self._catalog(backend=FailingBackend(latency=0))
+        self.assertFalse(asyncio.run(catalog.refresh()))
+        self.assertEqual(catalog.stats()['source'], 'snapshot')
+        self.assertEqual(catalog.stats()['refresh_failures'], 1)
+        self.assertFalse(os.path.exists(self.cache_path))
+
+    def test_corrupt_cache_falls_back_to_snapshot(self):
+        with open(self.cache_path, 'w') as f:
+            f.write('{not json')
+        self.assertEqual(self._catalog().stats()['source'], 'snapshot')
+
+    def test_background_refresh(self):
+        async def run():
+            catalog = self._catalog()
+            await catalog.start()
+            for _ in range(100):
+                if catalog.stats()['source'] == 'backend':
+                    break
+                await asyncio.sleep(0.01)
+            await catalog.stop()
+            return catalog
+
+        catalog = asyncio.run(run())
+        self.assertEqual(catalog.stats()['source'], 'backend')
+        with open(self.cache_path) as f:
+            self.assertEqual(len(json.load(f)), len(FakeTTSBackend.VOICES))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,20 @@
+import io
+import unittest
+import zipfile
+from src.utils.zip_stream import ZipStream
+
+class TestZipStream(unittest.TestCase):
+
+    def test_incremental_archive_is_valid(self):
+        archive = ZipStream()
+        parts = [archive.add('0.mp3', b'\xff\xf3' * 100), archive.add('manifest.json', '{}')]
+        self.assertTrue(all(parts))
+        parts.append(archive.close())
+
+        with zipfile.ZipFile(io.BytesIO(b''.join(parts))) as result:
+            self.assertEqual(result.namelist(), ['0.mp3', 'manifest.json'])
+            self.assertEqual(result.read('0.mp3'), b'\xff\xf3' * 100)
+            self.assertIsNone(result.testzip())
+
+if __name__ == '__main__':
+    unittest.main()
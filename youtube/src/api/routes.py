@@ -9,7 +9,7 @@ app = Flask(__name__)
 
 # Initialize services
 youtube_service = YouTubeService()
-content_generator = ContentGeneratorService()
+content_generator = ContentGeneratorService(youtube_service)
 gemini_service = GeminiService()
 
 @app.errorhandler(404)
@@ -192,6 +192,11 @@ def generate_content():
             status_code=500
         ).dict()), 500
 
+@app.route('/api/v1/stats', methods=['GET'])
+def get_stats():
+    """Get video lookup batching statistics"""
+    return jsonify(youtube_service.get_stats())
+
 
 if __name__ == '__main__':
     app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
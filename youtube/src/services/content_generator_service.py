@@ -11,8 +11,9 @@ from src.services.youtube_service import YouTubeService
 from src.services.gemini_service import GeminiService
 
 class ContentGeneratorService:
-    def __init__(self):
-        self.youtube_service = YouTubeService()
+    def __init__(self, youtube_service: Optional[YouTubeService] = None):
+        # Share the routes' YouTubeService so lookups from all endpoints batch together
+        self.youtube_service = youtube_service or YouTubeService()
         self.gemini_service = GeminiService()
 
     def _parse_gemini_dict(self, data: Any, model_class: type, default_on_error: bool = True) -> Any:
@@ -39,7 +40,7 @@ class ContentGeneratorService:
         """Generate content ideas based on a video ID, returning a list of ContentIdea models."""
         
         # Step 0: Get original video details
-        original_video: Optional[VideoMetadata] = self.youtube_service.get_video_by_id(video_id)
+        original_video: Optional[VideoMetadata] = self.youtube_service.get_video_by_id(video_id, with_transcript=True)
 
         if not original_video:
             print(f"Error: Video with ID {video_id} not found or failed to fetch.")
@@ -86,7 +87,7 @@ class ContentGeneratorService:
         """AI-driven content generation using Gemini AI, returning a Pydantic model."""
         try:
             # Step 0: Get original video details
-            original_video: Optional[VideoMetadata] = self.youtube_service.get_video_by_id(video_id)
+            original_video: Optional[VideoMetadata] = self.youtube_service.get_video_by_id(video_id, with_transcript=True)
 
             if not original_video:
                 print(f"Error: Video with ID {video_id} not found or failed to fetch.")
@@ -0,0 +1,87 @@
+import threading
+from contextlib import contextmanager
+from typing import Dict, List
+import httplib2
+
+
+class HttpPool:
+    """
+    Bounded pool of keep-alive httplib2 connections for googleapiclient.
+
+    httplib2.Http is not thread-safe, so each request borrows one Http for
+    its exclusive use and returns it afterwards. Returned connections stay
+    open, so later requests skip the TCP and TLS handshakes; the most
+    recently used one is handed out first. At most `size` connections exist;
+    when all are busy, callers wait up to acquire_timeout seconds. A
+    connection that failed mid-request is dropped rather than reused.
+    """
+
+    def __init__(self, size: int, timeout: float, acquire_timeout: float = 30.0):
+        self.size = size
+        self.timeout = timeout
+        self.acquire_timeout = acquire_timeout
+
+        # Guards the idle stack and the open count; waiters are woken when
+        # a connection is returned or a discard frees room for a new one
+        self._available = threading.Condition()
+        self._idle: List[httplib2.Http] = []
+        self._created = 0
+        self.requests = 0
+        self.reused = 0
+        self.discarded = 0
+
+    @contextmanager
+    def connection(self):
+        http = self._acquire()
+        try:
+            yield http
+        except (OSError, httplib2.HttpLib2Error):
+            # The connection may be half-way through a response; start afresh next time
+            self._discard(http)
+            raise
+        except BaseException:
+            # API errors such as 304 or 404 arrive as complete responses, so the connection is fine
+            self._release(http)
+            raise
+        self._release(http)
+
+    def stats(self) -> Dict:
+        with self._available:
+            return {
+                'size': self.size,
+                'open': self._created,
+                'idle': len(self._idle),
+                'requests': self.requests,
+                'reused': self.reused,
+                'discarded': self.discarded
+            }
+
+    def _acquire(self) -> httplib2.Http:
+        with self._available:
+            self.requests += 1
+            if not self._available.wait_for(
+                lambda: self._idle or self._created < self.size, timeout=self.acquire_timeout
+            ):
+                raise TimeoutError(f"No HTTP connection free after {self.acquire_timeout}s")
+            if self._idle:
+                self.reused += 1
+                return self._idle.pop()
+            self._created += 1
+        return httplib2.Http(timeout=self.timeout)
+
+    def _release(self, http: httplib2.Http):
+        with self._available:
+            self._idle.append(http)
+            self._available.notify()
+
+    def _discard(self, http: httplib2.Http):
+        for connection in list(getattr(http, 'connections', {}).values()):
+            try:
+                connection.close()
+            except Exception:
+                pass
+        with self._available:
+            self._created -= 1
+            self.discarded += 1
+            # Room for one more connection; let a waiter open it
+            self._available.notify()
@@ -0,0 +1,140 @@
+import gzip
+import os
+import re
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Optional
+from youtube_transcript_api import YouTubeTranscriptApi, NoTranscriptFound, TranscriptsDisabled
+
+
+class TranscriptService:
+    """
+    Fetches video transcripts on a bounded thread pool and caches them on disk.
+
+    The track is chosen in one pass over the video's transcript list: a
+    manually created track in the first available preferred language, then
+    an auto-generated one. Transcripts are stored gzip-compressed as
+    '<video_id>.<language>.txt.gz'. Videos without a usable transcript are
+    remembered for missing_ttl seconds so they are not listed on every
+    request. Concurrent requests for the same video share one fetch.
+    """
+
+    VIDEO_ID_PATTERN = re.compile(r'^[A-Za-z0-9_-]{11}$')
+
+    def __init__(
+        self,
+        cache_dir: str,
+        languages: List[str],
+        max_workers: int = 4,
+        missing_ttl: float = 24 * 60 * 60
+    ):
+        self.cache_dir = cache_dir
+        self.languages = languages
+        self.missing_ttl = missing_ttl
+
+        self._lock = threading.Lock()
+        self._in_flight: Dict[str, Future] = {}
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='transcript')
+        self.cache_hits = 0
+        self.fetches = 0
+
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def submit(self, video_id: str) -> Future:
+        """Start fetching a transcript in the background; the future resolves to the text or None"""
+        if not self.VIDEO_ID_PATTERN.match(video_id):
+            future = Future()
+            future.set_result(None)
+            return future
+
+        with self._lock:
+            future = self._in_flight.get(video_id)
+            if future is not None:
+                return future
+            future = self._executor.submit(self._get, video_id)
+            self._in_flight[video_id] = future
+        future.add_done_callback(lambda done: self._forget(video_id, done))
+        return future
+
+    def get(self, video_id: str) -> Optional[str]:
+        return self.submit(video_id).result()
+
+    def stats(self) -> Dict:
+        return {'cache_hits': self.cache_hits, 'fetches': self.fetches}
+
+    def _get(self, video_id: str) -> Optional[str]:
+        cached = self._read_cache(video_id)
+        if cached is not None:
+            self.cache_hits += 1
+            return cached or None
+
+        self.fetches += 1
+        try:
+            transcript_list = YouTubeTranscriptApi.list_transcripts(video_id)
+            transcript = self._pick_track(transcript_list)
+            if transcript is None:
+                self._write_missing(video_id)
+                return None
+            text = " ".join(entry['text'] for entry in transcript.fetch())
+        except (NoTranscriptFound, TranscriptsDisabled):
+            self._write_missing(video_id)
+            return None
+        except Exception as e:
+            print(f"Error getting transcript for {video_id}: {e}")
+            return None
+
+        self._write_cache(video_id, transcript.language_code, text)
+        return text
+
+    def _pick_track(self, transcript_list):
+        """Choose the best track from the listing without further network calls"""
+        manual = {}
+        generated = {}
+        for transcript in transcript_list:
+            tracks = generated if transcript.is_generated else manual
+            tracks.setdefault(transcript.language_code, transcript)
+
+        for tracks in (manual, generated):
+            for language in self.languages:
+                if language in tracks:
+                    return tracks[language]
+        return None
+
+    def _read_cache(self, video_id: str) -> Optional[str]:
+        """Return the cached text, '' if the video is known to have none, or None on a miss"""
+        for language in self.languages:
+            try:
+                with gzip.open(self._path(video_id, language), 'rt', encoding='utf-8') as f:
+                    return f.read()
+            except OSError:
+                continue
+
+        try:
+            if time.time() - os.path.getmtime(self._missing_path(video_id)) < self.missing_ttl:
+                return ''
+        except OSError:
+            pass
+        return None
+
+    def _write_cache(self, video_id: str, language: str, text: str):
+        path = self._path(video_id, language)
+        tmp_path = f"{path}.tmp"
+        with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+
+    def _write_missing(self, video_id: str):
+        with open(self._missing_path(video_id), 'w'):
+            pass
+
+    def _forget(self, video_id: str, future: Future):
+        with self._lock:
+            if self._in_flight.get(video_id) is future:
+                del self._in_flight[video_id]
+
+    def _path(self, video_id: str, language: str) -> str:
+        return os.path.join(self.cache_dir, f"{video_id}.{language}.txt.gz")
+
+    def _missing_path(self, video_id: str) -> str:
+        return os.path.join(self.cache_dir, f"{video_id}.none")
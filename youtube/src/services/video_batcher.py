@@ -0,0 +1,120 @@
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+from src.models.api_models import VideoMetadata
+
+
+class VideoBatcher:
+    """
+    Collects video lookups from concurrent requests into batched API calls.
+
+    The first lookup opens a batch, which is sent once window_seconds have
+    passed or max_batch_size IDs are waiting, whichever comes first. Callers
+    asking for an ID that is already waiting or being fetched share that
+    fetch instead of starting another one. Batches are fetched on a small
+    thread pool so a slow call does not hold up the next batch.
+    """
+
+    def __init__(
+        self,
+        fetch_many: Callable[[List[str]], Dict[str, VideoMetadata]],
+        window_seconds: float = 0.01,
+        max_batch_size: int = 50,
+        max_workers: int = 4,
+        timeout: float = 30.0
+    ):
+        self.fetch_many = fetch_many
+        self.window_seconds = window_seconds
+        self.max_batch_size = max_batch_size
+        self.timeout = timeout
+
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._waiting: List[str] = []
+        self._batch_opened_at = 0.0
+        self._futures: Dict[str, Future] = {}
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='video-batch')
+
+        # Counters reported by stats()
+        self._lookups = 0
+        self._coalesced = 0
+        self._batches = 0
+        self._batched_ids = 0
+        self._max_batch = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+        threading.Thread(target=self._dispatch_loop, name='video-batcher', daemon=True).start()
+
+    def get(self, video_id: str) -> Optional[VideoMetadata]:
+        """Get one video's details, waiting for the batch that fetches it"""
+        with self._lock:
+            self._lookups += 1
+            future = self._futures.get(video_id)
+            if future is not None:
+                self._coalesced += 1
+            else:
+                future = Future()
+                self._futures[video_id] = future
+                if not self._waiting:
+                    self._batch_opened_at = time.monotonic()
+                self._waiting.append(video_id)
+                self._wakeup.notify()
+        return future.result(timeout=self.timeout)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'lookups': self._lookups,
+                'coalesced': self._coalesced,
+                'coalescing_rate': round(self._coalesced / self._lookups, 3) if self._lookups else 0.0,
+                'batches': self._batches,
+                'batch_size_avg': round(self._batched_ids / self._batches, 2) if self._batches else 0.0,
+                'batch_size_max': self._max_batch,
+                'batch_wait_ms_avg': round(self._wait_total / self._batches * 1000, 2) if self._batches else 0.0,
+                'batch_wait_ms_max': round(self._wait_max * 1000, 2)
+            }
+
+    def _dispatch_loop(self):
+        while True:
+            with self._lock:
+                while not self._waiting:
+                    self._wakeup.wait()
+                # Hold the batch open until the window closes or it is full
+                while len(self._waiting) < self.max_batch_size:
+                    remaining = self._batch_opened_at + self.window_seconds - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._wakeup.wait(remaining)
+
+                batch = self._waiting[:self.max_batch_size]
+                del self._waiting[:self.max_batch_size]
+                waited = time.monotonic() - self._batch_opened_at
+                if self._waiting:
+                    # The overflow starts a new batch right away
+                    self._batch_opened_at = time.monotonic()
+
+                self._batches += 1
+                self._batched_ids += len(batch)
+                self._max_batch = max(self._max_batch, len(batch))
+                self._wait_total += waited
+                self._wait_max = max(self._wait_max, waited)
+
+            self._executor.submit(self._fetch, batch)
+
+    def _fetch(self, batch: List[str]):
+        try:
+            details = self.fetch_many(batch)
+            error = None
+        except Exception as e:
+            details = {}
+            error = e
+
+        with self._lock:
+            futures = [(video_id, self._futures.pop(video_id)) for video_id in batch]
+        for video_id, future in futures:
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(details.get(video_id))
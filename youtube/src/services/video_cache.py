@@ -0,0 +1,130 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, NamedTuple, Optional
+
+
+class CachedVideo(NamedTuple):
+    static: Dict  # The item's 'snippet' and 'contentDetails' parts
+    etag: Optional[str]  # ETag of the last snippet,contentDetails response for this video alone
+    static_fetched_at: float
+    statistics: Dict
+    statistics_fetched_at: float
+
+
+class VideoCache:
+    """
+    Two-tier cache of videos().list items: an in-process LRU in front of SQLite.
+
+    Titles, descriptions and tags rarely change while view and like counts
+    move constantly, so the static parts and the statistics are stored and
+    expire separately. Expired static parts keep their ETag so the caller can
+    revalidate them with If-None-Match instead of downloading them again.
+    """
+
+    def __init__(self, db_path: str, memory_items: int, static_ttl: float, statistics_ttl: float):
+        self.db_path = db_path
+        self.memory_items = memory_items
+        self.static_ttl = static_ttl
+        self.statistics_ttl = statistics_ttl
+
+        self._lock = threading.Lock()
+        self._memory: 'OrderedDict[str, CachedVideo]' = OrderedDict()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        if os.path.dirname(db_path):
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self._db = sqlite3.connect(db_path, check_same_thread=False)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute(
+            'CREATE TABLE IF NOT EXISTS videos ('
+            'video_id TEXT PRIMARY KEY, static TEXT NOT NULL, etag TEXT, static_fetched_at REAL NOT NULL, '
+            'statistics TEXT NOT NULL, statistics_fetched_at REAL NOT NULL)'
+        )
+        self._db.commit()
+
+    def get(self, video_id: str, count: bool = True) -> Optional[CachedVideo]:
+        """Look up a video; count=False leaves the hit and miss counters alone"""
+        with self._lock:
+            entry = self._memory.get(video_id)
+            if entry is not None:
+                self._memory.move_to_end(video_id)
+                self.memory_hits += count
+                return entry
+
+            row = self._db.execute(
+                'SELECT static, etag, static_fetched_at, statistics, statistics_fetched_at '
+                'FROM videos WHERE video_id = ?', (video_id,)
+            ).fetchone()
+            if row is None:
+                self.misses += count
+                return None
+
+            entry = CachedVideo(json.loads(row[0]), row[1], row[2], json.loads(row[3]), row[4])
+            self.disk_hits += count
+            self._remember(video_id, entry)
+            return entry
+
+    def put(self, video_id: str, static: Dict, statistics: Dict, etag: Optional[str] = None):
+        """Store a freshly fetched item"""
+        now = time.time()
+        self._store(video_id, CachedVideo(static, etag, now, statistics, now))
+
+    def put_static(self, video_id: str, static: Dict, etag: Optional[str]):
+        """Replace the static parts after a revalidation that returned new content"""
+        entry = self.get(video_id, count=False)
+        if entry:
+            self._store(video_id, entry._replace(static=static, etag=etag, static_fetched_at=time.time()))
+
+    def touch_static(self, video_id: str):
+        """Mark the static parts fresh again after a 304 Not Modified"""
+        entry = self.get(video_id, count=False)
+        if entry:
+            self._store(video_id, entry._replace(static_fetched_at=time.time()))
+
+    def put_statistics(self, video_id: str, statistics: Dict):
+        entry = self.get(video_id, count=False)
+        if entry:
+            self._store(video_id, entry._replace(statistics=statistics, statistics_fetched_at=time.time()))
+
+    def delete(self, video_id: str):
+        with self._lock:
+            self._db.execute('DELETE FROM videos WHERE video_id = ?', (video_id,))
+            self._db.commit()
+            self._memory.pop(video_id, None)
+
+    def static_fresh(self, entry: CachedVideo) -> bool:
+        return time.time() - entry.static_fetched_at < self.static_ttl
+
+    def statistics_fresh(self, entry: CachedVideo) -> bool:
+        return time.time() - entry.statistics_fetched_at < self.statistics_ttl
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'memory_items': len(self._memory),
+                'memory_hits': self.memory_hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses
+            }
+
+    def _store(self, video_id: str, entry: CachedVideo):
+        with self._lock:
+            self._db.execute(
+                'INSERT OR REPLACE INTO videos VALUES (?, ?, ?, ?, ?, ?)',
+                (video_id, json.dumps(entry.static), entry.etag, entry.static_fetched_at,
+                 json.dumps(entry.statistics), entry.statistics_fetched_at)
+            )
+            self._db.commit()
+            self._remember(video_id, entry)
+
+    def _remember(self, video_id: str, entry: CachedVideo):
+        self._memory[video_id] = entry
+        self._memory.move_to_end(video_id)
+        while len(self._memory) > self.memory_items:
+            self._memory.popitem(last=False)
@@ -1,7 +1,11 @@
 from googleapiclient.discovery import build
-from youtube_transcript_api import YouTubeTranscriptApi, NoTranscriptFound, TranscriptsDisabled
-from typing import Optional
+from googleapiclient.errors import HttpError
+from typing import Dict, Iterator, List, Optional, Tuple
 from src.models.api_models import VideoMetadata, TrendingVideosResponse
+from src.services.http_pool import HttpPool
+from src.services.transcript_service import TranscriptService
+from src.services.video_batcher import VideoBatcher
+from src.services.video_cache import VideoCache
 from datetime import datetime, timedelta
 from dotenv import load_dotenv
 import os
@@ -9,13 +13,45 @@ import os
 
 
 class YouTubeService:
+    # videos().list accepts at most 50 IDs per call
+    MAX_IDS_PER_REQUEST = 50
+
     def __init__(self):
         load_dotenv()  # Load environment variables from .env file
         self.api_key = os.getenv('YOUTUBE_API_KEY')
         if not self.api_key:
             raise ValueError("YOUTUBE_API_KEY environment variable not set")
         
-        self.youtube = build('youtube', 'v3', developerKey=self.api_key)
+        # Built once from the discovery document bundled with the client library; requests
+        # are executed over pooled connections because one httplib2.Http is not thread-safe
+        self.youtube = build('youtube', 'v3', developerKey=self.api_key, static_discovery=True, cache_discovery=False)
+        self.http_pool = HttpPool(
+            size=int(os.getenv('YOUTUBE_HTTP_POOL_SIZE', 8)),
+            timeout=float(os.getenv('YOUTUBE_HTTP_TIMEOUT', 15))
+        )
+        
+        # Video details are cached; statistics expire much sooner than titles and descriptions
+        self.video_cache = VideoCache(
+            db_path=os.getenv('VIDEO_CACHE_PATH', 'cache/videos.db'),
+            memory_items=int(os.getenv('VIDEO_CACHE_MEMORY_ITEMS', 1000)),
+            static_ttl=float(os.getenv('VIDEO_STATIC_TTL', 24 * 60 * 60)),
+            statistics_ttl=float(os.getenv('VIDEO_STATISTICS_TTL', 5 * 60))
+        )
+        
+        # Transcripts are fetched on their own pool and cached compressed on disk
+        self.transcript_service = TranscriptService(
+            cache_dir=os.getenv('TRANSCRIPT_CACHE_DIR', 'cache/transcripts'),
+            languages=['en', 'en-US', 'en-GB'],
+            max_workers=int(os.getenv('TRANSCRIPT_WORKERS', 4))
+        )
+        self.transcript_timeout = float(os.getenv('TRANSCRIPT_TIMEOUT', 10))
+        
+        # Single-video lookups from concurrent requests are merged into batched calls
+        self.video_batcher = VideoBatcher(
+            fetch_many=self._get_videos_details,
+            window_seconds=float(os.getenv('VIDEO_BATCH_WINDOW_MS', 10)) / 1000,
+            max_batch_size=min(int(os.getenv('VIDEO_BATCH_MAX_SIZE', self.MAX_IDS_PER_REQUEST)), self.MAX_IDS_PER_REQUEST)
+        )
     
     def search_trending_videos(self, keyword: str, max_results: int = 5) -> TrendingVideosResponse:
         """Search for trending videos based on keyword"""
@@ -30,16 +66,12 @@ class YouTubeService:
                 # recent trending videos can be filtered by publishedAfter : 72 hours
                 publishedAfter=(datetime.now() - timedelta(days=3)).isoformat("T") + "Z"  # Last 72 hours
             )
-            search_response = search_request.execute()
+            search_response = self._execute(search_request)
             
-            videos = []
-            for item in search_response.get('items', []):
-                video_id = item['id']['videoId']
-                
-                # Get detailed video statistics
-                video_details = self._get_video_details(video_id)
-                if video_details:
-                    videos.append(video_details)
+            # Get detailed video statistics for all results in one batched lookup
+            video_ids = [item['id']['videoId'] for item in search_response.get('items', [])]
+            details = self._get_videos_details(video_ids)
+            videos = [details[video_id] for video_id in video_ids if video_id in details]
             
             return TrendingVideosResponse(
                 videos=videos,
@@ -51,68 +83,177 @@ class YouTubeService:
         except Exception as e:
             raise Exception(f"Error searching videos: {str(e)}")
     
+    def _execute(self, request):
+        """Execute an API request on a pooled connection owned by this thread until it finishes"""
+        with self.http_pool.connection() as http:
+            return request.execute(http=http)
+    
     def _get_video_details(self, video_id: str) -> Optional[VideoMetadata]:
         """Get detailed information for a specific video"""
+        return self._get_videos_details([video_id]).get(video_id)
+    
+    def _get_videos_details(self, video_ids: List[str]) -> Dict[str, VideoMetadata]:
+        """
+        Get detailed information for several videos, keyed by video ID.
+        
+        Videos are served from the cache where possible. Missing videos are
+        fetched in batches of up to 50 per videos().list call. Expired titles,
+        descriptions and tags are refreshed the same way, in batches; a lookup
+        with a single expired video revalidates it with If-None-Match instead,
+        so an unchanged video downloads no body. Expired statistics are
+        refreshed with one batched statistics-only call. If a refresh fails the
+        cached values are served. Unknown IDs are left out.
+        """
+        unique_ids = list(dict.fromkeys(video_ids))
+        entries = {video_id: self.video_cache.get(video_id) for video_id in unique_ids}
+        
+        missing = [video_id for video_id, entry in entries.items() if entry is None]
+        for item in self._list_videos(missing, 'snippet,contentDetails,statistics'):
+            self.video_cache.put(item['id'], self._static_parts(item), item.get('statistics', {}))
+        
+        cached = {video_id: entry for video_id, entry in entries.items() if entry is not None}
+        stale_static = [video_id for video_id, entry in cached.items() if not self.video_cache.static_fresh(entry)]
+        if len(stale_static) == 1:
+            self._revalidate_static(stale_static[0], cached[stale_static[0]].etag)
+        elif stale_static:
+            self._refresh_static(stale_static)
+        
+        stale_statistics = [
+            video_id for video_id, entry in cached.items() if not self.video_cache.statistics_fresh(entry)
+        ]
+        for item in self._list_videos(stale_statistics, 'statistics'):
+            self.video_cache.put_statistics(item['id'], item.get('statistics', {}))
+        
+        details = {}
+        for video_id in unique_ids:
+            entry = self.video_cache.get(video_id, count=False)
+            if entry is None:
+                continue
+            try:
+                details[video_id] = self._parse_video_item({'id': video_id, 'statistics': entry.statistics, **entry.static})
+            except Exception as e:
+                print(f"Error parsing video details for {video_id}: {e}")
+        
+        return details
+    
+    def _list_videos(self, video_ids: List[str], part: str) -> List[dict]:
+        """Fetch videos().list items in batches of up to 50 IDs"""
+        items = []
+        for _, batch_items in self._list_video_batches(video_ids, part):
+            items.extend(batch_items)
+        return items
+    
+    def _list_video_batches(self, video_ids: List[str], part: str) -> Iterator[Tuple[List[str], List[dict]]]:
+        """Yield (batch IDs, items) for each videos().list call of up to 50 IDs that succeeds"""
+        for start in range(0, len(video_ids), self.MAX_IDS_PER_REQUEST):
+            batch = video_ids[start:start + self.MAX_IDS_PER_REQUEST]
+            try:
+                request = self.youtube.videos().list(
+                    part=part,
+                    id=",".join(batch)
+                )
+                response = self._execute(request)
+            except Exception as e:
+                print(f"Error getting video details for {', '.join(batch)}: {e}")
+                continue
+            yield batch, response.get('items', [])
+    
+    def _refresh_static(self, video_ids: List[str]):
+        """Refetch several videos' snippet and contentDetails in batched calls"""
+        for batch, items in self._list_video_batches(video_ids, 'snippet,contentDetails'):
+            for item in items:
+                # A batch response ETag covers the whole batch, so no per-video ETag is kept
+                self.video_cache.put_static(item['id'], self._static_parts(item), None)
+            returned = {item['id'] for item in items}
+            for video_id in batch:
+                if video_id not in returned:
+                    # The video was deleted or made private
+                    self.video_cache.delete(video_id)
+    
+    def _revalidate_static(self, video_id: str, etag: Optional[str]):
+        """Refresh a video's snippet and contentDetails, sending If-None-Match when an ETag is known"""
+        request = self.youtube.videos().list(
+            part='snippet,contentDetails',
+            id=video_id
+        )
+        if etag:
+            request.headers['If-None-Match'] = etag
         try:
-            request = self.youtube.videos().list(
-                part="snippet,contentDetails,statistics",
-                id=video_id
-            )
-            response = request.execute()
-            
-            if not response.get('items'):
-                return None
-            
-            item = response['items'][0]
-            snippet = item['snippet']
-            statistics = item['statistics']
-            content_details = item['contentDetails']
-            
-            return VideoMetadata(
-                video_id=video_id,
-                title=snippet['title'],
-                channel_name=snippet['channelTitle'],
-                channel_id=snippet['channelId'],
-                description=snippet['description'],
-                thumbnail_url=snippet['thumbnails'].get('high', {}).get('url', ''),
-                duration=content_details['duration'],
-                view_count=int(statistics.get('viewCount', 0)),
-                like_count=int(statistics.get('likeCount', 0)),
-                comment_count=int(statistics.get('commentCount', 0)),
-                published_at=snippet['publishedAt'],
-                tags=snippet.get('tags', []),
-                url=f"https://www.youtube.com/watch?v={video_id}"
-            )
-            
+            response = self._execute(request)
+        except HttpError as e:
+            if e.resp.status == 304:
+                self.video_cache.touch_static(video_id)
+            else:
+                print(f"Error revalidating video details for {video_id}: {e}")
+            return
         except Exception as e:
-            print(f"Error getting video details for {video_id}: {e}")
-            return None
+            print(f"Error revalidating video details for {video_id}: {e}")
+            return
+        
+        if not response.get('items'):
+            # The video was deleted or made private
+            self.video_cache.delete(video_id)
+            return
+        # The response ETag belongs to this exact single-video request, so it can be sent back next time
+        self.video_cache.put_static(video_id, self._static_parts(response['items'][0]), response.get('etag'))
+    
+    @staticmethod
+    def _static_parts(item: dict) -> dict:
+        return {'snippet': item['snippet'], 'contentDetails': item['contentDetails']}
+    
+    def _parse_video_item(self, item: dict) -> VideoMetadata:
+        """Build VideoMetadata from one videos().list item"""
+        video_id = item['id']
+        snippet = item['snippet']
+        statistics = item['statistics']
+        content_details = item['contentDetails']
+        
+        return VideoMetadata(
+            video_id=video_id,
+            title=snippet['title'],
+            channel_name=snippet['channelTitle'],
+            channel_id=snippet['channelId'],
+            description=snippet['description'],
+            thumbnail_url=snippet['thumbnails'].get('high', {}).get('url', ''),
+            duration=content_details['duration'],
+            view_count=int(statistics.get('viewCount', 0)),
+            like_count=int(statistics.get('likeCount', 0)),
+            comment_count=int(statistics.get('commentCount', 0)),
+            published_at=snippet['publishedAt'],
+            tags=snippet.get('tags', []),
+            url=f"https://www.youtube.com/watch?v={video_id}"
+        )
     
     def get_video_transcript(self, video_id: str) -> Optional[str]:
         """Get transcript for a video"""
+        return self.transcript_service.get(video_id)
+    
+    def get_video_by_id(self, video_id: str, with_transcript: bool = False) -> Optional[VideoMetadata]:
+        """
+        Get single video details by ID, batched with concurrent lookups.
+        
+        With with_transcript=True the transcript is fetched in the background
+        while the details are looked up, and waited for up to
+        TRANSCRIPT_TIMEOUT seconds.
+        """
+        transcript = self.transcript_service.submit(video_id) if with_transcript else None
+        video = self.video_batcher.get(video_id)
+        if not video or transcript is None:
+            return video
+        
         try:
-            transcript_list = YouTubeTranscriptApi.list_transcripts(video_id)
-            
-            # Try to get English transcript first
-            for lang_code in ['en', 'en-US', 'en-GB']:
-                try:
-                    transcript = transcript_list.find_transcript([lang_code])
-                    transcript_data = transcript.fetch()
-                    return " ".join([entry['text'] for entry in transcript_data])
-                except NoTranscriptFound:
-                    continue
-            
-            # If no English, try auto-generated
-            try:
-                transcript = transcript_list.find_generated_transcript(['en'])
-                transcript_data = transcript.fetch()
-                return " ".join([entry['text'] for entry in transcript_data])
-            except NoTranscriptFound:
-                return None
-                
-        except (TranscriptsDisabled, Exception):
-            return None
+            text = transcript.result(timeout=self.transcript_timeout)
+        except Exception as e:
+            print(f"Transcript for {video_id} not ready: {e!r}")
+            return video
+        # The batcher hands the same object to every waiter, so copy rather than modify it
+        return video.copy(update={'transcript': text})
     
-    def get_video_by_id(self, video_id: str) -> Optional[VideoMetadata]:
-        """Get single video details by ID"""
-        return self._get_video_details(video_id)
\ No newline at end of file
+    def get_stats(self) -> dict:
+        """Get batching, coalescing and cache counters for video and transcript lookups"""
+        return {
+            'video_batcher': self.video_batcher.stats(),
+            'video_cache': self.video_cache.stats(),
+            'transcripts': self.transcript_service.stats(),
+            'http_pool': self.http_pool.stats()
+        }
\ No newline at end of file
@@ -0,0 +1,88 @@
+import threading
+import time
+import unittest
+from unittest import mock
+from src.services import http_pool
+from src.services.http_pool import HttpPool
+
+
+class StubHttp:
+    """Stands in for httplib2.Http without opening sockets"""
+
+    created = 0
+
+    def __init__(self, timeout=None):
+        StubHttp.created += 1
+        self.timeout = timeout
+        self.connections = {}
+
+
+class TestHttpPool(unittest.TestCase):
+
+    def setUp(self):
+        StubHttp.created = 0
+        patcher = mock.patch.object(http_pool.httplib2, 'Http', StubHttp)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_returned_connection_is_reused(self):
+        pool = HttpPool(size=2, timeout=5)
+        with pool.connection() as first:
+            pass
+        with pool.connection() as second:
+            pass
+        self.assertIs(first, second)
+        self.assertEqual(pool.stats()['reused'], 1)
+        self.assertEqual(StubHttp.created, 1)
+
+    def test_api_errors_keep_the_connection(self):
+        pool = HttpPool(size=1, timeout=5)
+        with self.assertRaises(ValueError):
+            with pool.connection():
+                raise ValueError('404 from the API')
+        self.assertEqual(pool.stats()['idle'], 1)
+        self.assertEqual(pool.stats()['discarded'], 0)
+
+    def test_times_out_when_every_connection_is_busy(self):
+        pool = HttpPool(size=1, timeout=5, acquire_timeout=0.05)
+        with pool.connection():
+            with self.assertRaises(TimeoutError):
+                with pool.connection():
+                    pass
+
+    def test_waiter_wakes_when_a_failed_connection_is_discarded(self):
+        pool = HttpPool(size=1, timeout=5, acquire_timeout=5)
+        acquired = threading.Event()
+        waited = []
+
+        def failing_request():
+            try:
+                with pool.connection():
+                    acquired.set()
+                    time.sleep(0.1)
+                    raise OSError('connection reset')
+            except OSError:
+                pass
+
+        def waiting_request():
+            started = time.monotonic()
+            with pool.connection() as http:
+                waited.append((time.monotonic() - started, http))
+
+        holder = threading.Thread(target=failing_request)
+        holder.start()
+        self.assertTrue(acquired.wait(5))
+        waiter = threading.Thread(target=waiting_request)
+        waiter.start()
+        holder.join()
+        waiter.join()
+
+        elapsed, http = waited[0]
+        self.assertLess(elapsed, 1)
+        self.assertEqual(StubHttp.created, 2)
+        self.assertEqual(pool.stats()['discarded'], 1)
+        self.assertEqual(pool.stats()['open'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+import os
+import tempfile
+import threading
+import unittest
+from unittest import mock
+from youtube_transcript_api import TranscriptsDisabled
+from src.services import transcript_service
+from src.services.transcript_service import TranscriptService
+
+
+class StubTranscript:
+    def __init__(self, language_code, is_generated, text):
+        self.language_code = language_code
+        self.is_generated = is_generated
+        self.text = text
+
+    def fetch(self):
+        return [{'text': word} for word in self.text.split()]
+
+
+class TestTranscriptService(unittest.TestCase):
+
+    VIDEO_ID = 'dQw4w9WgXcQ'
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.listings = 0
+        self.tracks = [
+            StubTranscript('en', True, 'generated english'),
+            StubTranscript('fr', False, 'manuel'),
+            StubTranscript('en-GB', False, 'manual british')
+        ]
+        self.release = threading.Event()
+        self.release.set()
+        patcher = mock.patch.object(
+            transcript_service.YouTubeTranscriptApi, 'list_transcripts', side_effect=self._list_transcripts
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.service = TranscriptService(self.temp_dir.name, languages=['en', 'en-US', 'en-GB'])
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def _list_transcripts(self, video_id):
+        self.listings += 1
+        self.release.wait(5)
+        if self.tracks is None:
+            raise TranscriptsDisabled(video_id)
+        return self.tracks
+
+    def test_manual_track_is_preferred_over_generated(self):
+        self.assertEqual(self.service.get(self.VIDEO_ID), 'manual british')
+
+    def test_generated_track_is_the_fallback(self):
+        self.tracks = self.tracks[:2]
+        self.assertEqual(self.service.get(self.VIDEO_ID), 'generated english')
+
+    def test_transcript_is_cached_compressed_on_disk(self):
+        self.service.get(self.VIDEO_ID)
+        self.assertTrue(os.path.exists(os.path.join(self.temp_dir.name, f'{self.VIDEO_ID}.en-GB.txt.gz')))
+
+        fresh = TranscriptService(self.temp_dir.name, languages=['en', 'en-US', 'en-GB'])
+        self.assertEqual(fresh.get(self.VIDEO_ID), 'manual british')
+        self.assertEqual(self.listings, 1)
+        self.assertEqual(fresh.stats(), {'cache_hits': 1, 'fetches': 0})
+
+    def test_videos_without_transcripts_are_remembered(self):
+        self.tracks = None
+        self.assertIsNone(self.service.get(self.VIDEO_ID))
+        self.assertIsNone(self.service.get(self.VIDEO_ID))
+        self.assertEqual(self.listings, 1)
+
+    def test_concurrent_requests_share_one_fetch(self):
+        self.release.clear()
+        futures = [self.service.submit(self.VIDEO_ID) for _ in range(3)]
+        self.assertTrue(all(future is futures[0] for future in futures))
+        self.release.set()
+        self.assertEqual([future.result(5) for future in futures], ['manual british'] * 3)
+        self.assertEqual(self.listings, 1)
+
+    def test_invalid_video_id_is_not_fetched(self):
+        self.assertIsNone(self.service.get('../../etc/passwd'))
+        self.assertEqual(self.listings, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
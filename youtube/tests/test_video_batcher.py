@@ -0,0 +1,114 @@
+import threading
+import time
+import unittest
+from src.services.video_batcher import VideoBatcher
+
+
+class RecordingFetch:
+    """Stands in for YouTubeService._get_videos_details and records each batch"""
+
+    def __init__(self, delay=0.0, error=None):
+        self.delay = delay
+        self.error = error
+        self.batches = []
+
+    def __call__(self, video_ids):
+        self.batches.append(list(video_ids))
+        time.sleep(self.delay)
+        if self.error:
+            raise self.error
+        # 'missing' IDs are unknown to the API and left out, like deleted videos
+        return {video_id: f"details:{video_id}" for video_id in video_ids if not video_id.startswith('missing')}
+
+
+class TestVideoBatcher(unittest.TestCase):
+
+    def _lookup_all(self, batcher, video_ids):
+        results = {}
+        errors = {}
+
+        def lookup(position, video_id):
+            try:
+                results[position] = batcher.get(video_id)
+            except Exception as e:
+                errors[position] = e
+
+        threads = [threading.Thread(target=lookup, args=item) for item in enumerate(video_ids)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results, errors
+
+    def test_lookups_in_one_window_share_a_batch(self):
+        fetch = RecordingFetch()
+        batcher = VideoBatcher(fetch, window_seconds=0.2, max_batch_size=50)
+        results, _ = self._lookup_all(batcher, ['a', 'b', 'c'])
+
+        self.assertEqual(len(fetch.batches), 1)
+        self.assertEqual(sorted(fetch.batches[0]), ['a', 'b', 'c'])
+        self.assertEqual([results[position] for position in range(3)], ['details:a', 'details:b', 'details:c'])
+
+    def test_duplicate_lookups_are_coalesced(self):
+        fetch = RecordingFetch(delay=0.1)
+        batcher = VideoBatcher(fetch, window_seconds=0.05, max_batch_size=50)
+        results, _ = self._lookup_all(batcher, ['a'] * 5)
+
+        self.assertEqual(fetch.batches, [['a']])
+        self.assertEqual(list(results.values()), ['details:a'] * 5)
+        self.assertEqual(batcher.stats()['coalesced'], 4)
+
+    def test_full_batch_is_sent_before_the_window_closes(self):
+        fetch = RecordingFetch()
+        batcher = VideoBatcher(fetch, window_seconds=5, max_batch_size=2)
+        started = time.monotonic()
+        results, _ = self._lookup_all(batcher, ['a', 'b'])
+
+        self.assertLess(time.monotonic() - started, 1)
+        self.assertEqual(sorted(fetch.batches[0]), ['a', 'b'])
+        self.assertEqual(len(results), 2)
+
+    def test_overflow_is_split_into_batches_of_max_size(self):
+        fetch = RecordingFetch()
+        batcher = VideoBatcher(fetch, window_seconds=0.2, max_batch_size=2)
+        self._lookup_all(batcher, ['a', 'b', 'c', 'd', 'e'])
+
+        self.assertEqual(sorted(len(batch) for batch in fetch.batches), [1, 2, 2])
+        self.assertEqual(sorted(video_id for batch in fetch.batches for video_id in batch), ['a', 'b', 'c', 'd', 'e'])
+        self.assertEqual(batcher.stats()['batch_size_max'], 2)
+
+    def test_window_bounds_the_wait_of_a_single_lookup(self):
+        fetch = RecordingFetch()
+        batcher = VideoBatcher(fetch, window_seconds=0.05, max_batch_size=50)
+        started = time.monotonic()
+        self.assertEqual(batcher.get('a'), 'details:a')
+        self.assertGreaterEqual(time.monotonic() - started, 0.05)
+        self.assertLess(time.monotonic() - started, 1)
+
+    def test_errors_reach_every_waiter(self):
+        error = RuntimeError('quota exceeded')
+        batcher = VideoBatcher(RecordingFetch(error=error), window_seconds=0.1, max_batch_size=50)
+        results, errors = self._lookup_all(batcher, ['a', 'a', 'b'])
+
+        self.assertEqual(results, {})
+        self.assertEqual(len(errors), 3)
+        self.assertTrue(all(e is error for e in errors.values()))
+
+    def test_missing_ids_resolve_to_none(self):
+        fetch = RecordingFetch()
+        batcher = VideoBatcher(fetch, window_seconds=0.1, max_batch_size=50)
+        results, errors = self._lookup_all(batcher, ['a', 'missing-1'])
+
+        self.assertEqual(errors, {})
+        self.assertEqual(results, {0: 'details:a', 1: None})
+
+    def test_ids_can_be_looked_up_again_after_their_batch(self):
+        fetch = RecordingFetch()
+        batcher = VideoBatcher(fetch, window_seconds=0.01, max_batch_size=50)
+        batcher.get('a')
+        batcher.get('a')
+        self.assertEqual(fetch.batches, [['a'], ['a']])
+
+
+if __name__ == '__main__':
+    unittest.main()
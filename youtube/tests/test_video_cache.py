@@ -0,0 +1,77 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+from src.services import video_cache
+from src.services.video_cache import VideoCache
+
+
+class TestVideoCache(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.temp_dir.name, 'videos.db')
+        self.static = {'snippet': {'title': 'Title'}, 'contentDetails': {'duration': 'PT1M'}}
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def _cache(self, memory_items=10):
+        return VideoCache(self.db_path, memory_items=memory_items, static_ttl=100, statistics_ttl=10)
+
+    def test_miss_then_memory_hit(self):
+        cache = self._cache()
+        self.assertIsNone(cache.get('a'))
+        cache.put('a', self.static, {'viewCount': '1'}, etag='"v1"')
+        entry = cache.get('a')
+        self.assertEqual(entry.static, self.static)
+        self.assertEqual(entry.etag, '"v1"')
+        self.assertEqual(cache.stats()['misses'], 1)
+        self.assertEqual(cache.stats()['memory_hits'], 1)
+
+    def test_lru_falls_back_to_sqlite(self):
+        cache = self._cache(memory_items=1)
+        cache.put('a', self.static, {})
+        cache.put('b', self.static, {})
+        self.assertEqual(cache.stats()['memory_items'], 1)
+        self.assertIsNotNone(cache.get('a'))
+        self.assertEqual(cache.stats()['disk_hits'], 1)
+
+    def test_entries_survive_restart(self):
+        self._cache().put('a', self.static, {'viewCount': '5'})
+        entry = self._cache().get('a')
+        self.assertEqual(entry.statistics, {'viewCount': '5'})
+
+    def test_static_and_statistics_expire_separately(self):
+        cache = self._cache()
+        with mock.patch.object(video_cache.time, 'time', return_value=1000.0):
+            cache.put('a', self.static, {})
+        entry = cache.get('a')
+
+        with mock.patch.object(video_cache.time, 'time', return_value=1050.0):
+            self.assertTrue(cache.static_fresh(entry))
+            self.assertFalse(cache.statistics_fresh(entry))
+        with mock.patch.object(video_cache.time, 'time', return_value=1200.0):
+            self.assertFalse(cache.static_fresh(entry))
+
+    def test_touch_static_renews_only_the_static_parts(self):
+        cache = self._cache()
+        with mock.patch.object(video_cache.time, 'time', return_value=1000.0):
+            cache.put('a', self.static, {}, etag='"v1"')
+        with mock.patch.object(video_cache.time, 'time', return_value=1200.0):
+            cache.touch_static('a')
+            entry = cache.get('a')
+            self.assertTrue(cache.static_fresh(entry))
+            self.assertFalse(cache.statistics_fresh(entry))
+            self.assertEqual(entry.etag, '"v1"')
+
+    def test_delete(self):
+        cache = self._cache()
+        cache.put('a', self.static, {})
+        cache.delete('a')
+        self.assertIsNone(cache.get('a'))
+        self.assertIsNone(self._cache().get('a'))
+
+
+if __name__ == '__main__':
+    unittest.main()
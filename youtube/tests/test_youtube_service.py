@@ -0,0 +1,198 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+import httplib2
+from googleapiclient.errors import HttpError
+from src.services import video_cache, youtube_service
+from src.services.youtube_service import YouTubeService
+
+
+def make_item(video_id, title='Title', views='10'):
+    return {
+        'id': video_id,
+        'snippet': {
+            'title': title,
+            'channelTitle': 'Channel',
+            'channelId': 'channel',
+            'description': 'Description',
+            'thumbnails': {'high': {'url': f'https://img/{video_id}.jpg'}},
+            'publishedAt': '2024-01-01T00:00:00Z'
+        },
+        'contentDetails': {'duration': 'PT1M'},
+        'statistics': {'viewCount': views, 'likeCount': '1', 'commentCount': '0'}
+    }
+
+
+class FakeRequest:
+    def __init__(self, api, kind, params):
+        self.api = api
+        self.kind = kind
+        self.params = params
+        self.headers = {}
+
+    def execute(self, http=None):
+        self.api.calls.append((self.kind, self.params.get('part'), self.params.get('id'), dict(self.headers)))
+        if self.kind == 'search':
+            return {'items': [{'id': {'videoId': video_id}} for video_id in self.api.search_results]}
+
+        ids = self.params['id'].split(',')
+        items = [self.api.items[video_id] for video_id in ids if video_id in self.api.items]
+        if len(ids) == 1 and items:
+            etag = self.api.etags[ids[0]]
+            if self.headers.get('If-None-Match') == etag:
+                raise HttpError(httplib2.Response({'status': 304}), b'')
+            return {'etag': etag, 'items': items}
+        return {'etag': '"batch"', 'items': items}
+
+
+class FakeYouTube:
+    """Stands in for the discovery client: records videos().list and search().list calls"""
+
+    def __init__(self):
+        self.items = {}
+        self.etags = {}
+        self.search_results = []
+        self.calls = []
+
+    def add(self, video_id, title='Title', views='10'):
+        self.items[video_id] = make_item(video_id, title, views)
+        self.etags[video_id] = f'"{video_id}:{title}"'
+
+    def videos(self):
+        return mock.Mock(list=lambda **params: FakeRequest(self, 'videos', params))
+
+    def search(self):
+        return mock.Mock(list=lambda **params: FakeRequest(self, 'search', params))
+
+    def video_calls(self):
+        return [call for call in self.calls if call[0] == 'videos']
+
+
+class TestYouTubeService(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.api = FakeYouTube()
+        self.now = 1_000_000.0
+        environment = {
+            'YOUTUBE_API_KEY': 'test-key',
+            'VIDEO_CACHE_PATH': os.path.join(self.temp_dir.name, 'videos.db'),
+            'TRANSCRIPT_CACHE_DIR': os.path.join(self.temp_dir.name, 'transcripts'),
+            'VIDEO_STATIC_TTL': '100',
+            'VIDEO_STATISTICS_TTL': '10',
+            'VIDEO_BATCH_WINDOW_MS': '1'
+        }
+        for patcher in (
+            mock.patch.dict(os.environ, environment),
+            mock.patch.object(youtube_service, 'build', return_value=self.api),
+            mock.patch.object(video_cache.time, 'time', side_effect=lambda: self.now)
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.service = YouTubeService()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def _static_calls(self):
+        return [call for call in self.api.video_calls() if call[1] == 'snippet,contentDetails']
+
+    def test_search_fetches_details_in_one_batch(self):
+        for video_id in ('a', 'b', 'c'):
+            self.api.add(video_id)
+        self.api.search_results = ['a', 'b', 'deleted', 'c']
+
+        response = self.service.search_trending_videos('python')
+
+        self.assertEqual([video.video_id for video in response.videos], ['a', 'b', 'c'])
+        self.assertEqual(self.api.video_calls(), [
+            ('videos', 'snippet,contentDetails,statistics', 'a,b,deleted,c', {})
+        ])
+
+    def test_cached_videos_need_no_calls(self):
+        self.api.add('a')
+        self.service._get_videos_details(['a'])
+        self.api.calls.clear()
+
+        details = self.service._get_videos_details(['a', 'a'])
+        self.assertEqual(list(details), ['a'])
+        self.assertEqual(self.api.calls, [])
+
+    def test_expired_statistics_are_refreshed_in_one_call(self):
+        self.api.add('a')
+        self.api.add('b')
+        self.service._get_videos_details(['a', 'b'])
+        self.api.calls.clear()
+
+        self.api.add('a', views='99')
+        self.now += 20
+        details = self.service._get_videos_details(['a', 'b'])
+
+        self.assertEqual(self.api.video_calls(), [('videos', 'statistics', 'a,b', {})])
+        self.assertEqual(details['a'].view_count, 99)
+
+    def test_single_expired_video_is_revalidated_with_its_etag(self):
+        self.api.add('a')
+        self.service._get_videos_details(['a'])
+        self.now += 200
+
+        # The batched fill stored no ETag, so the first revalidation downloads the body
+        self.service._get_videos_details(['a'])
+        self.assertEqual(self._static_calls(), [('videos', 'snippet,contentDetails', 'a', {})])
+        self.api.calls.clear()
+
+        self.now += 200
+        details = self.service._get_videos_details(['a'])
+        self.assertEqual(self._static_calls(), [
+            ('videos', 'snippet,contentDetails', 'a', {'If-None-Match': self.api.etags['a']})
+        ])
+        self.assertEqual(details['a'].title, 'Title')
+        self.assertTrue(self.service.video_cache.static_fresh(self.service.video_cache.get('a')))
+
+    def test_single_expired_video_picks_up_changes(self):
+        self.api.add('a')
+        self.service._get_videos_details(['a'])
+        self.api.add('a', title='New title')
+        self.now += 200
+
+        details = self.service._get_videos_details(['a'])
+        self.assertEqual(details['a'].title, 'New title')
+        self.assertEqual(self.service.video_cache.get('a').etag, self.api.etags['a'])
+
+    def test_several_expired_videos_are_refreshed_in_one_batch(self):
+        for video_id in ('a', 'b', 'c'):
+            self.api.add(video_id)
+        self.service._get_videos_details(['a', 'b', 'c'])
+        self.api.calls.clear()
+
+        self.api.add('b', title='New title')
+        del self.api.items['c']
+        self.now += 200
+        details = self.service._get_videos_details(['a', 'b', 'c'])
+
+        self.assertEqual(self._static_calls(), [('videos', 'snippet,contentDetails', 'a,b,c', {})])
+        self.assertEqual(details['b'].title, 'New title')
+        self.assertNotIn('c', details)
+        self.assertIsNone(self.service.video_cache.get('c'))
+
+    def test_failed_refresh_serves_cached_values(self):
+        self.api.add('a')
+        self.api.add('b')
+        self.service._get_videos_details(['a', 'b'])
+        self.now += 200
+
+        with mock.patch.object(FakeRequest, 'execute', side_effect=OSError('offline')):
+            details = self.service._get_videos_details(['a', 'b'])
+        self.assertEqual(sorted(details), ['a', 'b'])
+
+    def test_get_video_by_id_goes_through_the_batcher(self):
+        self.api.add('a')
+        video = self.service.get_video_by_id('a')
+        self.assertEqual(video.video_id, 'a')
+        self.assertIsNone(self.service.get_video_by_id('unknown'))
+        self.assertEqual(self.service.get_stats()['video_batcher']['lookups'], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()